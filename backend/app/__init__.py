@@ -4,6 +4,11 @@ QuizPoolAI backend application package.
 This module exposes helpers to create the FastAPI app.
 """
 
-from .main import create_app
+import time
+
+# Reference point for startup-time measurement (see `app.warmup`).
+STARTED_AT = time.perf_counter()
+
+from .main import create_app  # noqa: E402
 
 __all__ = ["create_app"]
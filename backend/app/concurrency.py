@@ -0,0 +1,170 @@
+"""
+Execution helpers that keep blocking work off the event loop.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, nullcontext
+from typing import (
+    Any,
+    AsyncContextManager,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    Optional,
+    TypeVar,
+)
+
+from .config import Settings
+from .logger import get_logger
+from .metrics import MetricsCollector
+
+T = TypeVar("T")
+
+
+class ExecutorPools:
+    """Bounded executors for blocking pipeline stages.
+
+    Network-bound calls (YouTube, Gemini, Pinecone) run on the I/O pool while
+    CPU-heavy transcription runs on a separately sized CPU pool, so a slow
+    Whisper job can never starve the network stages or the event loop.
+    """
+
+    def __init__(self, settings: Settings):
+        self.logger = get_logger(self.__class__.__name__)
+        self.io = ThreadPoolExecutor(
+            max_workers=max(1, settings.io_pool_workers), thread_name_prefix="quizpool-io"
+        )
+        self.cpu = ThreadPoolExecutor(
+            max_workers=max(1, settings.cpu_pool_workers), thread_name_prefix="quizpool-cpu"
+        )
+
+    async def run_io(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a blocking network call on the I/O pool."""
+        return await self._run(self.io, fn, *args, **kwargs)
+
+    async def run_cpu(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a CPU-heavy call on the CPU pool."""
+        return await self._run(self.cpu, fn, *args, **kwargs)
+
+    async def iterate_io(
+        self, fn: Callable[..., Iterator[T]], *args: Any, **kwargs: Any
+    ) -> AsyncIterator[T]:
+        """Drive a blocking iterator on the I/O pool and yield its items.
+
+        Items are handed to the event loop as soon as they are produced. If the
+        consumer stops early, the producer thread stops at its next item.
+        """
+        loop = asyncio.get_running_loop()
+        queue: "asyncio.Queue[tuple]" = asyncio.Queue()
+        stop = threading.Event()
+
+        def produce() -> None:
+            try:
+                for item in fn(*args, **kwargs):
+                    if stop.is_set():
+                        return
+                    loop.call_soon_threadsafe(queue.put_nowait, ("item", item))
+            except Exception as error:
+                loop.call_soon_threadsafe(queue.put_nowait, ("error", error))
+            else:
+                loop.call_soon_threadsafe(queue.put_nowait, ("done", None))
+
+        loop.run_in_executor(self.io, produce)
+        try:
+            while True:
+                kind, value = await queue.get()
+                if kind == "item":
+                    yield value
+                elif kind == "error":
+                    raise value
+                else:
+                    break
+        finally:
+            stop.set()
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Tasks submitted to each pool that no thread has picked up yet."""
+        return {"io": self.io._work_queue.qsize(), "cpu": self.cpu._work_queue.qsize()}
+
+    @staticmethod
+    async def _run(
+        executor: ThreadPoolExecutor, fn: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        self.logger.info("Shutting down executor pools")
+        self.io.shutdown(wait=False, cancel_futures=True)
+        self.cpu.shutdown(wait=False, cancel_futures=True)
+
+
+class SingleFlight:
+    """De-duplicates identical in-flight coroutines.
+
+    The first caller for a key starts the work as its own task; callers that
+    arrive while it is running await the same task. Waiters are shielded from
+    each other, so cancelling one request (including the leader) never
+    cancels the shared work, and an exception is delivered to every waiter.
+    """
+
+    def __init__(self, name: str, metrics: Optional[MetricsCollector] = None):
+        self.name = name
+        self.metrics = metrics or MetricsCollector()
+        self._inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._forget, key))
+            self.metrics.increment(f"{self.name}_singleflight_leaders_total")
+        else:
+            self.metrics.increment(f"{self.name}_singleflight_coalesced_total")
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every waiter went away.
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+
+class StageLimits:
+    """Separate concurrency caps for each pipeline stage.
+
+    Videos of a batch each run the whole pipeline as their own task, and
+    every stage waits for its own semaphore, so one video's generation
+    overlaps the next video's transcript fetch instead of running
+    back-to-back. Stages without a limit are not bounded.
+    """
+
+    def __init__(self, metrics: Optional[MetricsCollector] = None, **limits: int):
+        self.metrics = metrics or MetricsCollector()
+        self._semaphores = {
+            stage: asyncio.Semaphore(max(1, limit)) for stage, limit in limits.items()
+        }
+
+    def hold(self, stage: str) -> AsyncContextManager[Any]:
+        semaphore = self._semaphores.get(stage)
+        return self._held(stage, semaphore) if semaphore else nullcontext()
+
+    @asynccontextmanager
+    async def _held(self, stage: str, semaphore: asyncio.Semaphore) -> AsyncIterator[None]:
+        async with semaphore:
+            self.metrics.add_gauge(f"batch_{stage}_in_flight", 1)
+            try:
+                yield
+            finally:
+                self.metrics.add_gauge(f"batch_{stage}_in_flight", -1)
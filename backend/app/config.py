@@ -3,7 +3,7 @@ Configuration management for the QuizPoolAI backend.
 """
 
 from functools import lru_cache
-from typing import List
+from typing import Dict, List
 
 from dotenv import load_dotenv
 from pydantic import BaseSettings, Field, validator
@@ -20,15 +20,89 @@ class Settings(BaseSettings):
     log_level: str = "INFO"
     gemini_api_key: str = ""
     pinecone_api_key: str = ""
+    llm_provider: str = "gemini"
+    deepseek_api_key: str = ""
+    deepseek_base_url: str = "https://api.deepseek.com"
+    deepseek_model: str = "deepseek-chat"
+    llm_timeout_seconds: float = 60.0
+    llm_connect_timeout_seconds: float = 5.0
+    llm_max_connections: int = 32
+    llm_max_keepalive_connections: int = 16
+    llm_keepalive_seconds: float = 30.0
+    llm_max_retries: int = 3
+    llm_backoff_seconds: float = 1.0
+    llm_backoff_max_seconds: float = 10.0
+    circuit_failure_threshold: int = 5
+    circuit_reset_seconds: float = 30.0
+    retry_budget_ratio: float = 0.2
+    retry_budget_min_per_second: float = 1.0
+    retry_budget_burst: float = 10.0
     yt_cookies_path: str = "cookies.txt"
     allowed_origins: List[str] = Field(default_factory=lambda: ["*"])
     rate_limit_requests: int = 60
     rate_limit_window_seconds: int = 60
+    rate_limit_routes: Dict[str, int] = Field(
+        default_factory=lambda: {
+            "POST /api/generate-quiz": 10,
+            "POST /api/generate-quiz/stream": 10,
+            "POST /api/jobs": 30,
+            "GET /api/jobs": 600,
+            "POST /api/batch": 1,
+            "/health": 600,
+            "/metrics": 600,
+        }
+    )
+    rate_limit_backend: str = "memory"
+    redis_url: str = "redis://localhost:6379/0"
     min_questions: int = 1
     max_questions: int = 50
     default_questions: int = 5
     whisper_model: str = "base"
+    transcription_engine: str = "faster-whisper"
+    whisper_compute_type: str = "int8"
+    whisper_beam_size: int = 1
+    whisper_cpu_threads: int = 0
+    whisper_vad_filter: bool = True
+    whisper_language: str = ""
+    transcription_workers: int = 1
+    transcription_job_timeout_seconds: int = 1800
+    transcription_load_timeout_seconds: int = 600
+    preload_transcription_model: bool = False
     metrics_namespace: str = "quizpoolai"
+    io_pool_workers: int = 16
+    cpu_pool_workers: int = 2
+    cache_dir: str = ""
+    transcript_cache_memory_bytes: int = 64 * 1024 * 1024
+    transcript_cache_ttl_seconds: int = 7 * 24 * 3600
+    quiz_cache_enabled: bool = False
+    quiz_cache_memory_bytes: int = 16 * 1024 * 1024
+    quiz_cache_ttl_seconds: int = 24 * 3600
+    embedding_cache_enabled: bool = True
+    embedding_cache_memory_bytes: int = 32 * 1024 * 1024
+    embedding_batch_size: int = 100
+    embedding_concurrency: int = 4
+    pinecone_upsert_batch_size: int = 100
+    vector_backend: str = "pinecone"
+    vector_index_dir: str = "data/vector_index"
+    vector_compact_min_dead: int = 1024
+    job_workers: int = 4
+    job_queue_size: int = 100
+    job_retention_seconds: int = 3600
+    map_reduce_threshold_chars: int = 30000
+    map_chunk_seconds: int = 180
+    map_concurrency: int = 8
+    prompt_token_budget: int = 7000
+    question_dedup_threshold: float = 0.85
+    question_topup_rounds: int = 2
+    batch_max_videos: int = 50
+    batch_transcript_concurrency: int = 8
+    batch_ingest_concurrency: int = 4
+    batch_generation_concurrency: int = 4
+    response_transcript_max_chars: int = 2000
+    compression_enabled: bool = True
+    compression_min_bytes: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
 
     class Config:
         case_sensitive = False
@@ -0,0 +1,199 @@
+"""
+Background job execution for long-running quiz generation.
+"""
+
+import asyncio
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from .config import Settings
+from .logger import get_logger
+from .metrics import MetricsCollector
+from .models.schemas import JobStatus
+
+# A unit of work receives a stage reporter and returns the job result.
+JobWork = Callable[[Callable[[str, float], Awaitable[None]]], Awaitable[Any]]
+
+
+class JobStore(ABC):
+    """Persistence interface for job state.
+
+    The in-process store is the default; a shared backend (Redis, a database)
+    only needs to implement these coroutines.
+    """
+
+    @abstractmethod
+    async def save(self, job: JobStatus) -> None:
+        """Insert or replace a job record."""
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[JobStatus]:
+        """Return a job record, or None when unknown or expired."""
+
+    @abstractmethod
+    async def purge_expired(self, now: float) -> int:
+        """Delete finished jobs whose retention elapsed; return how many."""
+
+
+class InMemoryJobStore(JobStore):
+    """Job records kept in a dict for the lifetime of the process."""
+
+    def __init__(self):
+        self._jobs: Dict[str, JobStatus] = {}
+
+    async def save(self, job: JobStatus) -> None:
+        self._jobs[job.job_id] = job
+
+    async def get(self, job_id: str) -> Optional[JobStatus]:
+        job = self._jobs.get(job_id)
+        if job and job.expires_at is not None and job.expires_at <= time.time():
+            return None
+        return job
+
+    async def purge_expired(self, now: float) -> int:
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.expires_at is not None and job.expires_at <= now
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        return len(expired)
+
+
+class JobManager:
+    """Runs submitted work on a bounded pool of asyncio workers.
+
+    At most ``job_queue_size`` jobs wait for one of ``job_workers`` workers;
+    finished jobs are kept for ``job_retention_seconds``. An unexpected error
+    (e.g. from the store) fails that job but never stops its worker.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        store: Optional[JobStore] = None,
+        metrics: Optional[MetricsCollector] = None,
+    ):
+        self.settings = settings
+        self.store = store or InMemoryJobStore()
+        self.metrics = metrics or MetricsCollector()
+        self.logger = get_logger(self.__class__.__name__)
+        self._queue: Optional["asyncio.Queue[tuple]"] = None
+        self._workers: List["asyncio.Task[None]"] = []
+        self._last_purge = 0.0
+
+    def _ensure_started(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=max(1, self.settings.job_queue_size))
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"quizpool-job-{idx}")
+            for idx in range(max(1, self.settings.job_workers))
+        ]
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def submit(self, work: JobWork) -> JobStatus:
+        self._ensure_started()
+        await self._purge()
+        if self._queue.full():
+            self.metrics.increment("jobs_rejected_total")
+            raise HTTPException(
+                status_code=503, detail="Job queue is full. Try again shortly."
+            )
+        now = time.time()
+        job = JobStatus(
+            job_id=uuid.uuid4().hex, status="queued", created_at=now, updated_at=now
+        )
+        await self.store.save(job)
+        self._queue.put_nowait((job.job_id, work))
+        self.metrics.increment("jobs_submitted_total")
+        return job
+
+    async def get(self, job_id: str) -> Optional[JobStatus]:
+        await self._purge()
+        return await self.store.get(job_id)
+
+    async def _update(self, job_id: str, **fields: Any) -> None:
+        job = await self.store.get(job_id)
+        if job is None:
+            return
+        fields["updated_at"] = time.time()
+        await self.store.save(job.copy(update=fields))
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, work = await self._queue.get()
+            try:
+                await self._run(job_id, work)
+            except Exception as error:
+                # Usually the store failing; keep the worker alive regardless.
+                self.logger.exception("Job %s crashed its worker", job_id)
+                self.metrics.increment("job_worker_errors_total")
+                await self._mark_crashed(job_id, error)
+            finally:
+                self._queue.task_done()
+
+    async def _mark_crashed(self, job_id: str, error: Exception) -> None:
+        try:
+            await self._update(
+                job_id,
+                status="failed",
+                stage="failed",
+                error=f"Internal error: {error}",
+                expires_at=time.time() + self.settings.job_retention_seconds,
+            )
+        except Exception:
+            self.logger.exception("Could not mark job %s as failed", job_id)
+
+    async def _run(self, job_id: str, work: JobWork) -> None:
+        async def report(stage: str, progress: float) -> None:
+            await self._update(job_id, stage=stage, progress=progress)
+
+        await self._update(job_id, status="running")
+        retention = self.settings.job_retention_seconds
+        try:
+            result = await work(report)
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            detail = getattr(error, "detail", None) or str(error)
+            self.logger.warning("Job %s failed: %s", job_id, detail)
+            self.metrics.increment("jobs_failed_total")
+            await self._update(
+                job_id,
+                status="failed",
+                stage="failed",
+                error=str(detail),
+                expires_at=time.time() + retention,
+            )
+            return
+        self.metrics.increment("jobs_completed_total")
+        await self._update(
+            job_id,
+            status="completed",
+            stage="completed",
+            progress=1.0,
+            result=result,
+            expires_at=time.time() + retention,
+        )
+
+    async def _purge(self) -> None:
+        now = time.time()
+        if now - self._last_purge < max(1.0, self.settings.job_retention_seconds / 10):
+            return
+        self._last_purge = now
+        await self.store.purge_expired(now)
+
+    async def shutdown(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
@@ -0,0 +1,36 @@
+"""
+Deferred imports for heavy optional SDKs.
+"""
+
+import importlib
+from types import ModuleType
+from typing import Any, Optional
+
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access.
+
+    Keeps `import app.main` cheap: SDKs such as ``google.generativeai`` or
+    ``yt_dlp`` are only imported when a request (or the startup warm-up)
+    actually uses them.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+
+    def load(self) -> ModuleType:
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
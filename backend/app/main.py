@@ -2,75 +2,99 @@
 FastAPI application wiring for the QuizPoolAI backend.
 """
 
-import asyncio
-import time
-from collections import defaultdict
-from typing import Any, Dict
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Type
 
 from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 
+from . import STARTED_AT
+from .concurrency import ExecutorPools, StageLimits
 from .config import Settings, get_settings
-from .logger import configure_logging, get_logger
+from .jobs import JobManager, JobStore
+from .logger import configure_logging
+from .metrics import MetricsCollector
 from .models.schemas import (
+    BatchQuizRequest,
+    BatchQuizResponse,
     GenerateQuizRequest,
+    JobStatus,
+    Quiz,
     QuizResponse,
     TranscriptResponse,
 )
+from .ratelimit import RateLimiter
+from .resilience import Resilience, install_shared_resilience
+from .responses import CompressionMiddleware, FastJSONResponse, dumps, model_response
+from .services.batch import BatchRunner
+from .services.pipeline import QuizPipeline
 from .services.quiz_service import QuizService
 from .services.transcript_service import TranscriptService
-from .storage.pinecone_client import PineconeStorage
-
-
-class MetricsCollector:
-    """Minimal in-memory metrics helper."""
-
-    def __init__(self):
-        self.counters: Dict[str, int] = defaultdict(int)
-
-    def increment(self, name: str) -> None:
-        self.counters[name] += 1
-
-    def export(self) -> Dict[str, int]:
-        return dict(self.counters)
-
-
-class SimpleRateLimiter:
-    """Coarse-grained IP based rate limiter."""
-
-    def __init__(self, settings: Settings):
-        self.limit = settings.rate_limit_requests
-        self.window = settings.rate_limit_window_seconds
-        self.requests: Dict[str, Dict[str, Any]] = {}
-        self.lock = asyncio.Lock()
-        self.logger = get_logger(self.__class__.__name__)
-
-    async def __call__(self, request: Request, call_next):
-        identifier = request.client.host if request.client else "anonymous"
-        async with self.lock:
-            record = self.requests.get(identifier)
-            now = time.time()
-            if not record or now - record["window_start"] > self.window:
-                self.requests[identifier] = {"window_start": now, "count": 1}
-            else:
-                record["count"] += 1
-                if record["count"] > self.limit:
-                    self.logger.warning("Rate limit exceeded for %s", identifier)
-                    return JSONResponse(
-                        status_code=429,
-                        content={"detail": "Too many requests. Slow down and try again."},
-                    )
-        response = await call_next(request)
-        return response
-
-
-def create_app() -> FastAPI:
-    """Application factory used by ASGI and tests."""
-    settings = get_settings()
-    configure_logging(settings)
+from .storage.vector_store import VectorStore, build_vector_store
+from .warmup import WarmUp
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {dumps(data)}\n\n"
 
-    app = FastAPI(title=settings.app_name)
+
+def _quiz_response(
+    video_id: str, transcript: str, quiz: List[Quiz], mode: str, max_chars: int
+) -> QuizResponse:
+    """Echo the transcript as requested by ``transcript_mode``."""
+    if mode == "none":
+        return QuizResponse(quiz=quiz)
+    if mode == "reference":
+        return QuizResponse(transcript_url=f"/api/transcript/{video_id}", quiz=quiz)
+    if mode == "truncated" and len(transcript) > max_chars:
+        return QuizResponse(
+            transcript=transcript[:max_chars] + "...", transcript_truncated=True, quiz=quiz
+        )
+    return QuizResponse(transcript=transcript, quiz=quiz)
+
+
+def create_app(
+    job_store: Optional[JobStore] = None,
+    settings: Optional[Settings] = None,
+    transcript_service_cls: Type[TranscriptService] = TranscriptService,
+    quiz_service_cls: Type[QuizService] = QuizService,
+    storage_cls: Optional[Type[VectorStore]] = None,
+) -> FastAPI:
+    """Application factory used by ASGI, tests and benchmarks.
+
+    ``job_store`` swaps the in-process job store for another backend,
+    ``settings`` replaces the environment-derived settings, and the ``*_cls``
+    arguments substitute component implementations (e.g. the stand-in
+    providers in ``benchmarks/``). Substitutes take the same constructor
+    arguments as the classes they replace.
+    """
+    settings = settings or get_settings()
+    configure_logging(settings)
+    metrics = MetricsCollector(namespace=settings.metrics_namespace)
+
+    warmup = WarmUp(STARTED_AT, metrics)
+
+    @asynccontextmanager
+    async def lifespan(_app: FastAPI):
+        # Warm-up runs in the background so the server accepts traffic at once;
+        # /ready reports when it has finished.
+        warmup.start(executors)
+        try:
+            yield
+        finally:
+            await warmup.cancel()
+            await jobs.shutdown()
+            await executors.run_cpu(transcript_service.shutdown)
+            executors.shutdown()
+            vector_store.close()
+            quiz_service.close()
+
+    app = FastAPI(
+        title=settings.app_name, lifespan=lifespan, default_response_class=FastJSONResponse
+    )
+    app.state.warmup = warmup
+    app.state.metrics = metrics
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.allowed_origins,
@@ -78,22 +102,80 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    if settings.compression_enabled:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.compression_min_bytes,
+            gzip_level=settings.compression_gzip_level,
+            brotli_quality=settings.compression_brotli_quality,
+            metrics=metrics,
+        )
 
-    metrics = MetricsCollector()
-    rate_limiter = SimpleRateLimiter(settings)
+    rate_limiter = RateLimiter(settings, metrics=metrics)
     app.middleware("http")(rate_limiter)
 
-    transcript_service = TranscriptService(settings)
-    quiz_service = QuizService(settings)
-    pinecone_storage = PineconeStorage(settings)
+    @app.middleware("http")
+    async def track_in_flight(request: Request, call_next):
+        # Streamed bodies are not counted once their headers have been sent.
+        metrics.add_gauge("http_requests_in_flight", 1)
+        try:
+            return await call_next(request)
+        finally:
+            metrics.add_gauge("http_requests_in_flight", -1)
+
+    executors = ExecutorPools(settings)
+    transcript_service = transcript_service_cls(settings, metrics=metrics)
+    resilience = Resilience(settings, metrics)
+    # Module-level callers (the legacy qgen_service helpers) share these breakers.
+    install_shared_resilience(resilience)
+    quiz_service = quiz_service_cls(settings, metrics=metrics, resilience=resilience)
+    vector_store = (
+        storage_cls(settings, metrics=metrics)
+        if storage_cls
+        else build_vector_store(settings, metrics)
+    )
+    pipeline = QuizPipeline(
+        transcript_service, quiz_service, vector_store, executors, metrics
+    )
+    batches = BatchRunner(
+        pipeline,
+        StageLimits(
+            metrics,
+            transcript=settings.batch_transcript_concurrency,
+            ingest=settings.batch_ingest_concurrency,
+            generation=settings.batch_generation_concurrency,
+        ),
+        metrics,
+    )
+    jobs = JobManager(settings, store=job_store, metrics=metrics)
+    app.state.batches = batches
+    app.state.resilience = resilience
+
+    metrics.register_gauge("job_queue_depth", lambda: jobs.queue_depth)
+    metrics.register_gauge("io_pool_queue_depth", lambda: executors.queue_depths()["io"])
+    metrics.register_gauge("cpu_pool_queue_depth", lambda: executors.queue_depths()["cpu"])
+    if transcript_service.worker_pool:
+        metrics.register_gauge(
+            "transcription_idle_workers", lambda: transcript_service.worker_pool.idle_workers
+        )
+
+    # Client construction and SDK imports are deferred to these steps (or to
+    # first use), keeping create_app() and `import app.main` cheap.
+    warmup.add("transcription", transcript_service.warm_up)
+    warmup.add("llm", quiz_service.warm_up)
+    warmup.add("vector_store", vector_store.warm_up)
 
     def get_services():
         return {
             "settings": settings,
             "transcripts": transcript_service,
             "quiz": quiz_service,
-            "pinecone": pinecone_storage,
+            "vector_store": vector_store,
             "metrics": metrics,
+            "executors": executors,
+            "pipeline": pipeline,
+            "batches": batches,
+            "jobs": jobs,
         }
 
     @app.post("/api/generate-quiz", response_model=QuizResponse)
@@ -104,41 +186,169 @@ def create_app() -> FastAPI:
         metrics.increment("generate_quiz_requests_total")
 
         transcripts: TranscriptService = services["transcripts"]
-        quiz_service: QuizService = services["quiz"]
-        pinecone: PineconeStorage = services["pinecone"]
+        pipeline: QuizPipeline = services["pipeline"]
 
         video_id = transcripts.extract_video_id(payload.youtube_url)
-        transcript = transcripts.get_transcript(video_id)
+        transcript, quiz = await pipeline.generate(
+            video_id,
+            payload.num_questions,
+            payload.difficulty,
+            fresh=payload.fresh,
+            difficulty_mix=payload.difficulty_mix,
+        )
 
-        if not transcript or len(transcript) < 100:
-            raise HTTPException(
-                status_code=400, detail="Transcript too short or unavailable."
+        return model_response(
+            _quiz_response(
+                video_id,
+                transcript,
+                quiz,
+                payload.transcript_mode,
+                settings.response_transcript_max_chars,
             )
+        )
 
-        pinecone.store_transcript(transcript, video_id, quiz_service.get_embedding_fn())
+    @app.post("/api/generate-quiz/stream")
+    async def stream_quiz_endpoint(
+        payload: GenerateQuizRequest, services=Depends(get_services)
+    ):
+        """Server-sent events: stage events, one `question` event each, then `done`."""
+        services["metrics"].increment("stream_quiz_requests_total")
+        transcripts: TranscriptService = services["transcripts"]
+        pipeline: QuizPipeline = services["pipeline"]
+        video_id = transcripts.extract_video_id(payload.youtube_url)
 
-        quiz = quiz_service.generate_quiz(
-            transcript=transcript,
-            num_questions=payload.num_questions,
-            difficulty=payload.difficulty,
+        async def events():
+            try:
+                async for event, data in pipeline.stream(
+                    video_id,
+                    payload.num_questions,
+                    payload.difficulty,
+                    fresh=payload.fresh,
+                    difficulty_mix=payload.difficulty_mix,
+                ):
+                    yield _sse(event, data)
+            except HTTPException as error:
+                yield _sse("error", {"detail": error.detail, "status_code": error.status_code})
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
         )
 
-        return QuizResponse(transcript=transcript, quiz=quiz)
+    @app.post("/api/jobs", response_model=JobStatus, status_code=202)
+    async def submit_quiz_job(payload: GenerateQuizRequest, services=Depends(get_services)):
+        services["metrics"].increment("quiz_job_requests_total")
+        transcripts: TranscriptService = services["transcripts"]
+        pipeline: QuizPipeline = services["pipeline"]
+        jobs: JobManager = services["jobs"]
+
+        video_id = transcripts.extract_video_id(payload.youtube_url)
+
+        async def work(report) -> QuizResponse:
+            transcript, quiz = await pipeline.generate(
+                video_id,
+                payload.num_questions,
+                payload.difficulty,
+                fresh=payload.fresh,
+                report=report,
+                difficulty_mix=payload.difficulty_mix,
+            )
+            return _quiz_response(
+                video_id,
+                transcript,
+                quiz,
+                payload.transcript_mode,
+                settings.response_transcript_max_chars,
+            )
+
+        return await jobs.submit(work)
+
+    def _batch_renderer(payload: BatchQuizRequest):
+        def render(video_id: str, transcript: str, quiz: List[Quiz]) -> QuizResponse:
+            return _quiz_response(
+                video_id,
+                transcript,
+                quiz,
+                payload.transcript_mode,
+                settings.response_transcript_max_chars,
+            )
+
+        return render
+
+    @app.post("/api/batch/stream")
+    async def stream_batch_endpoint(payload: BatchQuizRequest, services=Depends(get_services)):
+        """Server-sent events: `videos`, one `video` result per video as it finishes, `done`."""
+        services["metrics"].increment("batch_requests_total")
+        batches: BatchRunner = services["batches"]
+        video_ids = await batches.resolve(payload)
+
+        async def events():
+            yield _sse("videos", {"video_ids": video_ids})
+            completed = 0
+            async for result in batches.run(video_ids, payload, _batch_renderer(payload)):
+                completed += result.status == "completed"
+                yield _sse("video", result.dict())
+            yield _sse("done", {"completed": completed, "failed": len(video_ids) - completed})
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @app.post("/api/batch/jobs", response_model=JobStatus, status_code=202)
+    async def submit_batch_job(payload: BatchQuizRequest, services=Depends(get_services)):
+        """Background batch; progress is the fraction of videos finished."""
+        services["metrics"].increment("batch_requests_total")
+        batches: BatchRunner = services["batches"]
+        jobs: JobManager = services["jobs"]
+        video_ids = await batches.resolve(payload)
+
+        async def work(report) -> BatchQuizResponse:
+            results = []
+            async for result in batches.run(video_ids, payload, _batch_renderer(payload)):
+                results.append(result)
+                await report("generating", len(results) / len(video_ids))
+            results.sort(key=lambda result: result.index)
+            completed = sum(result.status == "completed" for result in results)
+            return BatchQuizResponse(
+                videos=results, completed=completed, failed=len(results) - completed
+            )
+
+        return await jobs.submit(work)
+
+    @app.get("/api/jobs/{job_id}", response_model=JobStatus)
+    async def get_quiz_job(job_id: str, services=Depends(get_services)):
+        job = await services["jobs"].get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found or expired.")
+        return job
 
     @app.get("/api/transcript/{video_id}", response_model=TranscriptResponse)
     async def get_transcript_endpoint(video_id: str, services=Depends(get_services)):
         services["metrics"].increment("transcript_requests_total")
-        transcripts: TranscriptService = services["transcripts"]
-        transcript = transcripts.get_transcript(video_id)
+        pipeline: QuizPipeline = services["pipeline"]
+        transcript = await pipeline.get_transcript(video_id)
         return TranscriptResponse(video_id=video_id, transcript=transcript)
 
     @app.get("/health")
     async def health():
         return {"status": "healthy"}
 
-    @app.get("/metrics")
+    @app.get("/ready")
+    async def ready():
+        """Readiness: 503 while clients and models are still warming up."""
+        report = warmup.status()
+        return JSONResponse(report, status_code=200 if warmup.ready else 503)
+
+    @app.get("/metrics", response_class=PlainTextResponse)
     async def metrics_endpoint(services=Depends(get_services)):
-        return services["metrics"].export()
+        """Prometheus text exposition of counters, gauges and stage histograms."""
+        return PlainTextResponse(
+            services["metrics"].render_prometheus(),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+        )
 
     @app.get("/")
     async def root():
@@ -146,11 +356,18 @@ def create_app() -> FastAPI:
             "message": "YouTube Quiz Generator API",
             "endpoints": {
                 "POST /api/generate-quiz": "Generate quiz from YouTube video",
+                "POST /api/generate-quiz/stream": "Stream quiz questions as server-sent events",
+                "POST /api/jobs": "Submit a background quiz generation job",
+                "GET /api/jobs/{job_id}": "Poll a quiz generation job",
+                "POST /api/batch/stream": "Stream quizzes for many videos or a playlist",
+                "POST /api/batch/jobs": "Submit a background batch of videos or a playlist",
                 "GET /api/transcript/{video_id}": "Get transcript only",
                 "GET /health": "Health check",
+                "GET /ready": "Readiness (warm-up status)",
             },
         }
 
+    warmup.app_created()
     return app
 
 
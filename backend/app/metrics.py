@@ -0,0 +1,185 @@
+"""
+In-process metrics collection.
+
+Counters, gauges and histograms are recorded into per-thread shards, so an
+observation never takes a lock: each shard is only written by its own
+thread and shards are merged when metrics are exported.
+"""
+
+import bisect
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds in seconds, spanning cache hits through Whisper runs.
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+    600.0,
+)
+# Upper bounds for histograms of fractions in [0, 1].
+RATIO_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class _Shard:
+    __slots__ = ("counters", "gauges", "histograms")
+
+    def __init__(self):
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.gauges: Dict[str, float] = defaultdict(float)
+        # (name, labels) -> [bucket counts..., +Inf count, sum]
+        self.histograms: Dict[Tuple[str, Labels], List[float]] = {}
+
+
+class MetricsCollector:
+    """Lock-free counters, gauges and histograms with Prometheus export.
+
+    Histograms use ``buckets`` unless their name was given its own with
+    `register_histogram`.
+    """
+
+    def __init__(self, namespace: str = "", buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = tuple(sorted(buckets))
+        self._histogram_buckets: Dict[str, Tuple[float, ...]] = {}
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._shards_lock = threading.Lock()
+        self._gauge_callbacks: Dict[str, Callable[[], float]] = {}
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._shards_lock:  # once per thread, never per observation
+                self._shards.append(shard)
+        return shard
+
+    def increment(self, name: str, value: int = 1) -> None:
+        self._shard().counters[name] += value
+
+    def add_gauge(self, name: str, delta: float) -> None:
+        """Move a gauge up or down (e.g. in-flight requests)."""
+        self._shard().gauges[name] += delta
+
+    def register_gauge(self, name: str, callback: Callable[[], float]) -> None:
+        """Sample ``callback()`` for gauge ``name`` at export time."""
+        self._gauge_callbacks[name] = callback
+
+    def register_histogram(self, name: str, buckets: Tuple[float, ...]) -> None:
+        """Give histogram ``name`` its own bucket bounds (before observing it)."""
+        self._histogram_buckets[name] = tuple(sorted(buckets))
+
+    def buckets_for(self, name: str) -> Tuple[float, ...]:
+        return self._histogram_buckets.get(name, self.buckets)
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        histograms = self._shard().histograms
+        buckets = self.buckets_for(name)
+        state = histograms.get(key)
+        if state is None:
+            state = histograms[key] = [0.0] * (len(buckets) + 2)
+        state[bisect.bisect_left(buckets, value)] += 1
+        state[-1] += value
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """Observe the duration of the ``with`` block, even if it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def stage(self, stage: str):
+        """Time one pipeline stage into ``stage_duration_seconds``."""
+        return self.timer("stage_duration_seconds", stage=stage)
+
+    def export(self) -> Dict[str, int]:
+        """Merged counter values."""
+        merged: Dict[str, int] = defaultdict(int)
+        for shard in self._snapshot_shards():
+            for name, value in dict(shard.counters).items():
+                merged[name] += value
+        return dict(merged)
+
+    def gauges(self) -> Dict[str, float]:
+        merged: Dict[str, float] = defaultdict(float)
+        for shard in self._snapshot_shards():
+            for name, value in dict(shard.gauges).items():
+                merged[name] += value
+        for name, callback in list(self._gauge_callbacks.items()):
+            merged[name] = float(callback())
+        return dict(merged)
+
+    def histogram(self, name: str, **labels: str) -> Optional[Dict[str, float]]:
+        """Merged ``{"count", "sum"}`` for one histogram series, or None."""
+        return self.histograms().get((name, tuple(sorted(labels.items()))), {}).get("summary")
+
+    def histograms(self) -> Dict[Tuple[str, Labels], Dict]:
+        """Merged histograms keyed by ``(name, labels)``.
+
+        Each value holds per-bucket (non-cumulative) ``buckets`` counts, with
+        the +Inf bucket last, and a ``summary`` of ``count`` and ``sum``.
+        """
+        merged: Dict[Tuple[str, Labels], List[float]] = {}
+        for shard in self._snapshot_shards():
+            for key, state in dict(shard.histograms).items():
+                target = merged.setdefault(key, [0.0] * len(state))
+                for idx, value in enumerate(list(state)):
+                    target[idx] += value
+        return {
+            key: {
+                "buckets": state[:-1],
+                "summary": {"count": sum(state[:-1]), "sum": state[-1]},
+            }
+            for key, state in merged.items()
+        }
+
+    def _snapshot_shards(self) -> List[_Shard]:
+        with self._shards_lock:
+            return list(self._shards)
+
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        prefix = f"{self.namespace}_" if self.namespace else ""
+        lines: List[str] = []
+        for name, value in sorted(self.export().items()):
+            lines += [f"# TYPE {prefix}{name} counter", f"{prefix}{name} {value}"]
+        for name, value in sorted(self.gauges().items()):
+            lines += [f"# TYPE {prefix}{name} gauge", f"{prefix}{name} {_format(value)}"]
+
+        typed = set()
+        for (name, labels), data in sorted(self.histograms().items()):
+            full = f"{prefix}{name}"
+            if full not in typed:
+                typed.add(full)
+                lines.append(f"# TYPE {full} histogram")
+            cumulative = 0.0
+            bounds = [_format(bound) for bound in self.buckets_for(name)] + ["+Inf"]
+            for bound, count in zip(bounds, data["buckets"], strict=True):
+                cumulative += count
+                lines.append(
+                    f"{full}_bucket{_labels(labels + (('le', bound),))} {_format(cumulative)}"
+                )
+            lines.append(f"{full}_sum{_labels(labels)} {_format(data['summary']['sum'])}")
+            lines.append(f"{full}_count{_labels(labels)} {_format(cumulative)}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    rendered = ",".join(
+        '{}="{}"'.format(key, value.replace("\\", "\\\\").replace('"', '\\"'))
+        for key, value in labels
+    )
+    return "{" + rendered + "}"
+
+
+def _format(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
@@ -1,5 +1,5 @@
 """Data models for API payloads."""
 
-from .schemas import GenerateQuizRequest, Quiz, QuizResponse, TranscriptResponse
+from .schemas import GenerateQuizRequest, JobStatus, Quiz, QuizResponse, TranscriptResponse
 
-__all__ = ["GenerateQuizRequest", "Quiz", "QuizResponse", "TranscriptResponse"]
+__all__ = ["GenerateQuizRequest", "JobStatus", "Quiz", "QuizResponse", "TranscriptResponse"]
@@ -3,43 +3,144 @@ Pydantic schemas for API requests and responses.
 """
 
 import re
-from typing import List
+from typing import Dict, List, Optional, Union
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, root_validator, validator
 
 
 YOUTUBE_ID_PATTERN = re.compile(r"(?:v=|\/)([0-9A-Za-z_-]{11}).*|^([0-9A-Za-z_-]{11})$")
 
 
-class GenerateQuizRequest(BaseModel):
-    youtube_url: str = Field(..., description="Full YouTube video URL")
+def validate_youtube_url(value: str) -> str:
+    if not value:
+        raise ValueError("YouTube URL is required")
+    if "youtube" not in value and "youtu.be" not in value:
+        raise ValueError("Provide a valid YouTube URL")
+    if not re.search(YOUTUBE_ID_PATTERN, value):
+        raise ValueError("YouTube URL must contain a valid video ID")
+    return value.strip()
+
+
+class QuizOptions(BaseModel):
+    """Generation options shared by single-video and batch requests."""
+
     num_questions: int = Field(5, ge=1, le=50)
     difficulty: str = Field("medium", regex=r"^(easy|medium|hard)$")
+    fresh: bool = Field(False, description="Bypass the quiz result cache")
+    difficulty_mix: Optional[Dict[str, int]] = Field(
+        None,
+        description="Relative easy/medium/hard mix for long videos; overrides difficulty",
+    )
+    transcript_mode: str = Field(
+        "full",
+        regex=r"^(full|truncated|reference|none)$",
+        description=(
+            "How the transcript is echoed: full text, truncated text, a reference "
+            "URL to /api/transcript/{video_id}, or omitted"
+        ),
+    )
+
+    @validator("difficulty_mix")
+    @classmethod
+    def validate_difficulty_mix(cls, value):
+        if value is None:
+            return value
+        unknown = set(value) - {"easy", "medium", "hard"}
+        if unknown:
+            raise ValueError(f"Unknown difficulty levels: {', '.join(sorted(unknown))}")
+        if any(count < 0 for count in value.values()):
+            raise ValueError("Difficulty counts must be non-negative")
+        return value
+
+
+class GenerateQuizRequest(QuizOptions):
+    youtube_url: str = Field(..., description="Full YouTube video URL")
 
     @validator("youtube_url")
     @classmethod
     def validate_youtube_url(cls, value: str) -> str:
-        if not value:
-            raise ValueError("YouTube URL is required")
+        return validate_youtube_url(value)
+
+
+class BatchQuizRequest(QuizOptions):
+    youtube_urls: List[str] = Field(
+        default_factory=list, description="Video URLs, processed as one batch"
+    )
+    playlist_url: Optional[str] = Field(
+        None, description="Playlist URL to expand instead of youtube_urls"
+    )
+    transcript_mode: str = Field(
+        "reference",
+        regex=r"^(full|truncated|reference|none)$",
+        description="As for single quizzes; defaults to a reference URL per video",
+    )
+
+    @validator("youtube_urls", each_item=True)
+    @classmethod
+    def validate_youtube_urls(cls, value: str) -> str:
+        return validate_youtube_url(value)
+
+    @validator("playlist_url")
+    @classmethod
+    def validate_playlist_url(cls, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            return value
         if "youtube" not in value and "youtu.be" not in value:
-            raise ValueError("Provide a valid YouTube URL")
-        if not re.search(YOUTUBE_ID_PATTERN, value):
-            raise ValueError("YouTube URL must contain a valid video ID")
+            raise ValueError("Provide a valid YouTube playlist URL")
         return value.strip()
 
+    @root_validator(skip_on_failure=True)
+    @classmethod
+    def validate_source(cls, values):
+        if bool(values.get("youtube_urls")) == bool(values.get("playlist_url")):
+            raise ValueError("Provide either youtube_urls or playlist_url")
+        return values
+
 
 class Quiz(BaseModel):
     question: str
     options: List[str]
     correct_answer: str
     explanation: str
+    difficulty: Optional[str] = None
+    time_start: Optional[float] = None
+    time_end: Optional[float] = None
 
 
 class QuizResponse(BaseModel):
-    transcript: str
+    transcript: Optional[str] = None
+    transcript_url: Optional[str] = None
+    transcript_truncated: bool = False
     quiz: List[Quiz]
 
 
+class BatchVideoResult(BaseModel):
+    index: int = Field(..., description="Position of the video in the batch")
+    video_id: str
+    status: str = Field(..., description="completed or failed")
+    result: Optional[QuizResponse] = None
+    error: Optional[str] = None
+    status_code: Optional[int] = None
+
+
+class BatchQuizResponse(BaseModel):
+    videos: List[BatchVideoResult]
+    completed: int
+    failed: int
+
+
 class TranscriptResponse(BaseModel):
     video_id: str
     transcript: str
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: str = Field(..., description="queued, running, completed or failed")
+    stage: str = "queued"
+    progress: float = Field(0.0, ge=0.0, le=1.0)
+    result: Optional[Union[QuizResponse, BatchQuizResponse]] = None
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+    expires_at: Optional[float] = None
@@ -0,0 +1,202 @@
+"""
+Token-bucket rate limiting with per-route budgets and pluggable shared state.
+"""
+
+import math
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from .config import Settings
+from .logger import get_logger
+from .metrics import MetricsCollector
+
+# (allowed, tokens remaining, seconds until the next token is available)
+Decision = Tuple[bool, float, float]
+
+
+class RateLimitBackend(ABC):
+    """Stores token buckets. Implementations must make `acquire` atomic."""
+
+    @abstractmethod
+    async def acquire(self, key: str, capacity: int, refill_per_second: float) -> Decision:
+        """Take one token from ``key``'s bucket if available."""
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Per-process buckets.
+
+    `acquire` never awaits, so it is atomic on the event loop without a lock
+    and costs O(1). Buckets idle long enough to have refilled completely are
+    indistinguishable from new ones, so a periodic sweep drops them to keep
+    memory bounded by the number of recently active clients.
+    """
+
+    def __init__(self, sweep_interval_seconds: float = 60.0):
+        self.sweep_interval = sweep_interval_seconds
+        self.buckets: Dict[str, List[float]] = {}
+        self._next_sweep = time.monotonic() + sweep_interval_seconds
+        self._max_idle = 0.0
+
+    async def acquire(self, key: str, capacity: int, refill_per_second: float) -> Decision:
+        return self.acquire_now(key, capacity, refill_per_second, time.monotonic())
+
+    def acquire_now(
+        self, key: str, capacity: int, refill_per_second: float, now: float
+    ) -> Decision:
+        self._max_idle = max(self._max_idle, capacity / refill_per_second)
+        if now >= self._next_sweep:
+            self.sweep(now)
+
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            tokens = float(capacity)
+            bucket = self.buckets[key] = [tokens, now]
+        else:
+            tokens = min(float(capacity), bucket[0] + (now - bucket[1]) * refill_per_second)
+            bucket[1] = now
+
+        allowed = tokens >= 1.0
+        if allowed:
+            tokens -= 1.0
+        bucket[0] = tokens
+        return allowed, tokens, max(0.0, 1.0 - tokens) / refill_per_second
+
+    def sweep(self, now: float) -> int:
+        """Drop buckets that have been idle long enough to be full again."""
+        cutoff = now - self._max_idle
+        idle = [key for key, bucket in self.buckets.items() if bucket[1] <= cutoff]
+        for key in idle:
+            del self.buckets[key]
+        self._next_sweep = now + self.sweep_interval
+        return len(idle)
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Buckets shared by every worker through Redis.
+
+    The refill-and-take step runs as one Lua script so it stays atomic across
+    processes; keys expire once a bucket would be full again.
+    """
+
+    SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(tokens)}
+"""
+
+    def __init__(self, client, prefix: str = "quizpoolai:ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def acquire(self, key: str, capacity: int, refill_per_second: float) -> Decision:
+        allowed, tokens = await self.client.eval(
+            self.SCRIPT, 1, self.prefix + key, capacity, refill_per_second, time.time()
+        )
+        tokens = float(tokens)
+        return bool(int(allowed)), tokens, max(0.0, 1.0 - tokens) / refill_per_second
+
+
+def _parse_route(route: str) -> Tuple[str, str]:
+    """Split a ``rate_limit_routes`` key into (method or "", path prefix)."""
+    method, _, path = route.strip().rpartition(" ")
+    return method.strip().upper(), path
+
+
+def build_rate_limit_backend(settings: Settings) -> RateLimitBackend:
+    """Return the backend selected by ``settings.rate_limit_backend``."""
+    logger = get_logger("RateLimitBackend")
+    if settings.rate_limit_backend == "redis":
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError:  # pragma: no cover - dependency optional
+            logger.warning("redis package not installed; using in-memory rate limits.")
+        else:
+            return RedisRateLimitBackend(redis_asyncio.from_url(settings.redis_url))
+    return InMemoryRateLimitBackend()
+
+
+class RateLimiter:
+    """Per-client, per-route token-bucket limiter used as HTTP middleware.
+
+    Each route gets ``limit`` requests per ``rate_limit_window_seconds`` with
+    bursts up to ``limit``. Routes are matched by longest path prefix (whole
+    path segments) against ``rate_limit_routes``, whose keys may name a
+    method (``"POST /api/jobs"``) to limit only that method; a method-specific
+    entry beats a plain one for the same path. Everything else uses
+    ``rate_limit_requests``. If the backend fails (e.g. Redis is down) the
+    request is let through and counted in ``rate_limit_backend_errors_total``.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        backend: Optional[RateLimitBackend] = None,
+        metrics: Optional[MetricsCollector] = None,
+    ):
+        self.default_limit = settings.rate_limit_requests
+        self.window = settings.rate_limit_window_seconds
+        self.routes = sorted(
+            (
+                _parse_route(route) + (route, limit)
+                for route, limit in settings.rate_limit_routes.items()
+            ),
+            key=lambda item: (len(item[1]), bool(item[0])),
+            reverse=True,
+        )
+        self.backend = backend or build_rate_limit_backend(settings)
+        self.metrics = metrics or MetricsCollector()
+        self.logger = get_logger(self.__class__.__name__)
+
+    def route_limit(self, method: str, path: str) -> Tuple[str, int]:
+        for route_method, prefix, route, limit in self.routes:
+            if route_method and route_method != method:
+                continue
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return route, limit
+        return "*", self.default_limit
+
+    async def __call__(self, request: Request, call_next):
+        identifier = request.client.host if request.client else "anonymous"
+        route, limit = self.route_limit(request.method, request.url.path)
+        try:
+            allowed, remaining, wait = await self.backend.acquire(
+                f"{route}|{identifier}", limit, limit / self.window
+            )
+        except Exception as error:
+            # Fail open: an unavailable limiter must not take the API down.
+            self.metrics.increment("rate_limit_backend_errors_total")
+            self.logger.warning("Rate limit backend failed, allowing request: %s", error)
+            return await call_next(request)
+        headers = {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(int(remaining)),
+            "X-RateLimit-Reset": str(math.ceil(wait)),
+        }
+        if not allowed:
+            self.metrics.increment("rate_limited_requests_total")
+            self.logger.warning("Rate limit exceeded for %s on %s", identifier, route)
+            headers["Retry-After"] = headers["X-RateLimit-Reset"]
+            return JSONResponse(
+                status_code=429,
+                content={"detail": "Too many requests. Slow down and try again."},
+                headers=headers,
+            )
+        response = await call_next(request)
+        response.headers.update(headers)
+        return response
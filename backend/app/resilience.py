@@ -0,0 +1,311 @@
+"""
+Circuit breakers, a shared retry budget and jittered backoff for providers.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+
+from .config import Settings
+from .logger import get_logger
+from .metrics import MetricsCollector
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose breaker is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} is unavailable; retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker for one provider.
+
+    ``failure_threshold`` consecutive failures open the breaker; calls are
+    then rejected immediately until ``reset_timeout`` has passed, after which
+    a single probe call is let through. The probe's outcome closes the
+    breaker or opens it for another ``reset_timeout``.
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        metrics: Optional[MetricsCollector] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.metrics = metrics or MetricsCollector()
+        self.logger = get_logger(self.__class__.__name__)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.metrics.register_gauge(
+            f"{name}_circuit_state", lambda: self.STATE_VALUES[self.state]
+        )
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def before_call(self) -> None:
+        """Raise `CircuitOpenError` unless a call may go through now."""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            retry_after = max(0.0, self._opened_at + self.reset_timeout - self._clock())
+        self.metrics.increment(f"{self.name}_circuit_rejected_total")
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            self._state = self.CLOSED
+
+    def release(self) -> None:
+        """Forget a call that ended without an outcome (e.g. an abandoned stream).
+
+        Records neither success nor failure; it only frees the half-open
+        probe slot so the next call can probe instead.
+        """
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            probe_failed = self._state == self.HALF_OPEN
+            if not probe_failed and self._failures < self.failure_threshold:
+                return
+            self._state = self.OPEN
+            self._opened_at = self._clock()
+            self._probing = False
+        self.metrics.increment(f"{self.name}_circuit_opened_total")
+        self.logger.warning("Circuit for %s opened", self.name)
+
+
+class RetryBudget:
+    """Caps retries at a fraction of overall traffic, shared by all callers.
+
+    Every first attempt deposits ``ratio`` tokens and every retry spends one,
+    with a small time-based floor so low-traffic processes can still retry.
+    During an outage the budget drains, and further failures surface
+    immediately instead of multiplying load on the provider.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        min_per_second: float = 1.0,
+        burst: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.burst = burst
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._balance = burst
+        self._updated = clock()
+
+    def _refill(self, amount: float) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        self._updated = now
+        self._balance = min(self.burst, self._balance + amount + elapsed * self.min_per_second)
+
+    def record_request(self) -> None:
+        with self._lock:
+            self._refill(self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            self._refill(0.0)
+            if self._balance < 1.0:
+                return False
+            self._balance -= 1.0
+            return True
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff for retry number ``attempt`` (0-based)."""
+    return random.uniform(0.0, min(cap, base * (2**attempt)))
+
+
+def is_retryable(error: BaseException) -> bool:
+    return bool(getattr(error, "retryable", False))
+
+
+class RetryPolicy:
+    """Runs provider calls through a breaker, the retry budget and backoff.
+
+    Only errors flagged ``retryable`` are retried and counted against the
+    breaker; any other error means the provider answered and is re-raised
+    untouched.
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        budget: RetryBudget,
+        max_attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 10.0,
+        retryable: Callable[[BaseException], bool] = is_retryable,
+        metrics: Optional[MetricsCollector] = None,
+    ):
+        self.breaker = breaker
+        self.budget = budget
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retryable = retryable
+        self.metrics = metrics or MetricsCollector()
+
+    def call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        self.budget.record_request()
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as error:
+                self._on_error(error, attempt)
+            else:
+                self.breaker.record_success()
+                return result
+            time.sleep(backoff_delay(attempt, self.base_delay, self.max_delay))
+            attempt += 1
+
+    async def acall(self, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        self.budget.record_request()
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as error:
+                self._on_error(error, attempt)
+            else:
+                self.breaker.record_success()
+                return result
+            await asyncio.sleep(backoff_delay(attempt, self.base_delay, self.max_delay))
+            attempt += 1
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """Breaker bookkeeping for one attempt that cannot be retried (e.g. a stream)."""
+        self.breaker.before_call()
+        try:
+            yield
+        except Exception as error:
+            if self.retryable(error):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        except BaseException:
+            # The consumer abandoned the stream (GeneratorExit) or was
+            # cancelled: the upstream call never finished, so it proves nothing.
+            self.breaker.release()
+            raise
+        else:
+            self.breaker.record_success()
+
+    def _on_error(self, error: Exception, attempt: int) -> None:
+        """Re-raise ``error`` unless another attempt is allowed."""
+        if not self.retryable(error):
+            self.breaker.record_success()
+            raise error
+        self.breaker.record_failure()
+        if attempt + 1 >= self.max_attempts:
+            raise error
+        if not self.budget.try_spend():
+            self.metrics.increment("retry_budget_exhausted_total")
+            raise error
+        self.metrics.increment(f"{self.breaker.name}_retries_total")
+
+
+class Resilience:
+    """Per-provider breakers plus one retry budget for the whole process."""
+
+    def __init__(self, settings: Settings, metrics: Optional[MetricsCollector] = None):
+        self.settings = settings
+        self.metrics = metrics or MetricsCollector()
+        self.budget = RetryBudget(
+            ratio=settings.retry_budget_ratio,
+            min_per_second=settings.retry_budget_min_per_second,
+            burst=settings.retry_budget_burst,
+        )
+        self._policies: Dict[str, RetryPolicy] = {}
+        self._lock = threading.Lock()
+
+    def policy(self, name: str) -> RetryPolicy:
+        """Return the (shared) policy for provider ``name``."""
+        with self._lock:
+            if name not in self._policies:
+                breaker = CircuitBreaker(
+                    name,
+                    failure_threshold=self.settings.circuit_failure_threshold,
+                    reset_timeout=self.settings.circuit_reset_seconds,
+                    metrics=self.metrics,
+                )
+                self._policies[name] = RetryPolicy(
+                    breaker,
+                    self.budget,
+                    max_attempts=self.settings.llm_max_retries,
+                    base_delay=self.settings.llm_backoff_seconds,
+                    max_delay=self.settings.llm_backoff_max_seconds,
+                    metrics=self.metrics,
+                )
+            return self._policies[name]
+
+
+_shared: Optional[Resilience] = None
+_shared_lock = threading.Lock()
+
+
+def install_shared_resilience(resilience: Resilience) -> None:
+    """Make ``resilience`` (normally the app's) the one used by module-level callers."""
+    global _shared
+    with _shared_lock:
+        _shared = resilience
+
+
+def shared_resilience(settings: Settings) -> Resilience:
+    """Return the installed Resilience, creating one from ``settings`` if there is none."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = Resilience(settings)
+        return _shared
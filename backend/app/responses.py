@@ -0,0 +1,144 @@
+"""
+Fast JSON rendering and response compression.
+"""
+
+import gzip
+import json
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .metrics import MetricsCollector
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependency optional
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependency optional
+    brotli = None
+
+# orjson serialises dicts, floats and lists several times faster than the
+# stdlib encoder; fall back to it when orjson is not installed.
+FastJSONResponse = ORJSONResponse if orjson is not None else JSONResponse
+
+
+def model_response(model: BaseModel, status_code: int = 200) -> JSONResponse:
+    """Render an already-validated model without FastAPI re-validating it.
+
+    Returning a response from an endpoint skips the ``response_model``
+    validation and ``jsonable_encoder`` pass, which dominate serialisation
+    time for large quizzes; the model stays in the route for the schema.
+    """
+    return FastJSONResponse(model.dict(), status_code=status_code)
+
+
+class CompressionMiddleware:
+    """Brotli or gzip for complete responses of at least ``minimum_size`` bytes.
+
+    Only responses sent as a single body message are compressed, so
+    streamed bodies such as server-sent events keep flowing chunk by chunk.
+    Brotli is preferred when the client accepts it and the ``brotli``
+    package is installed.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        metrics: Optional[MetricsCollector] = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.metrics = metrics or MetricsCollector()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self.negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        decided = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, decided
+            if decided:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            decided = True
+            if message["type"] != "http.response.body" or start is None:
+                if start is not None:
+                    await send(start)
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or headers.get("content-type", "").startswith("text/event-stream")
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            compressed = self.compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            self.metrics.increment(f"responses_{encoding}_total")
+            self.metrics.increment("response_bytes_saved_total", len(body) - len(compressed))
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def negotiate(accept_encoding: str) -> Optional[str]:
+        """Pick ``br`` or ``gzip`` from an Accept-Encoding header, if either is accepted."""
+        accepted = set()
+        for item in accept_encoding.lower().split(","):
+            name, _, params = item.strip().partition(";")
+            quality = params.strip()
+            if quality.startswith("q="):
+                try:
+                    if float(quality[2:]) <= 0:
+                        continue
+                except ValueError:
+                    continue
+            accepted.add(name.strip())
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+
+def dumps(data: Any) -> str:
+    """Serialise ``data`` to a JSON string with orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data).decode("utf-8")
+    return json.dumps(data)
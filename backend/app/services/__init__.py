@@ -1,6 +1,7 @@
 """Service layer exports."""
 
+from .pipeline import QuizPipeline
 from .quiz_service import QuizService
 from .transcript_service import TranscriptService
 
-__all__ = ["QuizService", "TranscriptService"]
+__all__ = ["QuizPipeline", "QuizService", "TranscriptService"]
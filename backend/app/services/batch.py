@@ -0,0 +1,111 @@
+"""
+Quiz generation for many videos (a list of URLs or a playlist) at once.
+"""
+
+import asyncio
+from typing import AsyncIterator, Callable, List, Optional
+
+from fastapi import HTTPException
+
+from ..concurrency import StageLimits
+from ..logger import get_logger
+from ..metrics import MetricsCollector
+from ..models.schemas import (
+    BatchQuizRequest,
+    BatchVideoResult,
+    Quiz,
+    QuizOptions,
+    QuizResponse,
+)
+from .pipeline import QuizPipeline
+
+# Builds the per-video response from (video_id, transcript, quiz).
+ResultRenderer = Callable[[str, str, List[Quiz]], QuizResponse]
+
+
+class BatchRunner:
+    """Runs the quiz pipeline for every video of a batch concurrently.
+
+    Each video is its own task, and the shared `StageLimits` cap how many
+    transcript fetches, ingestions and generations run at once across all
+    batches. Stages of different videos therefore overlap, while the
+    providers behind each stage see bounded load. A failing video is
+    reported in its result and never fails the batch.
+    """
+
+    def __init__(
+        self,
+        pipeline: QuizPipeline,
+        limits: StageLimits,
+        metrics: Optional[MetricsCollector] = None,
+    ):
+        self.pipeline = pipeline
+        self.limits = limits
+        self.settings = pipeline.settings
+        self.metrics = metrics or MetricsCollector()
+        self.logger = get_logger(self.__class__.__name__)
+
+    async def resolve(self, request: BatchQuizRequest) -> List[str]:
+        """Video IDs of the batch in request order, without repeats."""
+        limit = max(1, self.settings.batch_max_videos)
+        transcripts = self.pipeline.transcripts
+        if request.playlist_url:
+            video_ids = await self.pipeline.executors.run_io(
+                transcripts.resolve_playlist, request.playlist_url, limit
+            )
+        else:
+            if len(request.youtube_urls) > limit:
+                raise HTTPException(
+                    status_code=400, detail=f"A batch can contain at most {limit} videos."
+                )
+            video_ids = [transcripts.extract_video_id(url) for url in request.youtube_urls]
+        return list(dict.fromkeys(video_ids))
+
+    async def run(
+        self,
+        video_ids: List[str],
+        request: QuizOptions,
+        render: ResultRenderer,
+    ) -> AsyncIterator[BatchVideoResult]:
+        """Yield one result per video, in completion order."""
+        self.metrics.increment("batch_videos_total", len(video_ids))
+
+        async def run_video(index: int, video_id: str) -> BatchVideoResult:
+            try:
+                transcript, quiz = await self.pipeline.generate(
+                    video_id,
+                    request.num_questions,
+                    request.difficulty,
+                    fresh=request.fresh,
+                    difficulty_mix=request.difficulty_mix,
+                    limits=self.limits,
+                )
+            except Exception as error:
+                status_code = getattr(error, "status_code", 500)
+                detail = getattr(error, "detail", None) or str(error)
+                self.logger.warning("Batch video %s failed: %s", video_id, detail)
+                self.metrics.increment("batch_video_failures_total")
+                return BatchVideoResult(
+                    index=index,
+                    video_id=video_id,
+                    status="failed",
+                    error=str(detail),
+                    status_code=status_code,
+                )
+            return BatchVideoResult(
+                index=index,
+                video_id=video_id,
+                status="completed",
+                result=render(video_id, transcript, quiz),
+            )
+
+        tasks = [
+            asyncio.ensure_future(run_video(index, video_id))
+            for index, video_id in enumerate(video_ids)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
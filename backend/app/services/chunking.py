@@ -0,0 +1,115 @@
+"""
+Time-based transcript chunking and question allocation for map-reduce generation.
+
+`chunk_transcript` and `normalize_mix` are the production versions of the
+helpers in the legacy `utlis.py` module.
+"""
+
+from typing import Any, Dict, Iterable, List, Union
+
+from .transcript import Transcript, as_transcript
+
+TranscriptLike = Union[Transcript, Iterable[Dict[str, Any]]]
+
+DIFFICULTY_ORDER = ["easy", "medium", "hard"]
+
+
+def chunk_transcript(
+    transcript: TranscriptLike, max_chunk_seconds: int = 180
+) -> List[Dict[str, Any]]:
+    """Combine adjacent segments into chunks about ``max_chunk_seconds`` long.
+
+    Accepts a `Transcript` or ``{"text", "start", "duration"}`` dicts. Chunks
+    are ``{"text", "start", "end", "segments"}`` dicts, where ``segments`` is
+    the ``(first, last)`` index range; each chunk's text is one slice of the
+    transcript buffer.
+    """
+    transcript = as_transcript(transcript)
+    starts, durations = transcript.starts, transcript.durations
+    chunks: List[Dict[str, Any]] = []
+    first = 0
+    for index in range(len(transcript)):
+        if starts[index] + durations[index] - starts[first] >= max_chunk_seconds:
+            chunks.append(_chunk(transcript, first, index + 1))
+            first = index + 1
+    if first < len(transcript):
+        chunks.append(_chunk(transcript, first, len(transcript)))
+    return chunks
+
+
+def _chunk(transcript: Transcript, first: int, last: int) -> Dict[str, Any]:
+    start, end = transcript.time_span(first, last)
+    return {
+        "text": transcript.text_range(first, last).strip(),
+        "start": start,
+        "end": end,
+        "segments": (first, last),
+    }
+
+
+def normalize_mix(total: int, mix: Dict[str, int]) -> List[str]:
+    """Convert a difficulty mix into a list of ``total`` difficulty names."""
+    counts = {key: max(0, int(mix.get(key, 0))) for key in DIFFICULTY_ORDER}
+    requested = sum(counts.values())
+    if requested == 0:
+        counts = {"easy": 0, "medium": total, "hard": 0}
+    elif requested != total:
+        scaled = {key: int(round(counts[key] * total / requested)) for key in DIFFICULTY_ORDER}
+        while sum(scaled.values()) < total:
+            key = max(DIFFICULTY_ORDER, key=lambda k: counts[k] * total / requested - scaled[k])
+            scaled[key] += 1
+        while sum(scaled.values()) > total:
+            key = max(
+                (k for k in DIFFICULTY_ORDER if scaled[k] > 0),
+                key=lambda k: scaled[k] - counts[k] * total / requested,
+            )
+            scaled[key] -= 1
+        counts = scaled
+
+    result: List[str] = []
+    for key in DIFFICULTY_ORDER:
+        result += [key] * counts[key]
+    return result
+
+
+def interleave_difficulties(difficulties: List[str]) -> List[str]:
+    """Order difficulties so each level is spread evenly across the sequence."""
+    positioned = []
+    for key in DIFFICULTY_ORDER:
+        items = [d for d in difficulties if d == key]
+        positioned += [((idx + 0.5) / len(items), key) for idx in range(len(items))]
+    return [key for _, key in sorted(positioned, key=lambda item: item[0])]
+
+
+def plan_chunks(
+    transcript: TranscriptLike, difficulties: List[str], max_chunk_seconds: int
+) -> List[Dict[str, Any]]:
+    """Split a transcript into chunks and assign each chunk its questions.
+
+    When there are more time chunks than questions, neighbouring chunks are
+    merged so every question still covers a contiguous slice and the whole
+    video is covered. Returns chunks with an extra ``difficulties`` list;
+    chunks without questions are dropped.
+    """
+    transcript = as_transcript(transcript)
+    chunks = chunk_transcript(transcript, max_chunk_seconds)
+    total = len(difficulties)
+    if not chunks or not total:
+        return []
+
+    if len(chunks) > total:
+        chunks = [
+            _chunk(transcript, members[0]["segments"][0], members[-1]["segments"][1])
+            for members in (
+                chunks[group * len(chunks) // total : (group + 1) * len(chunks) // total]
+                for group in range(total)
+            )
+        ]
+
+    for chunk in chunks:
+        chunk["difficulties"] = []
+    # Question i goes to the chunk at the matching relative position, so
+    # questions spread over the whole video when chunks outnumber them.
+    for idx, difficulty in enumerate(interleave_difficulties(difficulties)):
+        chunks[idx * len(chunks) // total]["difficulties"].append(difficulty)
+    return [chunk for chunk in chunks if chunk["difficulties"]]
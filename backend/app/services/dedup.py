@@ -0,0 +1,140 @@
+"""
+Near-duplicate question detection with MinHash signatures and LSH buckets.
+"""
+
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+from ..metrics import MetricsCollector
+from ..models.schemas import Quiz
+
+T = TypeVar("T")
+
+_WORD_RE = re.compile(r"\w+")
+SHINGLE_BYTES = 4
+# Questions are fingerprinted this many at a time, bounding the
+# ``shingles x permutations`` matrix.
+_BATCH = 256
+
+
+def question_fingerprint(question: Quiz) -> str:
+    """Text compared for duplicates: the stem, the options and the answer.
+
+    Questions cut from one template ("... of binary search?" / "... of
+    linear search?") differ in only a word of the stem, but their answers
+    tell them apart.
+    """
+    return " ".join([question.question, *question.options, question.correct_answer])
+
+
+def _normalize(text: str) -> bytes:
+    return " ".join(_WORD_RE.findall(text.lower())).encode("utf-8").ljust(SHINGLE_BYTES)
+
+
+class QuestionIndex:
+    """Accepts questions unless they nearly duplicate one already accepted.
+
+    Each question gets a MinHash signature of ``num_perm`` hashes over its
+    byte shingles; the fraction of equal hashes estimates the Jaccard
+    similarity of two questions. Signatures are split into ``bands`` LSH
+    bands, so a new question is only compared (as one vectorised row
+    comparison) against accepted questions sharing a band, never against
+    the whole pool. Rejections are counted in ``questions_deduplicated_total``.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        num_perm: int = 64,
+        bands: int = 16,
+        seed: int = 7,
+        metrics: Optional[MetricsCollector] = None,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.metrics = metrics or MetricsCollector()
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashes (high half of a * shingle + b, a odd) stand
+        # in for random permutations.
+        self._a = rng.integers(1, 1 << 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+        self._signatures = np.empty((64, num_perm), dtype=np.uint32)
+        self._count = 0
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        """MinHash signatures, one row per text.
+
+        The 4-byte shingles of a whole batch are read as one strided array
+        and hashed with multiply-shift hashes, so there is no per-shingle
+        Python work.
+        """
+        result = np.empty((len(texts), len(self._a)), dtype=np.uint32)
+        for start in range(0, len(texts), _BATCH):
+            batch = [_normalize(text) for text in texts[start : start + _BATCH]]
+            data = np.frombuffer(b"".join(batch), dtype=np.uint8).astype(np.uint64)
+            lengths = np.fromiter((len(item) for item in batch), dtype=np.int64, count=len(batch))
+            counts = lengths - SHINGLE_BYTES + 1
+            bounds = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            # Position of every shingle that lies entirely inside one text.
+            offsets = np.cumsum(lengths) - lengths - bounds
+            positions = np.arange(counts.sum()) + np.repeat(offsets, counts)
+            values = (
+                (data[positions] << 24)
+                | (data[positions + 1] << 16)
+                | (data[positions + 2] << 8)
+                | data[positions + 3]
+            )
+            # uint64 arithmetic wraps, which is what multiply-shift hashing expects.
+            hashed = ((self._a[:, None] * values + self._b[:, None]) >> 32).astype(np.uint32)
+            result[start : start + len(batch)] = np.minimum.reduceat(hashed, bounds, axis=1).T
+        return result
+
+    def add_many(self, texts: Sequence[str]) -> np.ndarray:
+        """Add each text unless it duplicates an accepted one; returns the accepted mask."""
+        accepted = np.zeros(len(texts), dtype=bool)
+        if not texts:
+            return accepted
+        signatures = self.signatures(texts)
+        band_keys = (
+            signatures.reshape(len(texts), self.bands, -1)
+            .view(np.dtype((np.void, signatures.itemsize * signatures.shape[1] // self.bands)))
+            .reshape(len(texts), self.bands)
+            .tolist()
+        )
+        for row, signature in enumerate(signatures):
+            keys = list(enumerate(band_keys[row]))
+            candidates = {idx for key in keys for idx in self._buckets.get(key, ())}
+            if candidates and self._max_similarity(signature, candidates) >= self.threshold:
+                continue
+            accepted[row] = True
+            self._store(signature, keys)
+        self.metrics.increment("questions_deduplicated_total", int(len(texts) - accepted.sum()))
+        return accepted
+
+    def unique(
+        self, items: Iterable[T], key: Callable[[T], str] = question_fingerprint
+    ) -> List[T]:
+        """The items that `add_many` accepts, in their original order."""
+        items = list(items)
+        mask = self.add_many([key(item) for item in items])
+        return [item for item, keep in zip(items, mask, strict=True) if keep]
+
+    def _max_similarity(self, signature: np.ndarray, candidates: Iterable[int]) -> float:
+        rows = self._signatures[np.fromiter(candidates, dtype=np.int64)]
+        return float((rows == signature).mean(axis=1).max())
+
+    def _store(self, signature: np.ndarray, keys: List[Tuple[int, bytes]]) -> None:
+        if self._count == len(self._signatures):
+            self._signatures = np.concatenate([self._signatures, np.empty_like(self._signatures)])
+        self._signatures[self._count] = signature
+        for key in keys:
+            self._buckets.setdefault(key, []).append(self._count)
+        self._count += 1
@@ -0,0 +1,229 @@
+"""
+Text-generation providers behind one interface.
+"""
+
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..config import Settings
+from ..lazy import LazyModule
+from ..logger import get_logger
+from ..resilience import RetryPolicy
+
+httpx = LazyModule("httpx")
+
+
+class LLMError(RuntimeError):
+    """A provider call failed. ``retryable`` marks transient failures."""
+
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class LLMProvider(ABC):
+    """Turns a prompt into model text.
+
+    `complete` blocks and is meant for worker threads; `acomplete` is its
+    event-loop counterpart. Providers without native streaming yield the
+    whole completion as a single chunk. Calls go through ``policy`` (circuit
+    breaker, retry budget and jittered backoff); streams are not retried.
+    Take the policy from the process's shared `Resilience` so breakers and
+    the retry budget are not split across instances.
+    """
+
+    name = "base"
+
+    def __init__(self, model_name: str, policy: RetryPolicy):
+        self.model_name = model_name
+        self.policy = policy
+
+    @abstractmethod
+    def complete(self, prompt: str, system: Optional[str] = None) -> str:
+        """Return the full completion for ``prompt``."""
+
+    async def acomplete(self, prompt: str, system: Optional[str] = None) -> str:
+        return await asyncio.to_thread(self.complete, prompt, system)
+
+    def stream(self, prompt: str, system: Optional[str] = None) -> Iterator[str]:
+        yield self.complete(prompt, system)
+
+    def close(self) -> None:
+        """Release pooled connections (nothing to release by default)."""
+        return None
+
+    async def aclose(self) -> None:
+        self.close()
+
+
+class GeminiProvider(LLMProvider):
+    """Wraps a configured ``google.generativeai.GenerativeModel``."""
+
+    name = "gemini"
+
+    def __init__(self, model, model_name: str, policy: RetryPolicy):
+        super().__init__(model_name, policy)
+        self.model = model
+
+    def complete(self, prompt: str, system: Optional[str] = None) -> str:
+        return self.policy.call(self._complete, _with_system(prompt, system))
+
+    def _complete(self, prompt: str) -> str:
+        try:
+            return self.model.generate_content(prompt).text.strip()
+        except Exception as error:
+            raise as_llm_error(error) from error
+
+    def stream(self, prompt: str, system: Optional[str] = None) -> Iterator[str]:
+        with self.policy.guard():
+            try:
+                for chunk in self.model.generate_content(
+                    _with_system(prompt, system), stream=True
+                ):
+                    yield chunk.text
+            except Exception as error:
+                raise as_llm_error(error) from error
+
+
+class DeepSeekProvider(LLMProvider):
+    """OpenAI-compatible chat completions over pooled keep-alive connections.
+
+    One `httpx.Client` and one `httpx.AsyncClient` are shared by every call,
+    so fanning out per-chunk requests reuses warm TCP+TLS connections instead
+    of handshaking each time. Transport errors, 429 and 5xx are marked
+    retryable for the policy; the async variant backs off with
+    `asyncio.sleep` so it never blocks the event loop.
+    """
+
+    name = "deepseek"
+    COMPLETIONS_PATH = "/v1/chat/completions"
+
+    def __init__(
+        self,
+        settings: Settings,
+        policy: RetryPolicy,
+        client: Optional["httpx.Client"] = None,
+        async_client: Optional["httpx.AsyncClient"] = None,
+    ):
+        super().__init__(settings.deepseek_model, policy)
+        self.settings = settings
+        self.logger = get_logger(self.__class__.__name__)
+        self.temperature = 0.2
+        self.max_tokens = 1200
+        options = self._client_options()
+        self.client = client or httpx.Client(**options)
+        self._async_client = async_client
+        self._async_options = options
+
+    def _client_options(self) -> Dict[str, Any]:
+        return {
+            "base_url": self.settings.deepseek_base_url.rstrip("/"),
+            "headers": {"Authorization": f"Bearer {self.settings.deepseek_api_key}"},
+            "timeout": httpx.Timeout(
+                self.settings.llm_timeout_seconds,
+                connect=self.settings.llm_connect_timeout_seconds,
+            ),
+            "limits": httpx.Limits(
+                max_connections=self.settings.llm_max_connections,
+                max_keepalive_connections=self.settings.llm_max_keepalive_connections,
+                keepalive_expiry=self.settings.llm_keepalive_seconds,
+            ),
+        }
+
+    @property
+    def async_client(self) -> "httpx.AsyncClient":
+        # Created lazily so it binds to the loop that first uses it.
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(**self._async_options)
+        return self._async_client
+
+    def complete(self, prompt: str, system: Optional[str] = None) -> str:
+        return self.policy.call(self._post, self._payload(prompt, system))
+
+    async def acomplete(self, prompt: str, system: Optional[str] = None) -> str:
+        return await self.policy.acall(self._apost, self._payload(prompt, system))
+
+    def _post(self, payload: Dict[str, Any]) -> str:
+        try:
+            response = self.client.post(self.COMPLETIONS_PATH, json=payload)
+        except httpx.TransportError as error:
+            raise LLMError(f"DeepSeek request failed: {error}", retryable=True) from error
+        return self._content(response)
+
+    async def _apost(self, payload: Dict[str, Any]) -> str:
+        try:
+            response = await self.async_client.post(self.COMPLETIONS_PATH, json=payload)
+        except httpx.TransportError as error:
+            raise LLMError(f"DeepSeek request failed: {error}", retryable=True) from error
+        return self._content(response)
+
+    def _payload(self, prompt: str, system: Optional[str]) -> Dict[str, Any]:
+        messages: List[Dict[str, str]] = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": prompt})
+        return {
+            "model": self.model_name,
+            "messages": messages,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+        }
+
+    @staticmethod
+    def _content(response: "httpx.Response") -> str:
+        if response.status_code == 429 or response.status_code >= 500:
+            raise LLMError(
+                f"DeepSeek server error {response.status_code}: {response.text[:200]}",
+                retryable=True,
+            )
+        if response.status_code != 200:
+            raise LLMError(f"DeepSeek API error {response.status_code}: {response.text[:500]}")
+        data = response.json()
+        choices = data.get("choices") if isinstance(data, dict) else None
+        if choices and isinstance(choices[0], dict):
+            first = choices[0]
+            message = first.get("message") or {}
+            if message.get("content"):
+                return message["content"]
+            if first.get("text"):
+                return first["text"]
+        if isinstance(data, dict) and (data.get("output_text") or data.get("output")):
+            return data.get("output_text") or data.get("output")
+        raise LLMError(
+            "DeepSeek returned unexpected response structure: " + json.dumps(data)[:1000]
+        )
+
+    def close(self) -> None:
+        self.client.close()
+
+    async def aclose(self) -> None:
+        self.client.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+
+
+def _with_system(prompt: str, system: Optional[str]) -> str:
+    return f"{system}\n\n{prompt}" if system else prompt
+
+
+# google.api_core exception names that signal a transient provider problem.
+TRANSIENT_GOOGLE_ERRORS = {
+    "DeadlineExceeded",
+    "InternalServerError",
+    "ResourceExhausted",
+    "RetryError",
+    "ServiceUnavailable",
+    "TooManyRequests",
+}
+
+
+def as_llm_error(error: Exception) -> LLMError:
+    """Wrap a Gemini SDK error, marking transient ones retryable."""
+    if isinstance(error, LLMError):
+        return error
+    retryable = isinstance(error, (ConnectionError, TimeoutError)) or (
+        type(error).__name__ in TRANSIENT_GOOGLE_ERRORS
+    )
+    return LLMError(f"{type(error).__name__}: {error}", retryable=retryable)
@@ -0,0 +1,401 @@
+"""
+End-to-end quiz pipeline shared by the HTTP endpoints.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from ..concurrency import ExecutorPools, SingleFlight, StageLimits
+from ..logger import get_logger
+from ..metrics import MetricsCollector
+from ..models.schemas import Quiz
+from ..storage.vector_store import VectorStore
+from .chunking import normalize_mix, plan_chunks
+from .dedup import QuestionIndex
+from .quiz_service import QuizService
+from .transcript import Transcript
+from .transcript_service import TranscriptService
+
+# Receives (stage, progress in [0, 1]) updates from a running pipeline.
+StageReporter = Callable[[str, float], Awaitable[None]]
+
+_UNLIMITED = StageLimits()
+
+STAGE_PROGRESS = {
+    "fetching_transcript": 0.1,
+    "transcribing": 0.3,
+    "embedding": 0.6,
+    "generating": 0.7,
+}
+
+
+class QuizPipeline:
+    """Runs transcript fetch, ingestion and generation without blocking the loop.
+
+    Concurrent requests for the same video share one transcript fetch, and
+    identical quiz requests (video, question count, difficulty) share one
+    ingestion + generation run.
+
+    Transcripts longer than ``map_reduce_threshold_chars`` (or requests with a
+    difficulty mix) are split into time-bounded chunks whose questions are
+    generated concurrently, so latency follows the slowest chunk rather than
+    the length of the video.
+    """
+
+    MIN_TRANSCRIPT_CHARS = 100
+
+    def __init__(
+        self,
+        transcripts: TranscriptService,
+        quiz_service: QuizService,
+        storage: VectorStore,
+        executors: ExecutorPools,
+        metrics: Optional[MetricsCollector] = None,
+    ):
+        self.transcripts = transcripts
+        self.quiz_service = quiz_service
+        self.storage = storage
+        self.executors = executors
+        self.settings = quiz_service.settings
+        self.metrics = metrics or MetricsCollector()
+        self.logger = get_logger(self.__class__.__name__)
+        self._transcript_flights = SingleFlight("transcript", self.metrics)
+        self._quiz_flights = SingleFlight("quiz", self.metrics)
+
+    async def get_transcript(
+        self, video_id: str, report: Optional[StageReporter] = None
+    ) -> str:
+        transcript = await self.get_segments(video_id, report)
+        return transcript.text
+
+    async def get_segments(
+        self, video_id: str, report: Optional[StageReporter] = None
+    ) -> Transcript:
+        async def on_stage(stage: str) -> None:
+            await _report(report, stage)
+
+        return await self._transcript_flights.run(
+            video_id,
+            lambda: self.transcripts.get_segments_async(
+                video_id, self.executors, on_stage=on_stage
+            ),
+        )
+
+    async def generate(
+        self,
+        video_id: str,
+        num_questions: int,
+        difficulty: str,
+        fresh: bool = False,
+        report: Optional[StageReporter] = None,
+        difficulty_mix: Optional[Dict[str, int]] = None,
+        limits: Optional[StageLimits] = None,
+    ) -> Tuple[str, List[Quiz]]:
+        """Run (or join) the pipeline for one quiz request.
+
+        Stage updates go to the ``report`` of the request that started the
+        run; requests that join an in-flight run only see its result.
+        ``limits`` bounds the ``transcript``, ``ingest`` and ``generation``
+        stages (used by batch runs).
+        """
+        mix_key = tuple(sorted((difficulty_mix or {}).items()))
+        return await self._quiz_flights.run(
+            (video_id, num_questions, difficulty, fresh, mix_key),
+            lambda: self._generate(
+                video_id, num_questions, difficulty, fresh, report, difficulty_mix, limits
+            ),
+        )
+
+    async def _generate(
+        self,
+        video_id: str,
+        num_questions: int,
+        difficulty: str,
+        fresh: bool,
+        report: Optional[StageReporter],
+        difficulty_mix: Optional[Dict[str, int]],
+        limits: Optional[StageLimits] = None,
+    ) -> Tuple[str, List[Quiz]]:
+        limits = limits or _UNLIMITED
+        await _report(report, "fetching_transcript")
+        async with limits.hold("transcript"):
+            timed = await self._get_usable_segments(video_id, report)
+        transcript = timed.text
+
+        async def ingest() -> None:
+            async with limits.hold("ingest"):
+                await self._ingest(timed, video_id)
+            await _report(report, "generating")
+
+        async def generation() -> List[Quiz]:
+            async with limits.hold("generation"):
+                if self._use_map_reduce(transcript, difficulty_mix):
+                    return await self._map_reduce(
+                        timed,
+                        self._difficulties(num_questions, difficulty, difficulty_mix),
+                        fresh,
+                    )
+                return await self._single(timed, num_questions, difficulty, fresh)
+
+        # Ingestion and generation are independent, so overlap them.
+        await _report(report, "embedding")
+        _, quiz = await asyncio.gather(ingest(), generation())
+        return transcript, quiz
+
+    async def stream(
+        self,
+        video_id: str,
+        num_questions: int,
+        difficulty: str,
+        fresh: bool = False,
+        difficulty_mix: Optional[Dict[str, int]] = None,
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Yield ``(event, data)`` pairs for a streamed quiz.
+
+        Stage events come first, then one ``question`` event per question as
+        soon as the model has produced it, then ``done``. Ingestion runs in the
+        background and does not delay the first question.
+        """
+        yield "stage", {"stage": "fetching_transcript"}
+        timed = await self._get_usable_segments(video_id)
+        transcript = timed.text
+        yield "stage", {"stage": "transcript_ready", "characters": len(transcript)}
+
+        ingestion = asyncio.ensure_future(self._ingest(timed, video_id))
+        yield "stage", {"stage": "generation_started"}
+        plan: Optional[List[Dict[str, Any]]] = None
+        if self._use_map_reduce(transcript, difficulty_mix):
+            plan = plan_chunks(
+                timed,
+                self._difficulties(num_questions, difficulty, difficulty_mix),
+                self.settings.map_chunk_seconds,
+            )
+            questions = self._iterate_chunk_questions(plan, fresh)
+        else:
+            questions = self.executors.iterate_io(
+                self.quiz_service.stream_quiz,
+                timed,
+                num_questions,
+                difficulty,
+                fresh=fresh,
+            )
+        dedup = self._question_index()
+        accepted: List[Quiz] = []
+        try:
+            async for question in questions:
+                if not dedup.unique([question]):
+                    continue
+                yield "question", {"index": len(accepted), **question.dict()}
+                accepted.append(question)
+            for question in await self._top_up(
+                timed, num_questions, difficulty, plan, accepted, dedup, fresh
+            ):
+                yield "question", {"index": accepted.index(question), **question.dict()}
+        finally:
+            # Let ingestion finish on its own even if the client disconnected.
+            ingestion.add_done_callback(lambda task: task.cancelled() or task.exception())
+        yield "done", {"count": len(accepted)}
+
+    async def _get_usable_segments(
+        self, video_id: str, report: Optional[StageReporter] = None
+    ) -> Transcript:
+        transcript = await self.get_segments(video_id, report)
+        if len(transcript.text) < self.MIN_TRANSCRIPT_CHARS:
+            raise HTTPException(
+                status_code=400, detail="Transcript too short or unavailable."
+            )
+        return transcript
+
+    async def _ingest(self, transcript: Transcript, video_id: str) -> None:
+        await self.executors.run_io(
+            self.storage.store_transcript,
+            transcript,
+            video_id,
+            self.quiz_service.get_batch_embedding_fn(),
+        )
+
+    def _use_map_reduce(self, transcript: str, difficulty_mix: Optional[Dict[str, int]]) -> bool:
+        return bool(difficulty_mix) or len(transcript) > self.settings.map_reduce_threshold_chars
+
+    @staticmethod
+    def _difficulties(
+        num_questions: int, difficulty: str, difficulty_mix: Optional[Dict[str, int]]
+    ) -> List[str]:
+        return normalize_mix(num_questions, difficulty_mix or {difficulty: num_questions})
+
+    async def _map_reduce(
+        self, transcript: Transcript, difficulties: List[str], fresh: bool
+    ) -> List[Quiz]:
+        plan = plan_chunks(transcript, difficulties, self.settings.map_chunk_seconds)
+        produced = [question async for question in self._iterate_chunk_questions(plan, fresh)]
+        dedup = self._question_index()
+        quiz = dedup.unique(sorted(produced, key=_time_start))
+        await self._top_up(transcript, len(difficulties), "", plan, quiz, dedup, fresh)
+        return sorted(quiz, key=_time_start)
+
+    async def _single(
+        self, transcript: Transcript, num_questions: int, difficulty: str, fresh: bool
+    ) -> List[Quiz]:
+        produced = await self.executors.run_io(
+            self.quiz_service.generate_quiz,
+            transcript=transcript,
+            num_questions=num_questions,
+            difficulty=difficulty,
+            fresh=fresh,
+        )
+        dedup = self._question_index()
+        quiz = dedup.unique(produced)
+        await self._top_up(transcript, num_questions, difficulty, None, quiz, dedup, fresh)
+        return quiz
+
+    def _question_index(self) -> QuestionIndex:
+        return QuestionIndex(self.settings.question_dedup_threshold, metrics=self.metrics)
+
+    async def _top_up(
+        self,
+        transcript: Transcript,
+        num_questions: int,
+        difficulty: str,
+        plan: Optional[List[Dict[str, Any]]],
+        accepted: List[Quiz],
+        dedup: QuestionIndex,
+        fresh: bool,
+    ) -> List[Quiz]:
+        """Replace questions dropped as near-duplicates (or never produced).
+
+        Each of at most ``question_topup_rounds`` rounds asks only for the
+        shortfall: per chunk for a map-reduce ``plan`` (always measured
+        against the original plan), otherwise for the whole quiz. New
+        questions are appended to ``accepted`` and returned. A round that
+        fails or adds nothing new ends the top-up. Each round is cached under
+        its own key, so replaying a cached request (e.g. one pre-generated
+        offline) repeats the whole top-up without model calls.
+        """
+        added: List[Quiz] = []
+        for topup_round in range(1, self.settings.question_topup_rounds + 1):
+            try:
+                if plan is not None:
+                    shortfall = _shortfall_plan(plan, accepted)
+                    if not shortfall or len(accepted) >= num_questions:
+                        break
+                    more = sorted(
+                        [
+                            question
+                            async for question in self._iterate_chunk_questions(
+                                shortfall, fresh, topup_round
+                            )
+                        ],
+                        key=_time_start,
+                    )
+                else:
+                    missing = num_questions - len(accepted)
+                    if missing <= 0:
+                        break
+                    more = await self.executors.run_io(
+                        self.quiz_service.generate_quiz,
+                        transcript=transcript,
+                        num_questions=missing,
+                        difficulty=difficulty,
+                        fresh=fresh,
+                        topup_round=topup_round,
+                    )
+                    more = more[:missing]
+            except HTTPException as error:
+                self.logger.warning("Question top-up failed: %s", error.detail)
+                break
+            self.metrics.increment("question_topups_total")
+            new = dedup.unique(more)
+            if not new:
+                break
+            accepted.extend(new)
+            added.extend(new)
+        return added
+
+    async def _iterate_chunk_questions(
+        self, plan: List[Dict[str, Any]], fresh: bool, topup_round: int = 0
+    ) -> AsyncIterator[Quiz]:
+        """Generate every chunk concurrently and yield questions as chunks finish.
+
+        A failing chunk is logged, counted in ``map_reduce_chunk_failures_total``
+        and skipped; if every chunk fails, the first error is raised. Questions
+        a chunk was asked for but did not return are counted in
+        ``map_reduce_questions_missing_total``.
+        """
+        semaphore = asyncio.Semaphore(max(1, self.settings.map_concurrency))
+
+        async def run_chunk(chunk: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Quiz]]:
+            async with semaphore:
+                return chunk, await self.executors.run_io(
+                    self.quiz_service.generate_chunk_quiz,
+                    chunk["text"],
+                    chunk["start"],
+                    chunk["end"],
+                    chunk["difficulties"],
+                    fresh=fresh,
+                    topup_round=topup_round,
+                )
+
+        self.metrics.increment("map_reduce_chunks_total", len(plan))
+        tasks = [asyncio.ensure_future(run_chunk(chunk)) for chunk in plan]
+        errors: List[BaseException] = []
+        produced = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    chunk, questions = await next_done
+                except Exception as error:
+                    self.logger.warning(
+                        "Chunk generation failed: %s", getattr(error, "detail", None) or error
+                    )
+                    self.metrics.increment("map_reduce_chunk_failures_total")
+                    errors.append(error)
+                    continue
+                missing = len(chunk["difficulties"]) - len(questions)
+                if missing > 0:
+                    self.logger.warning(
+                        "Chunk %.0f-%.0fs returned %d of %d questions",
+                        chunk["start"],
+                        chunk["end"],
+                        len(questions),
+                        len(chunk["difficulties"]),
+                    )
+                    self.metrics.increment("map_reduce_questions_missing_total", missing)
+                for question in questions:
+                    produced += 1
+                    yield question
+        finally:
+            for task in tasks:
+                task.cancel()
+        if errors and not produced:
+            raise errors[0]
+
+
+def _time_start(question: Quiz) -> float:
+    return question.time_start or 0.0
+
+
+def _shortfall_plan(plan: List[Dict[str, Any]], accepted: List[Quiz]) -> List[Dict[str, Any]]:
+    """Chunks of ``plan`` with the difficulties their accepted questions still lack.
+
+    A question only fills the difficulty it carries; one at a difficulty the
+    chunk did not ask for leaves the chunk's other slots open.
+    """
+    produced: Dict[Optional[float], List[Optional[str]]] = {}
+    for question in accepted:
+        produced.setdefault(question.time_start, []).append(question.difficulty)
+    shortfall = []
+    for chunk in plan:
+        missing = list(chunk["difficulties"])
+        for difficulty in produced.get(chunk["start"], []):
+            if difficulty in missing:
+                missing.remove(difficulty)
+        if missing:
+            shortfall.append({**chunk, "difficulties": missing})
+    return shortfall
+
+
+async def _report(report: Optional[StageReporter], stage: str) -> None:
+    if report:
+        await report(stage, STAGE_PROGRESS[stage])
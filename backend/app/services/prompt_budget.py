@@ -0,0 +1,175 @@
+"""
+Fit transcripts into a prompt token budget by extractive compression.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from ..metrics import RATIO_BUCKETS, MetricsCollector
+from .transcript import Transcript
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+_WORD_RE = re.compile(r"\w+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_ANNOTATIONS = r"(?:music|applause|laughter|laughs|inaudible|silence|noise|cheering|foreign)"
+# Caption annotations such as "[Music]", "[upbeat music]", "(applause)" or
+# "♪"; other bracketed text ("a[i]") is content.
+_MARKER_RE = re.compile(
+    rf"\[(?:\w+\s+){{0,2}}{_ANNOTATIONS}\]|\({_ANNOTATIONS}\)|[♪♫]+", re.IGNORECASE
+)
+_HESITATION_RE = re.compile(r"\b(?:um+|uh+|erm+|hmm+)\b[,.]?\s*", re.IGNORECASE)
+# A short phrase repeated back to back ("you know you know"), or a stutter on
+# a word that is never doubled in writing ("the the"). Other doubled words
+# ("had had", "1 1 0", "bye bye") are left alone.
+_REPEAT_RE = re.compile(r"\b(\w+(?:\s+\w+){1,3}|the|an?|and|i|we)(?:[\s,]+\1\b)+", re.IGNORECASE)
+_SPACES_RE = re.compile(r"\s+")
+
+# Units of unpunctuated captions are cut to about this many words.
+UNIT_WORDS = 40
+# Part of the budget reserved per stretch of the video, so every part of it
+# is represented; the rest goes to the best-scoring units anywhere.
+COVERAGE_BUCKETS = 8
+COVERAGE_SHARE = 0.6
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate subword-token count without a tokenizer.
+
+    Each punctuation mark counts as one token and each word as one token per
+    six characters (rounded up), a close enough match for SentencePiece/BPE
+    counts on English captions to size prompts.
+    """
+    return sum(
+        1 + (len(piece) - 1) // 6 if piece[0].isalnum() or piece[0] == "_" else 1
+        for piece in _PIECE_RE.findall(text)
+    )
+
+
+def strip_filler(text: str) -> str:
+    """Remove caption markers, hesitations and immediately repeated phrases."""
+    text = _MARKER_RE.sub(" ", text)
+    text = _HESITATION_RE.sub("", text)
+    text = _REPEAT_RE.sub(r"\1", text)
+    return _SPACES_RE.sub(" ", text).strip()
+
+
+def split_units(text: str, unit_words: int = UNIT_WORDS) -> List[str]:
+    """Sentences, with unpunctuated runs cut into ``unit_words``-word pieces."""
+    units = []
+    for sentence in _SENTENCE_RE.split(text):
+        words = sentence.split()
+        for start in range(0, len(words), unit_words):
+            units.append(" ".join(words[start : start + unit_words]))
+    return units
+
+
+def centrality_scores(units: List[str]) -> np.ndarray:
+    """Cosine similarity of each unit's TF-IDF vector to the document centroid.
+
+    The term-unit matrix is kept in coordinate form, so scoring is a few
+    ``bincount`` passes rather than a dense ``units x vocabulary`` matrix.
+    """
+    vocabulary: Dict[str, int] = {}
+    rows: List[int] = []
+    cols: List[int] = []
+    for row, unit in enumerate(units):
+        for word in _WORD_RE.findall(unit.lower()):
+            rows.append(row)
+            cols.append(vocabulary.setdefault(word, len(vocabulary)))
+    if not rows:
+        return np.zeros(len(units))
+
+    # Collapse repeated (unit, term) pairs into term frequencies.
+    pairs, counts = np.unique(
+        np.asarray(rows, dtype=np.int64) * len(vocabulary) + np.asarray(cols, dtype=np.int64),
+        return_counts=True,
+    )
+    rows_array, cols_array = np.divmod(pairs, len(vocabulary))
+    document_frequency = np.bincount(cols_array, minlength=len(vocabulary))
+    idf = np.log((1 + len(units)) / (1 + document_frequency)) + 1.0
+    weights = (1.0 + np.log(counts)) * idf[cols_array]
+
+    centroid = np.bincount(cols_array, weights=weights, minlength=len(vocabulary))
+    centroid /= np.linalg.norm(centroid) or 1.0
+    dots = np.bincount(rows_array, weights=weights * centroid[cols_array], minlength=len(units))
+    norms = np.sqrt(np.bincount(rows_array, weights=weights**2, minlength=len(units)))
+    return np.divide(dots, norms, out=np.zeros(len(units)), where=norms > 0)
+
+
+def compress(text: str, budget_tokens: int) -> Tuple[str, int, int]:
+    """Fit ``text`` into ``budget_tokens``; returns ``(text, tokens_in, tokens_out)``.
+
+    Text within budget is returned unchanged. Otherwise filler is stripped
+    first; if the text is still over budget, sentences are ranked by
+    `centrality_scores` and the best are kept in their original order:
+    ``COVERAGE_SHARE`` of the budget is split across ``COVERAGE_BUCKETS``
+    equal stretches of the transcript, and the remainder goes to the best
+    units left anywhere.
+    """
+    tokens_in = estimate_tokens(text)
+    if tokens_in <= budget_tokens:
+        return text, tokens_in, tokens_in
+    cleaned = strip_filler(text)
+    tokens = estimate_tokens(cleaned)
+    if tokens <= budget_tokens:
+        return cleaned, tokens_in, tokens
+
+    units = split_units(cleaned)
+    costs = np.array([estimate_tokens(unit) for unit in units], dtype=np.int64)
+    scores = centrality_scores(units)
+    # Exact repeats (choruses, intros) only ever contribute once.
+    seen = set()
+    for idx, unit in enumerate(units):
+        key = unit.lower()
+        if key in seen:
+            scores[idx] = -1.0
+        seen.add(key)
+
+    keep = np.zeros(len(units), dtype=bool)
+    spent = 0
+    buckets = min(COVERAGE_BUCKETS, len(units))
+    bucket_budget = int(budget_tokens * COVERAGE_SHARE) // max(1, buckets)
+    for bucket in np.array_split(np.arange(len(units)), buckets):
+        bucket_spent = 0
+        for idx in bucket[np.argsort(-scores[bucket], kind="stable")]:
+            if scores[idx] < 0 or bucket_spent + costs[idx] > bucket_budget:
+                continue
+            keep[idx] = True
+            bucket_spent += int(costs[idx])
+        spent += bucket_spent
+    for idx in np.argsort(-scores, kind="stable"):
+        if not keep[idx] and scores[idx] >= 0 and spent + costs[idx] <= budget_tokens:
+            keep[idx] = True
+            spent += int(costs[idx])
+
+    if not spent:
+        # Not even one unit fits; fall back to a plain cut at ~4 chars/token.
+        cut = cleaned[: budget_tokens * 4]
+        return cut, tokens_in, estimate_tokens(cut)
+    return " ".join(unit for unit, kept in zip(units, keep, strict=True) if kept), tokens_in, spent
+
+
+class PromptBudget:
+    """Compresses transcripts to ``settings.prompt_token_budget`` before prompting.
+
+    Each call observes ``prompt_compression_ratio`` (output/input tokens) and
+    adds to ``prompt_tokens_{in,out}_total``. A budget of 0 disables it.
+    """
+
+    def __init__(self, budget_tokens: int, metrics: Optional[MetricsCollector] = None):
+        self.budget_tokens = budget_tokens
+        self.metrics = metrics or MetricsCollector()
+        self.metrics.register_histogram("prompt_compression_ratio", RATIO_BUCKETS)
+
+    def fit(self, transcript: Union[str, Transcript]) -> str:
+        text = str(transcript)
+        if self.budget_tokens <= 0:
+            return text
+        compressed, tokens_in, tokens_out = compress(text, self.budget_tokens)
+        self.metrics.increment("prompt_tokens_in_total", tokens_in)
+        self.metrics.increment("prompt_tokens_out_total", tokens_out)
+        if tokens_in:
+            self.metrics.observe("prompt_compression_ratio", tokens_out / tokens_in)
+        return compressed
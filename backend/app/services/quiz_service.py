@@ -1,16 +1,32 @@
 """
-Quiz generation service built on top of Google Gemini.
+Quiz generation service built on a pluggable LLM provider (Gemini by default).
 """
 
+import hashlib
 import json
-from typing import Callable, List, Optional
+import threading
+import time
+from typing import Callable, Iterator, List, Optional, Union
 
-import google.generativeai as genai
 from fastapi import HTTPException
 
 from ..config import Settings
+from ..lazy import LazyModule
 from ..logger import get_logger
+from ..metrics import MetricsCollector
 from ..models.schemas import Quiz
+from ..resilience import CircuitOpenError, Resilience
+from ..storage.cache import TieredCache
+from ..storage.embedding_cache import EmbeddingCache
+from .llm import DeepSeekProvider, GeminiProvider, LLMProvider, as_llm_error
+from .prompt_budget import PromptBudget
+from .quiz_stream import QuizStreamParser
+from .transcript import Transcript
+
+TranscriptLike = Union[str, Transcript]
+
+genai = LazyModule("google.generativeai")
+_UNSET = object()
 
 
 class QuizService:
@@ -37,40 +53,289 @@ Return ONLY a valid JSON array with this exact structure (no markdown, no extra
   }}
 ]"""
 
-    def __init__(self, settings: Settings):
+    CHUNK_PROMPT_TEMPLATE = """\
+The following excerpt covers {time_start} to {time_end} (seconds) of a video transcript. \
+Create {num_questions} multiple-choice quiz questions about it.
+
+Excerpt:
+{transcript}
+
+Requirements:
+1. Create exactly {num_questions} questions, with these difficulty levels in order: {difficulties}
+2. Use only information present in the excerpt
+3. Each question should have 4 options (A, B, C, D)
+4. Include a brief explanation for the correct answer
+
+Return ONLY a valid JSON array with this exact structure (no markdown, no extra text):
+[
+  {{
+    "question": "What is the main topic discussed?",
+    "options": ["A) Topic 1", "B) Topic 2", "C) Topic 3", "D) Topic 4"],
+    "correct_answer": "A) Topic 1",
+    "explanation": "The excerpt clearly states...",
+    "difficulty": "medium"
+  }}
+]"""
+
+    GEMINI_MODEL = "gemini-2.5-flash"
+
+    def __init__(
+        self,
+        settings: Settings,
+        metrics: Optional[MetricsCollector] = None,
+        resilience: Optional[Resilience] = None,
+    ):
         self.settings = settings
         self.logger = get_logger(self.__class__.__name__)
-        self._gemini_model = None
-        self._configure_gemini()
+        self.metrics = metrics or MetricsCollector()
+        self.resilience = resilience or Resilience(settings, self.metrics)
+        self.embedding_policy = self.resilience.policy("gemini_embedding")
+        self.cache = (
+            TieredCache(
+                "quiz",
+                memory_bytes=settings.quiz_cache_memory_bytes,
+                ttl_seconds=settings.quiz_cache_ttl_seconds,
+                disk_dir=settings.cache_dir,
+                metrics=self.metrics,
+            )
+            if settings.quiz_cache_enabled
+            else None
+        )
+        self.embedding_cache = (
+            EmbeddingCache(
+                self.EMBEDDING_MODEL,
+                memory_bytes=settings.embedding_cache_memory_bytes,
+                disk_dir=settings.cache_dir,
+                metrics=self.metrics,
+            )
+            if settings.embedding_cache_enabled
+            else None
+        )
+        self.prompt_budget = PromptBudget(settings.prompt_token_budget, self.metrics)
+        self._provider = _UNSET
+        self._provider_lock = threading.Lock()
+
+    @property
+    def provider(self) -> Optional[LLMProvider]:
+        """The text-generation provider, built (and its SDK imported) on first use."""
+        if self._provider is _UNSET:
+            with self._provider_lock:
+                if self._provider is _UNSET:
+                    self._provider = self._build_provider()
+        return self._provider
+
+    def warm_up(self) -> None:
+        """Build the provider (importing its SDK) ahead of the first request."""
+        _ = self.provider
 
-    def _configure_gemini(self) -> None:
+    def _build_provider(self) -> Optional[LLMProvider]:
+        """Select the text-generation backend from ``settings.llm_provider``."""
+        if self.settings.llm_provider == DeepSeekProvider.name:
+            # Embeddings still go through Gemini when a key is available.
+            if self.settings.gemini_api_key:
+                genai.configure(api_key=self.settings.gemini_api_key)
+            if not self.settings.deepseek_api_key:
+                self.logger.warning("DEEPSEEK_API_KEY not set. Quiz generation will fail.")
+                return None
+            return DeepSeekProvider(
+                self.settings, policy=self.resilience.policy(DeepSeekProvider.name)
+            )
+        return self._configure_gemini()
+
+    def _configure_gemini(self) -> Optional[LLMProvider]:
         if not self.settings.gemini_api_key:
             self.logger.warning("GEMINI_API_KEY not set. Quiz generation will fail.")
-            return
+            return None
         genai.configure(api_key=self.settings.gemini_api_key)
-        self._gemini_model = genai.GenerativeModel("gemini-2.5-flash")
+        return GeminiProvider(
+            genai.GenerativeModel(self.GEMINI_MODEL),
+            self.GEMINI_MODEL,
+            policy=self.resilience.policy(GeminiProvider.name),
+        )
+
+    def _require_provider(self) -> LLMProvider:
+        if not self.provider:
+            raise HTTPException(
+                status_code=500,
+                detail="LLM provider is not configured. Set GEMINI_API_KEY or DEEPSEEK_API_KEY.",
+            )
+        return self.provider
+
+    def close(self) -> None:
+        if self._provider not in (_UNSET, None):
+            self._provider.close()
+        if self.embedding_cache is not None:
+            self.embedding_cache.close()
 
     def generate_quiz(
-        self, transcript: str, num_questions: int, difficulty: str
+        self,
+        transcript: TranscriptLike,
+        num_questions: int,
+        difficulty: str,
+        fresh: bool = False,
+        topup_round: int = 0,
+    ) -> List[Quiz]:
+        """Generate a quiz, serving repeats from the quiz cache when enabled.
+
+        ``fresh=True`` skips the cache lookup but still stores the new result.
+        A ``topup_round`` above 0 marks a request for replacement questions;
+        each round is cached under its own key, so it is never answered with
+        the cached questions it is meant to replace.
+        """
+        transcript = self.prompt_budget.fit(transcript)
+        cache_key = self._cache_key(transcript, num_questions, difficulty, topup_round=topup_round)
+        if self.cache and not fresh:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return [Quiz(**item) for item in json.loads(cached)]
+
+        quiz = self._generate_quiz(transcript, num_questions, difficulty)
+        if self.cache:
+            payload = json.dumps([item.dict() for item in quiz]).encode("utf-8")
+            self.cache.set(cache_key, payload)
+        return quiz
+
+    def generate_chunk_quiz(
+        self,
+        chunk_text: str,
+        time_start: float,
+        time_end: float,
+        difficulties: List[str],
+        fresh: bool = False,
+        topup_round: int = 0,
     ) -> List[Quiz]:
-        if not self._gemini_model:
+        """Generate questions for one time-bounded chunk (the map step).
+
+        Questions are stamped with the chunk's time range and the requested
+        difficulties; results are cached per chunk (and ``topup_round``) like
+        `generate_quiz`.
+        """
+        chunk_text = self.prompt_budget.fit(chunk_text)
+        cache_key = self._cache_key(
+            f"{time_start:.2f}:{time_end:.2f}:{chunk_text}",
+            len(difficulties),
+            ",".join(difficulties),
+            template=self.CHUNK_PROMPT_TEMPLATE,
+            topup_round=topup_round,
+        )
+        if self.cache and not fresh:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return [Quiz(**item) for item in json.loads(cached)]
+
+        prompt = self.CHUNK_PROMPT_TEMPLATE.format(
+            time_start=f"{time_start:.0f}",
+            time_end=f"{time_end:.0f}",
+            num_questions=len(difficulties),
+            difficulties=", ".join(difficulties),
+            transcript=chunk_text,
+        )
+        quiz = self._run_prompt(prompt)[: len(difficulties)]
+        for question, difficulty in zip(quiz, difficulties, strict=False):
+            question.difficulty = question.difficulty or difficulty
+            question.time_start = time_start
+            question.time_end = time_end
+
+        if self.cache:
+            payload = json.dumps([item.dict() for item in quiz]).encode("utf-8")
+            self.cache.set(cache_key, payload)
+        return quiz
+
+    def stream_quiz(
+        self, transcript: TranscriptLike, num_questions: int, difficulty: str, fresh: bool = False
+    ) -> Iterator[Quiz]:
+        """Yield quiz questions one by one as the model streams them.
+
+        Cached quizzes are replayed directly; a completed stream is cached like
+        a regular `generate_quiz` result.
+        """
+        transcript = self.prompt_budget.fit(transcript)
+        cache_key = self._cache_key(transcript, num_questions, difficulty)
+        if self.cache and not fresh:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                for item in json.loads(cached):
+                    yield Quiz(**item)
+                return
+
+        provider = self._require_provider()
+        prompt = self.QUIZ_PROMPT_TEMPLATE.format(
+            num_questions=num_questions, difficulty=difficulty, transcript=transcript
+        )
+        parser = QuizStreamParser()
+        quiz: List[Quiz] = []
+        started = time.perf_counter()
+        try:
+            for text in provider.stream(prompt):
+                for item in parser.feed(text):
+                    question = Quiz(**item)
+                    quiz.append(question)
+                    yield question
+                if parser.finished:
+                    break
+        except HTTPException:
+            raise
+        except CircuitOpenError as error:
+            raise self._unavailable(error) from error
+        except json.JSONDecodeError as error:
             raise HTTPException(
-                status_code=500,
-                detail="Gemini model is not configured. Set GEMINI_API_KEY.",
+                status_code=500, detail=f"Failed to parse streamed quiz JSON: {error}"
+            ) from error
+        except Exception as error:
+            self.logger.exception("Streaming quiz generation failed")
+            raise HTTPException(
+                status_code=500, detail=f"Quiz generation failed: {error}"
+            ) from error
+        finally:
+            # Includes time the consumer spends between questions.
+            self.metrics.observe(
+                "stage_duration_seconds", time.perf_counter() - started, stage="generation"
             )
 
-        transcript = self._trim_transcript(transcript)
+        if self.cache and parser.finished:
+            payload = json.dumps([item.dict() for item in quiz]).encode("utf-8")
+            self.cache.set(cache_key, payload)
+
+    def _cache_key(
+        self,
+        transcript: str,
+        num_questions: int,
+        difficulty: str,
+        template: Optional[str] = None,
+        topup_round: int = 0,
+    ) -> str:
+        digest = hashlib.sha256()
+        model_name = self.provider.model_name if self.provider else self.GEMINI_MODEL
+        digest.update(model_name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update((template or self.QUIZ_PROMPT_TEMPLATE).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(transcript.encode("utf-8"))
+        if topup_round:
+            digest.update(f"\0topup:{topup_round}".encode("utf-8"))
+        return f"{digest.hexdigest()}:{num_questions}:{difficulty}"
+
+    def _generate_quiz(
+        self, transcript: str, num_questions: int, difficulty: str
+    ) -> List[Quiz]:
         prompt = self.QUIZ_PROMPT_TEMPLATE.format(
             num_questions=num_questions, difficulty=difficulty, transcript=transcript
         )
+        return self._run_prompt(prompt)
 
+    def _run_prompt(self, prompt: str) -> List[Quiz]:
+        provider = self._require_provider()
+        quiz_text = ""
         try:
-            response = self._gemini_model.generate_content(prompt)
-            quiz_text = response.text.strip()
-            quiz_data = self._parse_quiz_json(quiz_text)
+            with self.metrics.stage("generation"):
+                quiz_text = provider.complete(prompt).strip()
+            with self.metrics.stage("json_parse"):
+                quiz_data = self._parse_quiz_json(quiz_text)
             return [Quiz(**item) for item in quiz_data]
         except HTTPException:
             raise
+        except CircuitOpenError as error:
+            raise self._unavailable(error) from error
         except json.JSONDecodeError as error:
             raise HTTPException(
                 status_code=500,
@@ -82,10 +347,13 @@ Return ONLY a valid JSON array with this exact structure (no markdown, no extra
                 status_code=500, detail=f"Quiz generation failed: {error}"
             ) from error
 
-    def _trim_transcript(self, transcript: str, max_chars: int = 30000) -> str:
-        if len(transcript) > max_chars:
-            return transcript[:max_chars] + "..."
-        return transcript
+    @staticmethod
+    def _unavailable(error: CircuitOpenError) -> HTTPException:
+        return HTTPException(
+            status_code=503,
+            detail=f"Quiz generation temporarily unavailable: {error}",
+            headers={"Retry-After": str(max(1, int(error.retry_after)))},
+        )
 
     def _parse_quiz_json(self, quiz_text: str) -> List[dict]:
         if "```json" in quiz_text:
@@ -94,17 +362,78 @@ Return ONLY a valid JSON array with this exact structure (no markdown, no extra
             quiz_text = quiz_text.split("```")[1].split("```")[0].strip()
         return json.loads(quiz_text)
 
+    EMBEDDING_MODEL = "models/text-embedding-004"
+
+    def _embed_content(self, content):
+        _ = self.provider  # building the provider configures the Gemini SDK
+        try:
+            return genai.embed_content(
+                model=self.EMBEDDING_MODEL,
+                content=content,
+                task_type="retrieval_document",
+            )
+        except Exception as error:
+            raise as_llm_error(error) from error
+
     def get_embedding_fn(self) -> Callable[[str], List[float]]:
-        def embed(text: str) -> List[float]:
+        """Return a single-text embedding function.
+
+        Calls share the embedding circuit breaker, so a failing provider is
+        skipped (empty vector) without waiting for it.
+        """
+
+        def embed_uncached(texts: List[str]) -> List[List[float]]:
             try:
-                result = genai.embed_content(
-                    model="models/text-embedding-004",
-                    content=text,
-                    task_type="retrieval_document",
-                )
-                return result.get("embedding", [])
+                result = self.embedding_policy.call(self._embed_content, texts[0])
+                return [result.get("embedding", [])]
             except Exception as error:
                 self.logger.warning("Embedding error: %s", error)
-                return []
+                return [[]]
+
+        def embed(text: str) -> List[float]:
+            return self._cached_embeddings([text], embed_uncached)[0]
 
         return embed
+
+    def get_batch_embedding_fn(self) -> Callable[[List[str]], List[List[float]]]:
+        """Return a function embedding many texts in one API call.
+
+        Failed batches yield an empty vector per text, mirroring `get_embedding_fn`.
+        """
+
+        def embed_uncached(texts: List[str]) -> List[List[float]]:
+            try:
+                with self.metrics.stage("embedding"):
+                    result = self.embedding_policy.call(self._embed_content, list(texts))
+                embeddings = result.get("embedding", [])
+                if len(embeddings) != len(texts):
+                    raise ValueError(
+                        f"expected {len(texts)} embeddings, got {len(embeddings)}"
+                    )
+                return embeddings
+            except Exception as error:
+                self.logger.warning("Batch embedding error: %s", error)
+                return [[] for _ in texts]
+
+        def embed_batch(texts: List[str]) -> List[List[float]]:
+            if not texts:
+                return []
+            return self._cached_embeddings(texts, embed_uncached)
+
+        return embed_batch
+
+    def _cached_embeddings(
+        self, texts: List[str], embed: Callable[[List[str]], List[List[float]]]
+    ) -> List[List[float]]:
+        """Serve ``texts`` from the embedding cache and ``embed`` each distinct miss once."""
+        if self.embedding_cache is None:
+            return embed(list(texts))
+        vectors = self.embedding_cache.get_many(texts)
+        pairs = list(zip(texts, vectors, strict=True))
+        missing = list(dict.fromkeys(text for text, vector in pairs if vector is None))
+        if not missing:
+            return vectors
+        computed = embed(missing)
+        self.embedding_cache.set_many(missing, computed)
+        fresh = dict(zip(missing, computed, strict=True))
+        return [fresh[text] if vector is None else vector for text, vector in pairs]
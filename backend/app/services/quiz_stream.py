@@ -0,0 +1,78 @@
+"""
+Incremental parsing of a streamed JSON array of quiz questions.
+"""
+
+import json
+from typing import Iterator, List, Optional
+
+
+class QuizStreamParser:
+    """Yields array elements of a JSON array as soon as each one is complete.
+
+    Text is fed in arbitrary pieces (as produced by a streaming LLM). Anything
+    before the opening ``[`` -- such as a Markdown code fence -- is ignored, and
+    the scanner keeps its string/escape/depth state between calls, so the
+    total work is linear in the length of the response.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._item_start: Optional[int] = None
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    def feed(self, text: str) -> List[dict]:
+        """Consume more text and return the elements completed by it."""
+        return list(self._scan(text))
+
+    def _scan(self, text: str) -> Iterator[dict]:
+        if self._finished:
+            return
+        self._buffer += text
+        buffer = self._buffer
+        pos = self._pos
+        while pos < len(buffer):
+            char = buffer[pos]
+            if not self._started:
+                if char == "[":
+                    self._started = True
+                pos += 1
+                continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                if self._depth == 0:
+                    self._item_start = pos
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0 and self._item_start is not None:
+                    item = json.loads(buffer[self._item_start : pos + 1])
+                    self._item_start = None
+                    yield item
+            elif char == "]" and self._depth == 0:
+                self._finished = True
+                pos += 1
+                break
+            pos += 1
+        # Drop text that can no longer be part of an element.
+        keep_from = self._item_start if self._item_start is not None else pos
+        self._buffer = buffer[keep_from:]
+        if self._item_start is not None:
+            self._item_start = 0
+        self._pos = pos - keep_from
@@ -0,0 +1,204 @@
+"""
+Compact timed transcript: one UTF-8 buffer plus parallel segment arrays.
+"""
+
+import json
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import cached_property
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+_MAGIC = b"QPT1"
+_HEADER = struct.Struct(">4sII")  # magic, header JSON length, segment count
+
+
+class Transcript:
+    """Timed transcript without per-segment objects.
+
+    Segment texts are stored back to back in one UTF-8 buffer, separated by
+    single spaces, so the buffer decodes to the same full text the API has
+    always returned. ``offsets[i]`` is the byte offset where segment ``i``
+    starts (``offsets[n]`` is one past the final separator), and
+    ``starts``/``durations`` hold its timing as float64 arrays.
+
+    Time ranges map to byte spans with `bisect` in O(log n), and `view`
+    returns zero-copy ``memoryview`` slices of the buffer; `text_between`
+    decodes only the requested span.
+    """
+
+    def __init__(
+        self,
+        buffer: bytes,
+        offsets: "array[int]",
+        starts: "array[float]",
+        durations: "array[float]",
+        source: str = "",
+    ):
+        self.buffer = buffer
+        self.offsets = offsets
+        self.starts = starts
+        self.durations = durations
+        self.source = source
+
+    @classmethod
+    def from_segments(
+        cls, segments: Iterable[Dict[str, Any]], source: str = ""
+    ) -> "Transcript":
+        """Build from ``{"text", "start", "duration"}`` dicts (SDK output)."""
+        encoded = []
+        offsets = array("q", [0])
+        starts = array("d")
+        durations = array("d")
+        position = 0
+        for segment in segments:
+            data = str(segment.get("text", "")).encode("utf-8")
+            encoded.append(data)
+            position += len(data) + 1
+            offsets.append(position)
+            starts.append(float(segment.get("start", 0.0)))
+            durations.append(float(segment.get("duration", 0.0)))
+        return cls(b" ".join(encoded), offsets, starts, durations, source)
+
+    @classmethod
+    def from_text(cls, text: str, source: str = "") -> "Transcript":
+        """An untimed transcript: one segment at 0s."""
+        return cls.from_segments([{"text": text, "start": 0.0, "duration": 0.0}], source)
+
+    # Whole-text access -----------------------------------------------------
+
+    @cached_property
+    def text(self) -> str:
+        """The full text, decoded once and then cached."""
+        return self.buffer.decode("utf-8")
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def duration(self) -> float:
+        """End time of the last segment, in seconds."""
+        return self.starts[-1] + self.durations[-1] if len(self) else 0.0
+
+    # Segments and spans ----------------------------------------------------
+
+    def byte_span(self, first: int, last: int) -> Tuple[int, int]:
+        """Byte range covering segments ``first`` up to (not including) ``last``."""
+        if last <= first:
+            return self.offsets[first], self.offsets[first]
+        return self.offsets[first], self.offsets[last] - 1
+
+    def segment_text(self, index: int) -> str:
+        start, end = self.byte_span(index, index + 1)
+        return self.buffer[start:end].decode("utf-8")
+
+    def segment(self, index: int) -> Dict[str, Any]:
+        return {
+            "text": self.segment_text(index),
+            "start": self.starts[index],
+            "duration": self.durations[index],
+        }
+
+    def iter_segments(self) -> Iterator[Dict[str, Any]]:
+        """Segments as dicts, built on demand (for serialisation at the edges)."""
+        return (self.segment(index) for index in range(len(self)))
+
+    def segment_range(self, start_time: float, end_time: float) -> Tuple[int, int]:
+        """Indices ``[first, last)`` of segments overlapping ``[start_time, end_time)``.
+
+        Assumes segments are in time order, as captions and Whisper output are.
+        """
+        first = max(0, bisect_right(self.starts, start_time) - 1)
+        if first < len(self) and self.starts[first] + self.durations[first] <= start_time:
+            first += 1
+        last = max(first, bisect_left(self.starts, end_time))
+        return first, last
+
+    def segment_at_byte(self, offset: int) -> int:
+        """Index of the segment containing byte ``offset`` of the buffer."""
+        return max(0, min(len(self) - 1, bisect_right(self.offsets, offset) - 1))
+
+    def view(self, first: int, last: int) -> memoryview:
+        """Zero-copy UTF-8 view of segments ``[first, last)``."""
+        start, end = self.byte_span(first, last)
+        return memoryview(self.buffer)[start:end]
+
+    def text_range(self, first: int, last: int) -> str:
+        return bytes(self.view(first, last)).decode("utf-8")
+
+    def text_between(self, start_time: float, end_time: float) -> str:
+        """Text of the segments overlapping ``[start_time, end_time)``."""
+        return self.text_range(*self.segment_range(start_time, end_time))
+
+    def time_span(self, first: int, last: int) -> Tuple[float, float]:
+        """``(start, end)`` seconds of segments ``[first, last)``."""
+        if last <= first:
+            return 0.0, 0.0
+        return self.starts[first], self.starts[last - 1] + self.durations[last - 1]
+
+    # Serialisation ---------------------------------------------------------
+
+    def to_bytes(self) -> bytes:
+        """Compact binary form: header, the three arrays, then the text buffer."""
+        header = json.dumps({"source": self.source}).encode("utf-8")
+        return b"".join(
+            (
+                _HEADER.pack(_MAGIC, len(header), len(self)),
+                header,
+                _big_endian(self.offsets),
+                _big_endian(self.starts),
+                _big_endian(self.durations),
+                self.buffer,
+            )
+        )
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> Optional["Transcript"]:
+        """Parse `to_bytes` output, or a legacy JSON record; None if unreadable."""
+        if payload[:1] == b"{":
+            record = json.loads(payload)
+            segments = record.get("segments") or [
+                {"text": record["text"], "start": 0.0, "duration": 0.0}
+            ]
+            return cls.from_segments(segments, record.get("source", ""))
+        if len(payload) < _HEADER.size:
+            return None
+        magic, header_size, count = _HEADER.unpack_from(payload)
+        if magic != _MAGIC:
+            return None
+        position = _HEADER.size
+        header = json.loads(payload[position : position + header_size])
+        position += header_size
+        arrays = []
+        for typecode, length in (("q", count + 1), ("d", count), ("d", count)):
+            values = array(typecode)
+            size = values.itemsize * length
+            values.frombytes(payload[position : position + size])
+            if _NATIVE_LITTLE:
+                values.byteswap()
+            arrays.append(values)
+            position += size
+        return cls(payload[position:], arrays[0], arrays[1], arrays[2], header.get("source", ""))
+
+
+def as_transcript(value: Union[Transcript, str, Iterable[Dict[str, Any]]]) -> Transcript:
+    """Accept a `Transcript`, plain text or segment dicts."""
+    if isinstance(value, Transcript):
+        return value
+    if isinstance(value, str):
+        return Transcript.from_text(value)
+    return Transcript.from_segments(value)
+
+
+_NATIVE_LITTLE = array("H", [1]).tobytes() == b"\x01\x00"
+
+
+def _big_endian(values: array) -> bytes:
+    if not _NATIVE_LITTLE:
+        return values.tobytes()
+    swapped = array(values.typecode, values)
+    swapped.byteswap()
+    return swapped.tobytes()
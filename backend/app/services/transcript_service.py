@@ -5,14 +5,25 @@ Transcript service encapsulating all transcript retrieval logic.
 import os
 import re
 import tempfile
-from typing import Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
-import yt_dlp
 from fastapi import HTTPException
-from youtube_transcript_api import YouTubeTranscriptApi
 
+from ..concurrency import ExecutorPools
 from ..config import Settings
+from ..lazy import LazyModule
 from ..logger import get_logger
+from ..metrics import MetricsCollector
+from ..storage.cache import TieredCache
+from .transcript import Transcript
+from .transcription import TranscriptionEngine, build_transcription_engine
+from .transcription_pool import TranscriptionWorkerPool
+
+yt_dlp = LazyModule("yt_dlp")
+youtube_transcript_api = LazyModule("youtube_transcript_api")
+
+# Caption segments plus the language code they were fetched in.
+Captions = Tuple[List[Dict[str, Any]], str]
 
 
 class TranscriptService:
@@ -25,11 +36,51 @@ class TranscriptService:
     ]
 
     SUPPORTED_LANGUAGES = ["en", "bn", "hi", "es", "fr", "de", "ar", "zh"]
+    # Language recorded for Whisper output when WHISPER_LANGUAGE is unset.
+    AUTO_LANGUAGE = "auto"
 
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, metrics: Optional[MetricsCollector] = None):
         self.settings = settings
         self.logger = get_logger(self.__class__.__name__)
-        self._whisper_model = None
+        self.metrics = metrics or MetricsCollector()
+        self.cache = TieredCache(
+            "transcript",
+            memory_bytes=settings.transcript_cache_memory_bytes,
+            ttl_seconds=settings.transcript_cache_ttl_seconds,
+            disk_dir=settings.cache_dir,
+            metrics=self.metrics,
+        )
+        # video id -> language its cached transcript was fetched in
+        self.languages = TieredCache(
+            "transcript_language",
+            memory_bytes=1024 * 1024,
+            ttl_seconds=settings.transcript_cache_ttl_seconds,
+            disk_dir=settings.cache_dir,
+            metrics=self.metrics,
+        )
+        self.engine: TranscriptionEngine = build_transcription_engine(settings)
+        self.worker_pool: Optional[TranscriptionWorkerPool] = (
+            TranscriptionWorkerPool(settings, metrics=self.metrics)
+            if settings.transcription_workers > 0
+            else None
+        )
+
+    def start_workers(self) -> None:
+        """Spawn transcription workers so their models load before first use."""
+        if self.worker_pool:
+            self.worker_pool.start()
+
+    def warm_up(self) -> None:
+        """Import the YouTube SDKs and start (or preload) transcription."""
+        youtube_transcript_api.load()
+        yt_dlp.load()
+        self.start_workers()
+        if not self.worker_pool and self.settings.preload_transcription_model:
+            self.engine.load()
+
+    def shutdown(self) -> None:
+        if self.worker_pool:
+            self.worker_pool.shutdown()
 
     def extract_video_id(self, url: str) -> str:
         """Extract a video ID from any supported YouTube URL pattern."""
@@ -39,30 +90,172 @@ class TranscriptService:
                 return match.group(1)
         raise HTTPException(status_code=400, detail="Invalid YouTube URL")
 
+    def resolve_playlist(self, url: str, limit: int) -> List[str]:
+        """Video IDs of a playlist URL, read with yt-dlp flat extraction (no downloads)."""
+        options = {
+            "extract_flat": "in_playlist",
+            "playlistend": limit,
+            "quiet": True,
+            "no_warnings": True,
+            "skip_download": True,
+        }
+        try:
+            with self.metrics.stage("playlist_resolve"), yt_dlp.YoutubeDL(options) as ydl:
+                info = ydl.extract_info(url, download=False) or {}
+        except Exception as error:
+            self.logger.warning("Playlist resolution failed: %s", error)
+            raise HTTPException(
+                status_code=400, detail=f"Could not resolve playlist: {error}"
+            ) from error
+        video_ids = [
+            entry["id"] for entry in info.get("entries") or [] if entry and entry.get("id")
+        ]
+        if not video_ids:
+            raise HTTPException(status_code=400, detail="Playlist contains no videos.")
+        return video_ids[:limit]
+
     def get_transcript(self, video_id: str) -> str:
         """Attempt to retrieve an existing transcript, fallback to Whisper."""
-        try:
-            transcript_list = YouTubeTranscriptApi.get_transcript(
-                video_id, languages=["en"]
+        return self.get_segments(video_id).text
+
+    def get_segments(self, video_id: str) -> Transcript:
+        """Return the timed `Transcript`; its ``source`` is "captions" or "whisper"."""
+        cached = self._cached(video_id, self.languages.get, self.cache.get)
+        if cached is not None:
+            return cached
+
+        captions = self._get_caption_segments(video_id)
+        if captions and captions[0]:
+            return self._write_cache(video_id, *captions, "captions")
+        segments = self._transcribe_from_audio(video_id)
+        return self._write_cache(video_id, segments, self._whisper_language(), "whisper")
+
+    async def get_transcript_async(
+        self,
+        video_id: str,
+        executors: ExecutorPools,
+        on_stage: Optional[Callable[[str], Awaitable[None]]] = None,
+    ) -> str:
+        """Non-blocking variant of `get_transcript`."""
+        transcript = await self.get_segments_async(video_id, executors, on_stage)
+        return transcript.text
+
+    async def get_segments_async(
+        self,
+        video_id: str,
+        executors: ExecutorPools,
+        on_stage: Optional[Callable[[str], Awaitable[None]]] = None,
+    ) -> Transcript:
+        """Non-blocking variant of `get_segments`.
+
+        Caption lookups and the audio download run on the I/O pool; Whisper
+        runs on the CPU pool so it cannot hold up network-bound requests.
+        ``on_stage("transcribing")`` is awaited before the audio fallback starts.
+        """
+        cached = self._cached(video_id, self.languages.get_memory, self.cache.get_memory)
+        if cached is None:
+            cached = await executors.run_io(
+                self._cached, video_id, self.languages.get, self.cache.get
             )
-            transcript = " ".join(entry["text"] for entry in transcript_list)
+        if cached is not None:
+            return cached
+
+        captions = await executors.run_io(self._get_caption_segments, video_id)
+        if captions and captions[0]:
+            return await executors.run_io(self._write_cache, video_id, *captions, "captions")
+
+        if on_stage:
+            await on_stage("transcribing")
+        if not self.worker_pool:
+            await executors.run_cpu(self.engine.load)
+        audio_path = await executors.run_io(self._download_audio_for_transcription, video_id)
+        try:
+            segments = await executors.run_cpu(self._transcribe_file, audio_path)
+        finally:
+            self._remove_audio(audio_path)
+        return await executors.run_io(
+            self._write_cache, video_id, segments, self._whisper_language(), "whisper"
+        )
+
+    @staticmethod
+    def _cache_key(video_id: str, language: str) -> str:
+        return f"{video_id}:{language}"
+
+    def _whisper_language(self) -> str:
+        return self.settings.whisper_language or self.AUTO_LANGUAGE
+
+    def _cached(
+        self,
+        video_id: str,
+        get_language: Callable[[str], Optional[bytes]],
+        get_transcript: Callable[[str], Optional[bytes]],
+    ) -> Optional[Transcript]:
+        """Look up the language ``video_id`` resolved to, then its transcript."""
+        language = get_language(video_id)
+        if language is None:
+            return None
+        return self._read_cache(get_transcript(self._cache_key(video_id, language.decode())))
+
+    def _read_cache(self, payload: Optional[bytes]) -> Optional[Transcript]:
+        if payload is None:
+            return None
+        try:
+            return Transcript.from_bytes(payload)
+        except (ValueError, KeyError) as error:
+            self.logger.warning("Ignoring unreadable cached transcript: %s", error)
+            return None
+
+    def _write_cache(
+        self, video_id: str, segments: List[Dict[str, Any]], language: str, source: str
+    ) -> Transcript:
+        transcript = Transcript.from_segments(segments, source)
+        if transcript.buffer:
+            self.cache.set(self._cache_key(video_id, language), transcript.to_bytes())
+            self.languages.set(video_id, language.encode())
+        return transcript
+
+    @staticmethod
+    def _normalize_segments(entries) -> List[Dict[str, Any]]:
+        return [
+            {
+                "text": entry["text"],
+                "start": float(entry.get("start", 0.0)),
+                "duration": float(entry.get("duration", 0.0)),
+            }
+            for entry in entries
+        ]
+
+    def _get_caption_segments(self, video_id: str) -> Optional[Captions]:
+        """English captions if available, else any supported language, else None."""
+        try:
+            with self.metrics.stage("caption_fetch"):
+                api = youtube_transcript_api.YouTubeTranscriptApi
+                transcript_list = api.get_transcript(
+                    video_id, languages=["en"]
+                )
+            segments = self._normalize_segments(transcript_list)
             self.logger.info("Found English transcript for %s", video_id)
-            return transcript
+            return segments, "en"
         except Exception as english_error:
             self.logger.info("English transcript unavailable: %s", english_error)
 
-        transcript = self._get_transcript_any_language(video_id)
-        if transcript:
-            return transcript
+        captions = self._get_transcript_any_language(video_id)
+        if captions and captions[0]:
+            return captions
 
         self.logger.warning(
             "No captions available for %s, attempting audio transcription", video_id
         )
-        return self._transcribe_from_audio(video_id)
+        return None
+
+    def _get_transcript_any_language(self, video_id: str) -> Optional[Captions]:
+        with self.metrics.stage("caption_fallback"):
+            return self._find_transcript_any_language(video_id)
 
-    def _get_transcript_any_language(self, video_id: str) -> Optional[str]:
+    def _find_transcript_any_language(self, video_id: str) -> Optional[Captions]:
         try:
-            transcript_obj = YouTubeTranscriptApi.list_transcripts(video_id)
+            api = youtube_transcript_api.YouTubeTranscriptApi
+            transcript_obj = api.list_transcripts(video_id)
         except Exception as error:
             self.logger.info("No transcripts list available: %s", error)
             return None
@@ -74,13 +267,13 @@ class TranscriptService:
             try:
                 transcript = fetcher(self.SUPPORTED_LANGUAGES)
                 data = transcript.fetch()
-                result = " ".join(entry["text"] for entry in data)
+                result = self._normalize_segments(data)
                 self.logger.info(
                     "Using %s transcript in %s",
                     "manual" if fetcher.__name__ == "find_manually_created_transcript" else "auto",
                     transcript.language,
                 )
-                return result
+                return result, transcript.language_code
             except Exception:
                 continue
         return None
@@ -129,7 +322,7 @@ class TranscriptService:
             ydl_opts["cookiefile"] = cookies_path
 
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            with self.metrics.stage("audio_download"), yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 ydl.download([url])
                 return os.path.join(temp_dir, f"{video_id}.mp3")
         except Exception as error:
@@ -142,24 +335,12 @@ class TranscriptService:
                 ),
             ) from error
 
-    def _transcribe_from_audio(self, video_id: str) -> str:
-        """Run Whisper transcription as a fallback."""
-        if self._whisper_model is None:
-            try:
-                import whisper
-
-                self._whisper_model = whisper.load_model(self.settings.whisper_model)
-            except ImportError as error:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Whisper not installed. Run: pip install openai-whisper",
-                ) from error
-
-        audio_path = None
+    def _transcribe_file(self, audio_path: str) -> List[Dict[str, Any]]:
         try:
-            audio_path = self._download_audio_for_transcription(video_id)
-            result = self._whisper_model.transcribe(audio_path)
-            return result["text"]
+            with self.metrics.stage("transcription"):
+                if self.worker_pool:
+                    return self.worker_pool.transcribe(audio_path)
+                return self.engine.transcribe(audio_path)
         except HTTPException:
             raise
         except Exception as error:
@@ -167,9 +348,21 @@ class TranscriptService:
             raise HTTPException(
                 status_code=500, detail=f"Transcription failed: {error}"
             ) from error
+
+    def _remove_audio(self, audio_path: Optional[str]) -> None:
+        if audio_path and os.path.exists(audio_path):
+            try:
+                os.remove(audio_path)
+            except OSError:
+                pass
+
+    def _transcribe_from_audio(self, video_id: str) -> List[Dict[str, Any]]:
+        """Run Whisper transcription as a fallback."""
+        if not self.worker_pool:
+            self.engine.load()
+        audio_path = None
+        try:
+            audio_path = self._download_audio_for_transcription(video_id)
+            return self._transcribe_file(audio_path)
         finally:
-            if audio_path and os.path.exists(audio_path):
-                try:
-                    os.remove(audio_path)
-                except OSError:
-                    pass
+            self._remove_audio(audio_path)
@@ -0,0 +1,138 @@
+"""
+Pluggable speech-to-text engines used for caption-less videos.
+"""
+
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+
+from fastapi import HTTPException
+
+from ..config import Settings
+from ..logger import get_logger
+
+
+class TranscriptionEngine(ABC):
+    """Turns an audio file into timed transcript segments.
+
+    Segments are ``{"text", "start", "duration"}`` dicts, the same shape the
+    caption path produces. Models load lazily on first use, or eagerly via
+    `load` (e.g. at startup or in a worker process).
+    """
+
+    name = "base"
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.logger = get_logger(self.__class__.__name__)
+        self._model = None
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        with self._lock:
+            if self._model is None:
+                self._model = self._load_model()
+                self.logger.info(
+                    "Loaded %s model %s", self.name, self.settings.whisper_model
+                )
+
+    def transcribe(self, audio_path: str) -> List[Dict[str, Any]]:
+        self.load()
+        return self._transcribe(audio_path)
+
+    @abstractmethod
+    def _load_model(self):
+        """Import the backend and load its model."""
+
+    @abstractmethod
+    def _transcribe(self, audio_path: str) -> List[Dict[str, Any]]:
+        """Run the loaded model on ``audio_path``."""
+
+
+class FasterWhisperEngine(TranscriptionEngine):
+    """CTranslate2 Whisper with int8 CPU inference and built-in VAD."""
+
+    name = "faster-whisper"
+
+    def _load_model(self):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as error:
+            raise HTTPException(
+                status_code=500,
+                detail="faster-whisper not installed. Run: pip install faster-whisper",
+            ) from error
+        return WhisperModel(
+            self.settings.whisper_model,
+            device="cpu",
+            compute_type=self.settings.whisper_compute_type,
+            cpu_threads=self.settings.whisper_cpu_threads,
+        )
+
+    def _transcribe(self, audio_path: str) -> List[Dict[str, Any]]:
+        segments, _info = self._model.transcribe(
+            audio_path,
+            beam_size=self.settings.whisper_beam_size,
+            vad_filter=self.settings.whisper_vad_filter,
+            language=self.settings.whisper_language or None,
+        )
+        # `segments` is a lazy generator; iterating it performs the decoding.
+        return [
+            {
+                "text": segment.text.strip(),
+                "start": float(segment.start),
+                "duration": float(segment.end) - float(segment.start),
+            }
+            for segment in segments
+        ]
+
+
+class OpenAIWhisperEngine(TranscriptionEngine):
+    """Reference PyTorch implementation (``openai-whisper``)."""
+
+    name = "openai-whisper"
+
+    def _load_model(self):
+        try:
+            import whisper
+        except ImportError as error:
+            raise HTTPException(
+                status_code=500,
+                detail="Whisper not installed. Run: pip install openai-whisper",
+            ) from error
+        return whisper.load_model(self.settings.whisper_model, device="cpu")
+
+    def _transcribe(self, audio_path: str) -> List[Dict[str, Any]]:
+        result = self._model.transcribe(
+            audio_path,
+            fp16=False,
+            beam_size=self.settings.whisper_beam_size,
+            language=self.settings.whisper_language or None,
+        )
+        segments = [
+            {
+                "text": segment["text"].strip(),
+                "start": float(segment["start"]),
+                "duration": float(segment["end"]) - float(segment["start"]),
+            }
+            for segment in result.get("segments") or []
+        ]
+        return segments or [{"text": result["text"], "start": 0.0, "duration": 0.0}]
+
+
+ENGINES = {
+    FasterWhisperEngine.name: FasterWhisperEngine,
+    OpenAIWhisperEngine.name: OpenAIWhisperEngine,
+}
+
+
+def build_transcription_engine(settings: Settings) -> TranscriptionEngine:
+    """Instantiate the engine selected by ``settings.transcription_engine``."""
+    try:
+        engine_cls = ENGINES[settings.transcription_engine]
+    except KeyError as error:
+        raise ValueError(
+            f"Unknown transcription engine {settings.transcription_engine!r}; "
+            f"choose one of {', '.join(sorted(ENGINES))}"
+        ) from error
+    return engine_cls(settings)
@@ -0,0 +1,195 @@
+"""
+Out-of-process transcription workers.
+
+Each worker process loads the transcription model once at startup and then
+serves jobs sent over a pipe. The web process only keeps pipe handles, so
+model weights never live in the web workers, a crashing or hung model only
+takes down its own process, and transcription scales across cores
+independently of request handling.
+"""
+
+import functools
+import multiprocessing
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from ..config import Settings
+from ..logger import get_logger
+from ..metrics import MetricsCollector
+from .transcription import TranscriptionEngine, build_transcription_engine
+
+EngineFactory = Callable[[], TranscriptionEngine]
+
+
+def _worker_main(engine_factory: EngineFactory, conn) -> None:
+    """Entry point of a worker process: load once, then serve jobs forever."""
+    try:
+        engine = engine_factory()
+        engine.load()
+    except Exception as error:  # surfaced to the parent as a failed start
+        conn.send(("error", f"{type(error).__name__}: {getattr(error, 'detail', error)}"))
+        return
+    conn.send(("ready", None))
+    while True:
+        try:
+            audio_path = conn.recv()
+        except (EOFError, OSError):
+            return
+        if audio_path is None:
+            return
+        try:
+            conn.send(("ok", engine.transcribe(audio_path)))
+        except Exception as error:
+            conn.send(("error", f"{type(error).__name__}: {getattr(error, 'detail', error)}"))
+
+
+class _Worker:
+    def __init__(self, context, engine_factory: EngineFactory, name: str):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(engine_factory, child_conn), name=name, daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+
+    def stop(self, timeout: float = 5.0) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class TranscriptionWorkerPool:
+    """Fixed-size pool of transcription processes with automatic restart.
+
+    Callers block (on a CPU-pool thread) until a worker is idle. A job that
+    exceeds its timeout gets its worker killed; a worker that dies mid-job is
+    replaced. Either way the caller receives an HTTPException and the pool
+    keeps its size. A worker found dead while idle is replaced before the job
+    is dispatched.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        engine_factory: Optional[EngineFactory] = None,
+        metrics: Optional[MetricsCollector] = None,
+    ):
+        self.settings = settings
+        self.size = max(1, settings.transcription_workers)
+        self.engine_factory = engine_factory or functools.partial(
+            build_transcription_engine, settings
+        )
+        self.metrics = metrics or MetricsCollector()
+        self.logger = get_logger(self.__class__.__name__)
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._counter = 0
+        self._closed = False
+
+    def start(self) -> None:
+        """Spawn all workers; each starts loading its model immediately."""
+        with self._lock:
+            if self._workers or self._closed:
+                return
+            for _ in range(self.size):
+                worker = self._spawn()
+                self._workers.append(worker)
+                self._idle.put(worker)
+        self.logger.info("Started %d transcription workers", self.size)
+
+    @property
+    def idle_workers(self) -> int:
+        return self._idle.qsize()
+
+    def transcribe(
+        self, audio_path: str, timeout: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        self.start()
+        timeout = timeout or self.settings.transcription_job_timeout_seconds
+        worker = self._idle.get()
+        try:
+            if not worker.process.is_alive():
+                self.metrics.increment("transcription_worker_crashes_total")
+                worker = self._replace(worker)
+            if not worker.ready:
+                status, payload = self._receive(
+                    worker, self.settings.transcription_load_timeout_seconds
+                )
+                if status != "ready":
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Transcription worker failed to start: {payload}",
+                    )
+                worker.ready = True
+            self._send(worker, audio_path)
+            status, payload = self._receive(worker, timeout)
+        except HTTPException:
+            worker = self._replace(worker)
+            raise
+        finally:
+            self._idle.put(worker)
+
+        if status != "ok":
+            raise HTTPException(status_code=500, detail=f"Transcription failed: {payload}")
+        return payload
+
+    def _send(self, worker: _Worker, audio_path: str) -> None:
+        try:
+            worker.conn.send(audio_path)
+        except (EOFError, OSError) as error:
+            self.metrics.increment("transcription_worker_crashes_total")
+            raise HTTPException(
+                status_code=500,
+                detail="Transcription worker exited unexpectedly "
+                f"(code {worker.process.exitcode})",
+            ) from error
+
+    def _receive(self, worker: _Worker, timeout: float):
+        try:
+            if not worker.conn.poll(timeout):
+                self.metrics.increment("transcription_worker_timeouts_total")
+                raise HTTPException(
+                    status_code=504, detail=f"Transcription timed out after {timeout:.0f}s"
+                )
+            return worker.conn.recv()
+        except (EOFError, OSError) as error:
+            self.metrics.increment("transcription_worker_crashes_total")
+            raise HTTPException(
+                status_code=500,
+                detail="Transcription worker exited unexpectedly "
+                f"(code {worker.process.exitcode})",
+            ) from error
+
+    def _spawn(self) -> _Worker:
+        self._counter += 1
+        name = f"quizpool-transcribe-{self._counter}"
+        return _Worker(self._context, self.engine_factory, name)
+
+    def _replace(self, worker: _Worker) -> _Worker:
+        worker.process.kill()
+        worker.stop(timeout=1.0)
+        with self._lock:
+            replacement = self._spawn()
+            self._workers = [w for w in self._workers if w is not worker] + [replacement]
+        self.metrics.increment("transcription_worker_restarts_total")
+        self.logger.warning("Restarted transcription worker %s", worker.process.name)
+        return replacement
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.stop()
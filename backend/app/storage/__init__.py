@@ -1,5 +1,14 @@
 """Storage adapters."""
 
+from .cache import TieredCache
+from .embedding_cache import EmbeddingCache
 from .pinecone_client import PineconeStorage
+from .vector_store import VectorStore, build_vector_store
 
-__all__ = ["PineconeStorage"]
+__all__ = [
+    "EmbeddingCache",
+    "PineconeStorage",
+    "TieredCache",
+    "VectorStore",
+    "build_vector_store",
+]
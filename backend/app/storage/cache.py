@@ -0,0 +1,177 @@
+"""
+Two-tier (memory + compressed disk) byte cache used by the services.
+"""
+
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from ..logger import get_logger
+from ..metrics import MetricsCollector
+
+_EXPIRY_HEADER = struct.Struct(">d")
+
+
+class MemoryLRU:
+    """Thread-safe LRU of byte values bounded by their total size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, now: Optional[float] = None) -> Optional[bytes]:
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= now:
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, expires_at: float) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (value, expires_at)
+            self.current_bytes += len(value)
+            while self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= len(entry[0])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskTier:
+    """zlib-compressed files, one per key, with an expiry header."""
+
+    def __init__(self, directory: str, compression_level: int = 6):
+        self.directory = directory
+        self.compression_level = compression_level
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], f"{digest}.z")
+
+    def get(self, key: str, now: Optional[float] = None) -> Optional[Tuple[bytes, float]]:
+        now = time.time() if now is None else now
+        path = self._path(key)
+        try:
+            with open(path, "rb") as handle:
+                raw = handle.read()
+        except OSError:
+            return None
+        try:
+            (expires_at,) = _EXPIRY_HEADER.unpack_from(raw)
+            if expires_at <= now:
+                self._remove(path)
+                return None
+            return zlib.decompress(raw[_EXPIRY_HEADER.size :]), expires_at
+        except (struct.error, zlib.error):
+            self._remove(path)
+            return None
+
+    def set(self, key: str, value: bytes, expires_at: float) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = _EXPIRY_HEADER.pack(expires_at) + zlib.compress(value, self.compression_level)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(payload)
+            os.replace(tmp_path, path)
+        except OSError:
+            self._remove(tmp_path)
+            raise
+
+    def delete(self, key: str) -> None:
+        self._remove(self._path(key))
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class TieredCache:
+    """Memory LRU in front of an optional persistent disk tier.
+
+    Hits, misses and writes are recorded on the metrics collector as
+    ``<name>_cache_{memory_hits,disk_hits,misses,writes}_total``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        memory_bytes: int,
+        ttl_seconds: int,
+        disk_dir: str = "",
+        metrics: Optional[MetricsCollector] = None,
+    ):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.memory = MemoryLRU(memory_bytes)
+        self.disk = DiskTier(os.path.join(disk_dir, name)) if disk_dir else None
+        self.metrics = metrics or MetricsCollector()
+        self.logger = get_logger(self.__class__.__name__)
+
+    def get_memory(self, key: str) -> Optional[bytes]:
+        """Memory-only lookup; cheap enough to call on the event loop."""
+        value = self.memory.get(key)
+        if value is not None:
+            self.metrics.increment(f"{self.name}_cache_memory_hits_total")
+        return value
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self.get_memory(key)
+        if value is not None:
+            return value
+        if self.disk:
+            hit = self.disk.get(key)
+            if hit is not None:
+                value, expires_at = hit
+                self.memory.set(key, value, expires_at)
+                self.metrics.increment(f"{self.name}_cache_disk_hits_total")
+                return value
+        self.metrics.increment(f"{self.name}_cache_misses_total")
+        return None
+
+    def set(self, key: str, value: bytes) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        self.memory.set(key, value, expires_at)
+        if self.disk:
+            try:
+                self.disk.set(key, value, expires_at)
+            except OSError as error:
+                self.logger.warning("Disk cache write failed for %s: %s", self.name, error)
+        self.metrics.increment(f"{self.name}_cache_writes_total")
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk:
+            self.disk.delete(key)
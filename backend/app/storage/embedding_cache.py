@@ -0,0 +1,168 @@
+"""
+Content-addressed embedding cache: memory LRU plus packed float32 files.
+"""
+
+import hashlib
+import os
+import threading
+import unicodedata
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..logger import get_logger
+from ..metrics import MetricsCollector
+from .cache import MemoryLRU
+
+DIGEST_SIZE = 32
+# Embeddings of the same model and text never change, so entries do not expire.
+_NEVER = float("inf")
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for keys: NFC with runs of whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def embedding_key(model: str, text: str) -> bytes:
+    return hashlib.sha256(f"{model}\0{normalize_text(text)}".encode("utf-8")).digest()
+
+
+class VectorPack:
+    """Append-only files of fixed-size ``digest + float32[dimension]`` records.
+
+    There is one file per dimension. The digest -> offset index is rebuilt
+    on open by reading only the digests; vectors are read with ``pread`` on
+    demand. A partial record left by an interrupted write is ignored.
+    """
+
+    SUFFIX = ".f32pack"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.logger = get_logger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._offsets: Dict[bytes, Tuple[int, int]] = {}
+        self._files: Dict[int, int] = {}
+        self._sizes: Dict[int, int] = {}
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            if name.endswith(self.SUFFIX) and name[: -len(self.SUFFIX)].isdigit():
+                self._load(int(name[: -len(self.SUFFIX)]))
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def _record_size(self, dimension: int) -> int:
+        return DIGEST_SIZE + 4 * dimension
+
+    def _open(self, dimension: int) -> int:
+        fd = self._files.get(dimension)
+        if fd is None:
+            path = os.path.join(self.directory, f"{dimension}{self.SUFFIX}")
+            fd = self._files[dimension] = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            self._sizes[dimension] = os.fstat(fd).st_size
+        return fd
+
+    def _load(self, dimension: int) -> None:
+        fd = self._open(dimension)
+        size = self._record_size(dimension)
+        complete = self._sizes[dimension] // size
+        for index in range(complete):
+            digest = os.pread(fd, DIGEST_SIZE, index * size)
+            self._offsets[digest] = (dimension, index * size + DIGEST_SIZE)
+        # Drop a torn tail so later appends stay aligned.
+        self._sizes[dimension] = complete * size
+
+    def get(self, digest: bytes) -> Optional[bytes]:
+        location = self._offsets.get(digest)
+        if location is None:
+            return None
+        dimension, offset = location
+        data = os.pread(self._files[dimension], 4 * dimension, offset)
+        return data if len(data) == 4 * dimension else None
+
+    def put(self, digest: bytes, vector: bytes) -> None:
+        dimension = len(vector) // 4
+        with self._lock:
+            if digest in self._offsets:
+                return
+            fd = self._open(dimension)
+            position = self._sizes[dimension]
+            os.pwrite(fd, digest + vector, position)
+            self._sizes[dimension] = position + self._record_size(dimension)
+            self._offsets[digest] = (dimension, position + DIGEST_SIZE)
+
+    def close(self) -> None:
+        with self._lock:
+            for fd in self._files.values():
+                os.close(fd)
+            self._files.clear()
+
+
+class EmbeddingCache:
+    """Embeddings keyed by a hash of the model name and normalised text.
+
+    Vectors are kept as raw float32 bytes: in a size-bounded memory LRU and,
+    when ``disk_dir`` is set, in a `VectorPack` that survives restarts.
+    Lookups are recorded as ``embedding_cache_{memory_hits,disk_hits,misses,
+    writes}_total`` and the ``embedding_cache_hit_ratio`` gauge.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        memory_bytes: int,
+        disk_dir: str = "",
+        metrics: Optional[MetricsCollector] = None,
+    ):
+        self.model = model
+        self.memory = MemoryLRU(memory_bytes)
+        self.disk = VectorPack(os.path.join(disk_dir, "embeddings")) if disk_dir else None
+        self.metrics = metrics or MetricsCollector()
+        self.metrics.register_gauge("embedding_cache_hit_ratio", self.hit_ratio)
+
+    def hit_ratio(self) -> float:
+        counters = self.metrics.export()
+        hits = counters.get("embedding_cache_memory_hits_total", 0) + counters.get(
+            "embedding_cache_disk_hits_total", 0
+        )
+        lookups = hits + counters.get("embedding_cache_misses_total", 0)
+        return hits / lookups if lookups else 0.0
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Cached vector (or None) for each text."""
+        return [self._get(embedding_key(self.model, text)) for text in texts]
+
+    def _get(self, key: bytes) -> Optional[List[float]]:
+        memory_key = key.hex()
+        raw = self.memory.get(memory_key)
+        if raw is not None:
+            self.metrics.increment("embedding_cache_memory_hits_total")
+        elif self.disk is not None:
+            raw = self.disk.get(key)
+            if raw is not None:
+                self.memory.set(memory_key, raw, _NEVER)
+                self.metrics.increment("embedding_cache_disk_hits_total")
+        if raw is None:
+            self.metrics.increment("embedding_cache_misses_total")
+            return None
+        return array("f", raw).tolist()
+
+    def set_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """Store non-empty vectors; failed embeddings (empty lists) are skipped."""
+        for text, vector in zip(texts, vectors, strict=True):
+            if not vector:
+                continue
+            key = embedding_key(self.model, text)
+            raw = array("f", vector).tobytes()
+            self.memory.set(key.hex(), raw, _NEVER)
+            if self.disk is not None:
+                try:
+                    self.disk.put(key, raw)
+                except OSError as error:
+                    self.disk.logger.warning("Embedding cache write failed: %s", error)
+            self.metrics.increment("embedding_cache_writes_total")
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
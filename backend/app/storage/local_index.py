@@ -0,0 +1,413 @@
+"""
+On-box vector index: memory-mapped float32 rows with cosine top-k search.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ..config import Settings
+from ..logger import get_logger
+from ..metrics import MetricsCollector
+from .vector_store import VectorStore
+
+
+class LocalVectorIndex:
+    """Vectors and metadata in two append-only files, searched with NumPy.
+
+    Vectors are L2-normalised and appended as raw float32 rows to
+    ``vectors-<generation>.f32``, which is memory-mapped for search, so a
+    cosine top-k query is one matrix-vector product plus ``argpartition``.
+    Ids, row numbers and metadata go to an append-only JSON-lines log that
+    is replayed on open.
+
+    Overwritten and deleted vectors leave dead rows behind. `compact`
+    rewrites the live rows into the next generation of both files and then
+    switches the ``CURRENT`` pointer atomically; it runs automatically once
+    dead rows outnumber live ones (and at least ``compact_min_dead``).
+    On open, a torn log line or partial vector row left by a crash is cut
+    off, so later appends stay aligned. Implements the subset of the
+    Pinecone ``Index`` interface used by `VectorStore`. Thread-safe, but
+    single-process: several processes (e.g. uvicorn workers) appending to
+    the same directory corrupt it.
+    """
+
+    CURRENT_FILE = "CURRENT"
+    # Metadata fields with an inverted index, so filtered queries need not
+    # scan every record.
+    INDEXED_FIELDS = ("video_id",)
+
+    def __init__(self, directory: str, compact_min_dead: int = 1024):
+        self.directory = directory
+        self.compact_min_dead = compact_min_dead
+        self.dimension: Optional[int] = None
+        self.logger = get_logger(self.__class__.__name__)
+        self._lock = threading.RLock()
+        self._rows: Dict[str, int] = {}
+        self._row_ids: List[Optional[str]] = []
+        self._metadata: Dict[str, Dict[str, Any]] = {}
+        self._postings: Dict[Tuple[str, Any], Set[str]] = {}
+        self._dead = 0
+        self._matrix: Optional[np.ndarray] = None
+        self._live: Optional[np.ndarray] = None
+        os.makedirs(directory, exist_ok=True)
+        self.generation = self._read_generation()
+        self._replay()
+        self._vectors_file = open(self._vectors_path(self.generation), "ab")
+        self._log_file = open(self._log_path(self.generation), "a", encoding="utf-8")
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # Pinecone-compatible interface -----------------------------------------
+
+    def upsert(self, vectors: List[Dict[str, Any]]) -> None:
+        if not vectors:
+            return
+        matrix = _normalise(np.asarray([item["values"] for item in vectors], dtype=np.float32))
+        with self._lock:
+            if self.dimension is None:
+                self.dimension = matrix.shape[1]
+                self._write_log([{"op": "init", "dimension": self.dimension}])
+            elif matrix.shape[1] != self.dimension:
+                raise ValueError(
+                    f"expected {self.dimension}-dimensional vectors, got {matrix.shape[1]}"
+                )
+            first = len(self._row_ids)
+            self._vectors_file.write(matrix.tobytes())
+            self._vectors_file.flush()
+            records = []
+            for offset, item in enumerate(vectors):
+                metadata = dict(item.get("metadata") or {})
+                self._put(item["id"], first + offset, metadata)
+                records.append(
+                    {"op": "put", "id": item["id"], "row": first + offset, "metadata": metadata}
+                )
+            self._write_log(records)
+            self._changed()
+            self._maybe_compact()
+
+    def fetch(self, ids: Iterable[str]) -> Dict[str, Any]:
+        with self._lock:
+            matrix = self._view()
+            found = {
+                id_: {
+                    "id": id_,
+                    "values": matrix[self._rows[id_]].tolist(),
+                    "metadata": dict(self._metadata[id_]),
+                }
+                for id_ in ids
+                if id_ in self._rows
+            }
+        return {"vectors": found}
+
+    def update(self, id: str, set_metadata: Dict[str, Any]) -> None:  # noqa: A002
+        with self._lock:
+            if id not in self._rows:
+                return
+            metadata = dict(self._metadata[id], **set_metadata)
+            self._unindex(id)
+            self._metadata[id] = metadata
+            self._index(id)
+            self._write_log([{"op": "meta", "id": id, "metadata": metadata}])
+
+    def delete(self, ids: Iterable[str]) -> None:
+        with self._lock:
+            removed = [id_ for id_ in ids if self._drop(id_)]
+            if removed:
+                self._write_log([{"op": "del", "id": id_} for id_ in removed])
+                self._changed()
+                self._maybe_compact()
+
+    def query(
+        self,
+        vector: List[float],
+        top_k: int = 10,
+        filter: Optional[Dict[str, Any]] = None,  # noqa: A002
+        include_metadata: bool = True,
+    ) -> Dict[str, Any]:
+        """Cosine top-k over live rows, optionally restricted by metadata equality."""
+        with self._lock:
+            if not self._rows or top_k <= 0:
+                return {"matches": []}
+            query = _normalise(np.asarray([vector], dtype=np.float32))[0]
+            matrix = self._view()
+            rows = self._candidate_rows(filter)
+            row_ids = self._row_ids
+            metadata = self._metadata
+            if rows is None:
+                scores = matrix @ query
+                if self._dead:
+                    live = self._live_rows()
+                    rows, scores = live, scores[live]
+                else:
+                    rows = np.arange(len(scores))
+            else:
+                scores = matrix[rows] @ query
+            if not len(rows):
+                return {"matches": []}
+            k = min(top_k, len(rows))
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best], kind="stable")]
+            matches = []
+            for position in best:
+                id_ = row_ids[int(rows[position])]
+                match = {"id": id_, "score": float(scores[position])}
+                if include_metadata:
+                    match["metadata"] = dict(metadata[id_])
+                matches.append(match)
+        return {"matches": matches}
+
+    # Maintenance -----------------------------------------------------------
+
+    def compact(self) -> None:
+        """Rewrite live rows into a new generation and drop the old files."""
+        with self._lock:
+            live = sorted(self._rows.items(), key=lambda item: item[1])
+            matrix = self._view()
+            generation = self.generation + 1
+            with open(self._vectors_path(generation), "wb") as handle:
+                for start in range(0, len(live), 4096):
+                    rows = [row for _, row in live[start : start + 4096]]
+                    handle.write(np.ascontiguousarray(matrix[rows]).tobytes())
+                handle.flush()
+                os.fsync(handle.fileno())
+            with open(self._log_path(generation), "w", encoding="utf-8") as handle:
+                if self.dimension is not None:
+                    handle.write(json.dumps({"op": "init", "dimension": self.dimension}) + "\n")
+                for row, (id_, _) in enumerate(live):
+                    record = {"op": "put", "id": id_, "row": row, "metadata": self._metadata[id_]}
+                    handle.write(json.dumps(record) + "\n")
+                handle.flush()
+                os.fsync(handle.fileno())
+
+            pointer = os.path.join(self.directory, self.CURRENT_FILE)
+            with open(f"{pointer}.tmp", "w", encoding="utf-8") as handle:
+                handle.write(str(generation))
+            os.replace(f"{pointer}.tmp", pointer)
+
+            self._vectors_file.close()
+            self._log_file.close()
+            self._matrix = None
+            for path in (self._vectors_path(self.generation), self._log_path(self.generation)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self.generation = generation
+            self._rows = {id_: row for row, (id_, _) in enumerate(live)}
+            self._row_ids = [id_ for id_, _ in live]
+            self._dead = 0
+            self._changed()
+            self._vectors_file = open(self._vectors_path(generation), "ab")
+            self._log_file = open(self._log_path(generation), "a", encoding="utf-8")
+
+    def close(self) -> None:
+        with self._lock:
+            self._vectors_file.close()
+            self._log_file.close()
+            self._matrix = None
+
+    # Internals -------------------------------------------------------------
+
+    def _vectors_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"vectors-{generation}.f32")
+
+    def _log_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"records-{generation}.jsonl")
+
+    def _read_generation(self) -> int:
+        try:
+            with open(os.path.join(self.directory, self.CURRENT_FILE), encoding="utf-8") as handle:
+                return int(handle.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _replay(self) -> None:
+        """Rebuild the in-memory state from the log.
+
+        Replay stops at a torn line or at a record whose vector row never
+        reached the vectors file. Both files are then truncated to what was
+        replayed, dropping the unusable tail of an interrupted write.
+        """
+        log_path = self._log_path(self.generation)
+        vectors_path = self._vectors_path(self.generation)
+        records = []
+        try:
+            with open(log_path, "rb") as handle:
+                end = 0
+                for line in handle:
+                    if not line.endswith(b"\n"):
+                        break  # torn final line from an interrupted write
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    end += len(line)
+                    records.append((record, end))
+        except FileNotFoundError:
+            pass
+        init = next((record for record, _ in records if record["op"] == "init"), None)
+        if init is None:
+            self._truncate(log_path, records[-1][1] if records else 0)
+            self._truncate(vectors_path, 0)
+            return
+        self.dimension = int(init["dimension"])
+        row_bytes = self.dimension * 4
+        stored_rows = (
+            os.path.getsize(vectors_path) // row_bytes if os.path.exists(vectors_path) else 0
+        )
+        self._row_ids = [None] * stored_rows
+        log_end = 0
+        for record, end in records:
+            op = record["op"]
+            if op == "put":
+                if record["row"] >= stored_rows:
+                    break  # its vector was lost; later records are newer still
+                self._put(record["id"], record["row"], record["metadata"])
+            elif op == "meta" and record["id"] in self._rows:
+                self._unindex(record["id"])
+                self._metadata[record["id"]] = record["metadata"]
+                self._index(record["id"])
+            elif op == "del":
+                self._drop(record["id"])
+            log_end = end
+        self._truncate(log_path, log_end)
+        self._truncate(vectors_path, stored_rows * row_bytes)
+        self._dead = stored_rows - len(self._rows)
+
+    def _truncate(self, path: str, size: int) -> None:
+        if os.path.exists(path) and os.path.getsize(path) > size:
+            self.logger.warning(
+                "Truncating %s from %d to %d bytes after an interrupted write",
+                path,
+                os.path.getsize(path),
+                size,
+            )
+            os.truncate(path, size)
+
+    def _put(self, id_: str, row: int, metadata: Dict[str, Any]) -> None:
+        self._drop(id_)
+        while len(self._row_ids) <= row:
+            self._row_ids.append(None)
+        self._rows[id_] = row
+        self._row_ids[row] = id_
+        self._metadata[id_] = metadata
+        self._index(id_)
+
+    def _drop(self, id_: str) -> bool:
+        row = self._rows.pop(id_, None)
+        if row is None:
+            return False
+        self._unindex(id_)
+        self._metadata.pop(id_, None)
+        self._row_ids[row] = None
+        self._dead += 1
+        return True
+
+    def _index(self, id_: str) -> None:
+        metadata = self._metadata[id_]
+        for field in self.INDEXED_FIELDS:
+            if field in metadata:
+                self._postings.setdefault((field, metadata[field]), set()).add(id_)
+
+    def _unindex(self, id_: str) -> None:
+        metadata = self._metadata.get(id_) or {}
+        for field in self.INDEXED_FIELDS:
+            ids = self._postings.get((field, metadata.get(field)))
+            if ids is not None:
+                ids.discard(id_)
+                if not ids:
+                    del self._postings[(field, metadata.get(field))]
+
+    def _candidate_rows(self, filter: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:  # noqa: A002
+        """Rows matching ``filter``; None when every live row is a candidate."""
+        if not filter:
+            return None
+        conditions = {
+            field: value.get("$eq") if isinstance(value, dict) else value
+            for field, value in filter.items()
+        }
+        indexed = [field for field in conditions if field in self.INDEXED_FIELDS]
+        if indexed:
+            ids: Iterable[str] = set.intersection(
+                *(self._postings.get((field, conditions[field]), set()) for field in indexed)
+            )
+        else:
+            ids = self._rows
+        remaining = [(field, value) for field, value in conditions.items() if field not in indexed]
+        rows = [
+            self._rows[id_]
+            for id_ in ids
+            if all(self._metadata[id_].get(field) == value for field, value in remaining)
+        ]
+        return np.fromiter(sorted(rows), dtype=np.int64, count=len(rows))
+
+    def _view(self) -> np.ndarray:
+        """The vectors file as a read-only memory map (re-mapped after appends)."""
+        if self._matrix is None or len(self._matrix) != len(self._row_ids):
+            if not self._row_ids or self.dimension is None:
+                self._matrix = np.empty((0, self.dimension or 0), dtype=np.float32)
+            else:
+                self._matrix = np.memmap(
+                    self._vectors_path(self.generation),
+                    dtype=np.float32,
+                    mode="r",
+                    shape=(len(self._row_ids), self.dimension),
+                )
+        return self._matrix
+
+    def _live_rows(self) -> np.ndarray:
+        if self._live is None:
+            self._live = np.asarray(sorted(self._rows.values()), dtype=np.int64)
+        return self._live
+
+    def _changed(self) -> None:
+        self._live = None
+
+    def _maybe_compact(self) -> None:
+        if self._dead >= self.compact_min_dead and self._dead > len(self._rows):
+            self.compact()
+
+    def _write_log(self, records: List[Dict[str, Any]]) -> None:
+        self._log_file.write("".join(json.dumps(record) + "\n" for record in records))
+        self._log_file.flush()
+
+
+def _normalise(matrix: np.ndarray) -> np.ndarray:
+    if matrix.ndim != 2 or not matrix.shape[1]:
+        raise ValueError("vectors must be a non-empty 2-D array")
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class LocalVectorStorage(VectorStore):
+    """Stores transcript embeddings in a `LocalVectorIndex` under VECTOR_INDEX_DIR."""
+
+    def __init__(self, settings: Settings, metrics: Optional[MetricsCollector] = None):
+        super().__init__(settings, metrics)
+        self._index: Optional[LocalVectorIndex] = None
+        self._index_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return True
+
+    def _get_index(self) -> LocalVectorIndex:
+        if self._index is None:
+            with self._index_lock:
+                if self._index is None:
+                    self._index = LocalVectorIndex(
+                        self.settings.vector_index_dir,
+                        compact_min_dead=self.settings.vector_compact_min_dead,
+                    )
+        return self._index
+
+    def close(self) -> None:
+        super().close()
+        if self._index is not None:
+            self._index.close()
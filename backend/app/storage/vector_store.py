@@ -0,0 +1,284 @@
+"""
+Backend-independent transcript ingestion and retrieval.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from ..config import Settings
+from ..logger import get_logger
+from ..metrics import MetricsCollector
+from ..services.transcript import Transcript
+
+
+class VectorStore(ABC):
+    """Chunks, embeds and stores transcripts in a vector index.
+
+    Subclasses provide the index through `_get_index`. Indexes follow the
+    Pinecone ``Index`` interface: ``upsert(vectors)``, ``fetch(ids)``,
+    ``update(id, set_metadata)``, ``delete(ids)`` and
+    ``query(vector, top_k, filter, include_metadata)``.
+    """
+
+    CHUNK_SIZE = 1000
+    CHUNK_STEP = 800
+    # Local record of ingested content hashes; None keeps it in memory only.
+    MANIFEST_FILE: Optional[str] = None
+
+    def __init__(self, settings: Settings, metrics: Optional[MetricsCollector] = None):
+        self.settings = settings
+        self.metrics = metrics or MetricsCollector()
+        self.logger = get_logger(self.__class__.__name__)
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, settings.embedding_concurrency),
+            thread_name_prefix="quizpool-embed",
+        )
+        self._manifest_lock = threading.Lock()
+        self._manifest_path = (
+            os.path.join(settings.cache_dir, self.MANIFEST_FILE)
+            if settings.cache_dir and self.MANIFEST_FILE
+            else ""
+        )
+        self._manifest: Dict[str, Dict[str, Any]] = self._load_manifest()
+
+    @property
+    @abstractmethod
+    def enabled(self) -> bool:
+        """Whether the backend is configured; ingestion is skipped otherwise."""
+
+    @abstractmethod
+    def _get_index(self):
+        """Resolve the index, once per process."""
+
+    def warm_up(self) -> None:
+        """Open the index ahead of the first request."""
+        if self.enabled:
+            self._get_index()
+
+    def store_transcript(
+        self,
+        transcript: Union[str, Transcript],
+        video_id: str,
+        embed_batch_fn: Callable[[List[str]], List[List[float]]],
+    ) -> None:
+        """Embed transcript chunks in batches and upsert them.
+
+        Ingestion is idempotent: a transcript whose content hash matches the
+        local manifest or the marker stored on the video's first vector is
+        skipped without any embedding calls. Embedding batches run
+        concurrently (bounded by EMBEDDING_CONCURRENCY) and each batch is
+        upserted as soon as it is embedded, in slices of at most
+        PINECONE_UPSERT_BATCH_SIZE vectors. Chunks of a timed `Transcript`
+        also carry their ``start``/``end`` seconds in the metadata.
+        """
+        if not self.enabled:
+            return
+
+        timed = transcript if isinstance(transcript, Transcript) else None
+        transcript = str(transcript)
+        content_hash = self.content_hash(transcript)
+        with self._manifest_lock:
+            known = self._manifest.get(video_id)
+        if known and known.get("content_hash") == content_hash:
+            return
+
+        try:
+            index = self._get_index()
+            previous = known or self._fetch_stored_state(index, video_id)
+            if previous and previous.get("content_hash") == content_hash:
+                self._remember(video_id, previous)
+                self.logger.info("Transcript for %s already stored; skipping", video_id)
+                return
+
+            chunks = self._chunk_text(transcript)
+            extras = self._chunk_times(timed, chunks) if timed else [{}] * len(chunks)
+            batch_size = max(1, self.settings.embedding_batch_size)
+            futures = [
+                self._pool.submit(
+                    self._embed_and_upsert,
+                    index,
+                    video_id,
+                    chunks[start : start + batch_size],
+                    extras[start : start + batch_size],
+                    start,
+                    embed_batch_fn,
+                )
+                for start in range(0, len(chunks), batch_size)
+            ]
+            stored = sum(future.result() for future in futures)
+            stale_count = int((previous or {}).get("chunk_count", 0))
+            if stale_count > len(chunks):
+                index.delete(
+                    ids=[f"{video_id}_{idx}" for idx in range(len(chunks), stale_count)]
+                )
+            if stored == len(chunks):
+                # The marker on chunk 0 is only written once every chunk landed,
+                # so a partial ingestion is retried on the next request.
+                state = {"content_hash": content_hash, "chunk_count": len(chunks)}
+                index.update(id=f"{video_id}_0", set_metadata=state)
+                self._remember(video_id, state)
+            if stored:
+                self.logger.info(
+                    "Stored %d transcript chunks for video %s",
+                    stored,
+                    video_id,
+                )
+        except Exception as error:
+            self.logger.warning("Vector storage failed: %s", error)
+
+    def query(
+        self, vector: List[float], top_k: int = 5, video_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Return the ``top_k`` most similar chunks as ``{"id", "score", "metadata"}``."""
+        if not self.enabled:
+            return []
+        index = self._get_index()
+        with self.metrics.stage("vector_query"):
+            response = index.query(
+                vector=vector,
+                top_k=top_k,
+                filter={"video_id": video_id} if video_id else None,
+                include_metadata=True,
+            )
+        matches = getattr(response, "matches", None)
+        if matches is None and isinstance(response, dict):
+            matches = response.get("matches")
+        return [
+            {
+                "id": _field(match, "id"),
+                "score": float(_field(match, "score")),
+                "metadata": dict(_field(match, "metadata") or {}),
+            }
+            for match in matches or []
+        ]
+
+    def _embed_and_upsert(
+        self,
+        index,
+        video_id: str,
+        chunks: List[str],
+        extras: List[Dict[str, Any]],
+        offset: int,
+        embed_batch_fn: Callable[[List[str]], List[List[float]]],
+    ) -> int:
+        vectors: List[Dict[str, Any]] = [
+            {
+                "id": f"{video_id}_{offset + idx}",
+                "values": embedding,
+                "metadata": {"text": chunk, "video_id": video_id, **extra},
+            }
+            for idx, (chunk, extra, embedding) in enumerate(
+                zip(chunks, extras, embed_batch_fn(chunks), strict=True)
+            )
+            if embedding
+        ]
+        upsert_size = max(1, self.settings.pinecone_upsert_batch_size)
+        for start in range(0, len(vectors), upsert_size):
+            with self.metrics.stage("vector_upsert"):
+                index.upsert(vectors=vectors[start : start + upsert_size])
+        return len(vectors)
+
+    @classmethod
+    def content_hash(cls, transcript: str) -> str:
+        digest = hashlib.sha256(f"{cls.CHUNK_SIZE}:{cls.CHUNK_STEP}:".encode("utf-8"))
+        digest.update(transcript.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _fetch_stored_state(self, index, video_id: str) -> Optional[Dict[str, Any]]:
+        """Read the ingestion marker from the first chunk's metadata."""
+        try:
+            response = index.fetch(ids=[f"{video_id}_0"])
+        except Exception as error:
+            self.logger.info("Could not fetch stored state for %s: %s", video_id, error)
+            return None
+        vectors = getattr(response, "vectors", None)
+        if vectors is None and isinstance(response, dict):
+            vectors = response.get("vectors")
+        vector = (vectors or {}).get(f"{video_id}_0")
+        if vector is None:
+            return None
+        metadata = _field(vector, "metadata")
+        if not metadata or "content_hash" not in metadata:
+            return None
+        return {
+            "content_hash": metadata["content_hash"],
+            "chunk_count": int(metadata.get("chunk_count", 0)),
+        }
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        if not self._manifest_path or not os.path.exists(self._manifest_path):
+            return {}
+        try:
+            with open(self._manifest_path, "r", encoding="utf-8") as handle:
+                return json.load(handle)
+        except (OSError, ValueError) as error:
+            self.logger.warning("Ignoring unreadable vector manifest: %s", error)
+            return {}
+
+    def _remember(self, video_id: str, state: Dict[str, Any]) -> None:
+        with self._manifest_lock:
+            self._manifest[video_id] = state
+            if not self._manifest_path:
+                return
+            os.makedirs(os.path.dirname(self._manifest_path), exist_ok=True)
+            tmp_path = f"{self._manifest_path}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as handle:
+                    json.dump(self._manifest, handle)
+                os.replace(tmp_path, self._manifest_path)
+            except OSError as error:
+                self.logger.warning("Vector manifest write failed: %s", error)
+
+    def _chunk_text(self, text: str, chunk_size: int = CHUNK_SIZE, step: int = CHUNK_STEP):
+        return [text[i : i + chunk_size] for i in range(0, len(text), step)]
+
+    def _chunk_times(self, transcript: Transcript, chunks: List[str]) -> List[Dict[str, Any]]:
+        """``{"start", "end"}`` seconds of each `_chunk_text` chunk.
+
+        Chunks are cut by character while segments are indexed by byte, so
+        the byte position is advanced incrementally rather than re-encoding
+        the prefix of every chunk.
+        """
+        times = []
+        position = 0
+        for idx, chunk in enumerate(chunks):
+            if idx:
+                position += len(chunks[idx - 1][: self.CHUNK_STEP].encode("utf-8"))
+            first = transcript.segment_at_byte(position)
+            last = transcript.segment_at_byte(position + max(0, len(chunk.encode("utf-8")) - 1))
+            start, end = transcript.time_span(first, last + 1)
+            times.append({"start": start, "end": end})
+        return times
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _field(item: Any, name: str) -> Any:
+    """Read ``name`` from an SDK object or a plain dict."""
+    value = getattr(item, name, None)
+    if value is None and isinstance(item, dict):
+        value = item.get(name)
+    return value
+
+
+def build_vector_store(
+    settings: Settings, metrics: Optional[MetricsCollector] = None
+) -> VectorStore:
+    """Instantiate the backend selected by ``settings.vector_backend``."""
+    if settings.vector_backend == "local":
+        from .local_index import LocalVectorStorage
+
+        return LocalVectorStorage(settings, metrics)
+    if settings.vector_backend != "pinecone":
+        get_logger(__name__).warning(
+            "Unknown VECTOR_BACKEND %r; using pinecone.", settings.vector_backend
+        )
+    from .pinecone_client import PineconeStorage
+
+    return PineconeStorage(settings, metrics)
@@ -0,0 +1,103 @@
+"""
+Background warm-up of clients and models, plus startup-time measurement.
+
+Times are measured from the import of the ``app`` package; see
+``measure_startup.py`` for a JSON report that can be tracked across releases.
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .concurrency import ExecutorPools
+from .logger import get_logger
+from .metrics import MetricsCollector
+
+
+class WarmUp:
+    """Runs warm-up steps concurrently without delaying server startup.
+
+    Every step is a blocking callable run on the I/O pool. A failed step is
+    recorded but does not block readiness: components still initialise
+    lazily on first use.
+    """
+
+    def __init__(self, started_at: float, metrics: Optional[MetricsCollector] = None):
+        self.started_at = started_at
+        self.metrics = metrics or MetricsCollector()
+        self.logger = get_logger(self.__class__.__name__)
+        self.steps: Dict[str, Callable[[], None]] = {}
+        self.components: Dict[str, Dict[str, Any]] = {}
+        self.app_created_seconds: Optional[float] = None
+        self.startup_seconds: Optional[float] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def add(self, name: str, step: Callable[[], None]) -> None:
+        self.steps[name] = step
+        self.components[name] = {"status": "pending"}
+
+    def app_created(self) -> None:
+        self.app_created_seconds = time.perf_counter() - self.started_at
+        self.metrics.register_gauge(
+            "startup_app_created_seconds", lambda: self.app_created_seconds
+        )
+
+    def start(self, executors: ExecutorPools) -> None:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run(executors))
+
+    @property
+    def ready(self) -> bool:
+        return self._task is not None and self._task.done()
+
+    async def wait(self) -> None:
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    async def _run(self, executors: ExecutorPools) -> None:
+        began = time.perf_counter()
+        await asyncio.gather(
+            *(self._step(name, step, executors) for name, step in self.steps.items())
+        )
+        finished = time.perf_counter()
+        self.startup_seconds = finished - self.started_at
+        warmup_seconds = finished - began
+        self.metrics.register_gauge("startup_warmup_seconds", lambda: warmup_seconds)
+        self.metrics.register_gauge("startup_seconds", lambda: self.startup_seconds)
+        self.logger.info(
+            "Ready %.2fs after import (warm-up %.2fs)", self.startup_seconds, warmup_seconds
+        )
+
+    async def _step(self, name: str, step: Callable[[], None], executors: ExecutorPools) -> None:
+        began = time.perf_counter()
+        self.components[name] = {"status": "warming"}
+        try:
+            await executors.run_io(step)
+        except Exception as error:
+            self.logger.warning("Warm-up of %s failed: %s", name, error)
+            self.components[name] = {"status": "failed", "error": str(error)}
+        else:
+            self.components[name] = {"status": "ready"}
+        self.components[name]["seconds"] = round(time.perf_counter() - began, 4)
+
+    def status(self) -> Dict[str, Any]:
+        if not self.ready:
+            status = "warming"
+        elif any(item["status"] == "failed" for item in self.components.values()):
+            status = "degraded"
+        else:
+            status = "ready"
+        return {
+            "status": status,
+            "components": {name: dict(item) for name, item in self.components.items()},
+            "app_created_seconds": self.app_created_seconds,
+            "startup_seconds": self.startup_seconds,
+        }
+
+    async def cancel(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
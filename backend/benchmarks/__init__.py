@@ -0,0 +1,3 @@
+"""
+Load benchmarks that run the real app against local stand-in providers.
+"""
@@ -0,0 +1,301 @@
+"""
+Local stand-ins for YouTube captions, the LLM, embeddings and Pinecone.
+
+Each stand-in subclasses the real component and replaces only the network
+call, so caching, single-flight, executors, retries, circuit breakers and
+stage metrics all run exactly as in production. Latency, error rate and
+payload size are configured per provider with the profiles below.
+"""
+
+import json
+import math
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel, Field
+
+from app.services.llm import LLMError, LLMProvider
+from app.services.quiz_service import QuizService
+from app.services.transcript_service import Captions, TranscriptService
+from app.storage.pinecone_client import PineconeStorage
+
+# z-score of the 99th percentile of a standard normal distribution.
+_Z99 = 2.3263
+
+
+class LatencyProfile(BaseModel):
+    """Log-normal latency given by its median and 99th percentile, plus an error rate."""
+
+    median_ms: float = Field(0.0, ge=0)
+    p99_ms: float = Field(0.0, ge=0)
+    error_rate: float = Field(0.0, ge=0, le=1)
+
+    def sample(self, rng: random.Random) -> float:
+        """One latency draw in seconds."""
+        if self.median_ms <= 0:
+            return 0.0
+        sigma = math.log(max(self.p99_ms, self.median_ms) / self.median_ms) / _Z99
+        return rng.lognormvariate(math.log(self.median_ms), sigma) / 1000.0
+
+    def fails(self, rng: random.Random) -> bool:
+        return self.error_rate > 0 and rng.random() < self.error_rate
+
+
+class TranscriptProfile(LatencyProfile):
+    median_ms: float = 300.0
+    p99_ms: float = 1500.0
+    segments: int = Field(200, ge=1)
+    words_per_segment: int = Field(12, ge=1)
+    segment_seconds: float = Field(4.0, gt=0)
+
+
+class LLMProfile(LatencyProfile):
+    median_ms: float = 2500.0
+    p99_ms: float = 8000.0
+    explanation_words: int = Field(25, ge=1)
+
+
+class EmbeddingProfile(LatencyProfile):
+    median_ms: float = 150.0
+    p99_ms: float = 600.0
+    dimensions: int = Field(768, ge=1)
+
+
+class VectorStoreProfile(LatencyProfile):
+    median_ms: float = 40.0
+    p99_ms: float = 250.0
+
+
+class BenchmarkConfig(BaseModel):
+    """One benchmark scenario; loaded from JSON with ``--config``."""
+
+    requests: int = Field(50, ge=1)
+    concurrency: int = Field(8, ge=1)
+    num_questions: int = Field(5, ge=1, le=50)
+    difficulty: str = Field("medium", regex=r"^(easy|medium|hard)$")
+    # Requests cycle through this many distinct videos, so repeats exercise
+    # the transcript cache and single-flight deduplication.
+    unique_videos: int = Field(50, ge=1)
+    seed: int = 0
+    transcripts: TranscriptProfile = TranscriptProfile()
+    llm: LLMProfile = LLMProfile()
+    embeddings: EmbeddingProfile = EmbeddingProfile()
+    vector_store: VectorStoreProfile = VectorStoreProfile()
+
+
+class _Randomness:
+    """A seeded RNG shared by worker threads."""
+
+    def __init__(self, seed: int):
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def latency(self, profile: LatencyProfile) -> Tuple[float, bool]:
+        """Sample ``(seconds, failed)`` for one call."""
+        with self._lock:
+            return profile.sample(self._rng), profile.fails(self._rng)
+
+    def vector(self, dimensions: int) -> List[float]:
+        with self._lock:
+            return [self._rng.uniform(-1.0, 1.0) for _ in range(dimensions)]
+
+
+_WORDS = (
+    "energy system model process signal network value structure layer function "
+    "memory cell force rate balance pattern theory sample result method"
+).split()
+
+_QUESTION_COUNT = re.compile(r"[Cc]reate (?:exactly )?(\d+)")
+_DIFFICULTY = re.compile(r"at (easy|medium|hard) difficulty")
+_DIFFICULTY_ORDER = re.compile(r"difficulty levels in order: ([a-z, ]+)")
+
+
+def _sentence(words: int, offset: int = 0) -> str:
+    return " ".join(_WORDS[(offset + idx) % len(_WORDS)] for idx in range(words))
+
+
+class StandInLLMProvider(LLMProvider):
+    """Answers quiz prompts with well-formed JSON after a sampled delay."""
+
+    name = "stand_in_llm"
+
+    def __init__(self, profile: LLMProfile, randomness: _Randomness, policy):
+        super().__init__("stand-in", policy)
+        self.profile = profile
+        self.randomness = randomness
+
+    def complete(self, prompt: str, system: Optional[str] = None) -> str:
+        return self.policy.call(self._complete, prompt)
+
+    def _complete(self, prompt: str) -> str:
+        delay, failed = self.randomness.latency(self.profile)
+        time.sleep(delay)
+        if failed:
+            raise LLMError("stand-in LLM error", retryable=True)
+        return self.render(prompt)
+
+    def render(self, prompt: str) -> str:
+        match = _QUESTION_COUNT.search(prompt)
+        count = int(match.group(1)) if match else 5
+        order = _DIFFICULTY_ORDER.search(prompt)
+        if order:
+            difficulties = [level.strip() for level in order.group(1).split(",")]
+        else:
+            level = _DIFFICULTY.search(prompt)
+            difficulties = [level.group(1) if level else "medium"]
+        questions = []
+        for idx in range(count):
+            options = [f"{letter}) {_sentence(3, idx + n)}" for n, letter in enumerate("ABCD")]
+            questions.append(
+                {
+                    "question": f"Question {idx + 1}: {_sentence(8, idx)}?",
+                    "options": options,
+                    "correct_answer": options[idx % 4],
+                    "explanation": _sentence(self.profile.explanation_words, idx),
+                    "difficulty": difficulties[min(idx, len(difficulties) - 1)],
+                }
+            )
+        return json.dumps(questions)
+
+
+class StandInTranscriptService(TranscriptService):
+    """Serves synthetic captions; audio transcription is never reached."""
+
+    profile = TranscriptProfile()
+    randomness = _Randomness(0)
+
+    def warm_up(self) -> None:
+        return None
+
+    def _get_caption_segments(self, video_id: str) -> Optional[Captions]:
+        with self.metrics.stage("caption_fetch"):
+            delay, failed = self.randomness.latency(self.profile)
+            time.sleep(delay)
+        if failed:
+            raise HTTPException(status_code=502, detail="Stand-in caption fetch failed")
+        profile = self.profile
+        segments = [
+            {
+                "text": _sentence(profile.words_per_segment, idx),
+                "start": idx * profile.segment_seconds,
+                "duration": profile.segment_seconds,
+            }
+            for idx in range(profile.segments)
+        ]
+        return segments, "en"
+
+
+class StandInQuizService(QuizService):
+    """Uses `StandInLLMProvider` and synthetic embeddings."""
+
+    llm_profile = LLMProfile()
+    embedding_profile = EmbeddingProfile()
+    randomness = _Randomness(0)
+
+    def _build_provider(self) -> Optional[LLMProvider]:
+        return StandInLLMProvider(
+            self.llm_profile,
+            self.randomness,
+            policy=self.resilience.policy(StandInLLMProvider.name),
+        )
+
+    def _embed_content(self, content):
+        delay, failed = self.randomness.latency(self.embedding_profile)
+        time.sleep(delay)
+        if failed:
+            raise LLMError("stand-in embedding error", retryable=True)
+        dimensions = self.embedding_profile.dimensions
+        if isinstance(content, list):
+            return {"embedding": [self.randomness.vector(dimensions) for _ in content]}
+        return {"embedding": self.randomness.vector(dimensions)}
+
+
+class _StandInIndex:
+    def __init__(self, profile: VectorStoreProfile, randomness: _Randomness):
+        self.profile = profile
+        self.randomness = randomness
+        self.metadata: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _call(self) -> None:
+        delay, failed = self.randomness.latency(self.profile)
+        time.sleep(delay)
+        if failed:
+            raise RuntimeError("stand-in vector store error")
+
+    def upsert(self, vectors: List[Dict[str, Any]]) -> None:
+        self._call()
+        with self._lock:
+            for vector in vectors:
+                self.metadata[vector["id"]] = dict(vector.get("metadata") or {})
+
+    def fetch(self, ids: List[str]) -> Dict[str, Any]:
+        self._call()
+        with self._lock:
+            found = {id_: {"metadata": self.metadata[id_]} for id_ in ids if id_ in self.metadata}
+        return {"vectors": found}
+
+    def update(self, id: str, set_metadata: Dict[str, Any]) -> None:  # noqa: A002
+        self._call()
+        with self._lock:
+            self.metadata.setdefault(id, {}).update(set_metadata)
+
+    def delete(self, ids: List[str]) -> None:
+        self._call()
+        with self._lock:
+            for id_ in ids:
+                self.metadata.pop(id_, None)
+
+
+class _StandInClient:
+    def __init__(self, index: _StandInIndex):
+        self.index = index
+
+    def has_index(self, name: str) -> bool:
+        return True
+
+    def Index(self, name: str) -> _StandInIndex:  # noqa: N802 - mirrors the Pinecone SDK
+        return self.index
+
+
+class StandInStorage(PineconeStorage):
+    """Pinecone storage backed by an in-memory index with sampled latency."""
+
+    profile = VectorStoreProfile()
+    randomness = _Randomness(0)
+
+    def _init_client(self):
+        return _StandInClient(_StandInIndex(self.profile, self.randomness))
+
+
+def stand_in_components(config: BenchmarkConfig) -> Dict[str, Type]:
+    """Stand-in classes bound to ``config``, as keyword arguments for `create_app`."""
+    randomness = _Randomness(config.seed)
+    transcripts = type(
+        "StandInTranscriptService",
+        (StandInTranscriptService,),
+        {"profile": config.transcripts, "randomness": randomness},
+    )
+    quiz = type(
+        "StandInQuizService",
+        (StandInQuizService,),
+        {
+            "llm_profile": config.llm,
+            "embedding_profile": config.embeddings,
+            "randomness": randomness,
+        },
+    )
+    storage = type(
+        "StandInStorage",
+        (StandInStorage,),
+        {"profile": config.vector_store, "randomness": randomness},
+    )
+    return {
+        "transcript_service_cls": transcripts,
+        "quiz_service_cls": quiz,
+        "storage_cls": storage,
+    }
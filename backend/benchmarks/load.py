@@ -0,0 +1,205 @@
+"""
+End-to-end load benchmark for ``POST /api/generate-quiz``.
+
+Drives the real `create_app()` with local stand-in providers (see
+``benchmarks/fakes.py``) and prints a JSON report with latency percentiles,
+throughput, status counts and per-stage timings. Run from ``backend/``::
+
+    python -m benchmarks.load --requests 200 --concurrency 16 --output report.json
+    python -m benchmarks.load --config scenario.json --baseline report.json
+
+With ``--baseline`` the run exits non-zero when p50/p95/p99 latency or
+throughput regress by more than ``--max-regression`` (a fraction).
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from app.config import Settings
+from app.main import create_app
+
+from .fakes import BenchmarkConfig, stand_in_components
+
+ENDPOINT = "/api/generate-quiz"
+
+
+def benchmark_settings(**overrides: Any) -> Settings:
+    """Settings isolating the run from the environment, rate limits and disk caches."""
+    values: Dict[str, Any] = {
+        "log_level": "WARNING",
+        "rate_limit_routes": {},
+        "rate_limit_requests": 10**9,
+        "transcription_workers": 0,
+        "cache_dir": "",
+        "quiz_cache_enabled": False,
+        "llm_backoff_seconds": 0.05,
+        "llm_backoff_max_seconds": 0.5,
+    }
+    values.update(overrides)
+    return Settings(_env_file=None, **values)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of ``values`` (0.0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def video_id(index: int) -> str:
+    return f"bench{index:06d}"
+
+
+async def run_benchmark(
+    config: BenchmarkConfig, settings: Optional[Settings] = None
+) -> Dict[str, Any]:
+    """Run one scenario against a fresh app and return the report."""
+    app = create_app(settings=settings or benchmark_settings(), **stand_in_components(config))
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    errors: Counter = Counter()
+    counter = iter(range(config.requests))
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        for index in counter:
+            payload = {
+                "youtube_url": (
+                    "https://www.youtube.com/watch?v="
+                    f"{video_id(index % config.unique_videos)}"
+                ),
+                "num_questions": config.num_questions,
+                "difficulty": config.difficulty,
+            }
+            began = time.perf_counter()
+            try:
+                response = await client.post(ENDPOINT, json=payload)
+            except Exception as error:
+                statuses["exception"] += 1
+                errors[type(error).__name__] += 1
+                continue
+            latencies.append(time.perf_counter() - began)
+            statuses[str(response.status_code)] += 1
+            if response.status_code >= 400:
+                errors[str(response.json().get("detail", ""))[:80]] += 1
+
+    async with app.router.lifespan_context(app):
+        await app.state.warmup.wait()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://benchmark", timeout=None
+        ) as client:
+            began = time.perf_counter()
+            await asyncio.gather(
+                *(worker(client) for _ in range(min(config.concurrency, config.requests)))
+            )
+            elapsed = time.perf_counter() - began
+
+    return {
+        "endpoint": ENDPOINT,
+        "config": json.loads(config.json()),
+        "requests": config.requests,
+        "concurrency": config.concurrency,
+        "duration_seconds": round(elapsed, 4),
+        "throughput_rps": round(config.requests / elapsed, 3) if elapsed else 0.0,
+        "latency_ms": _summary(latencies),
+        "status_counts": dict(statuses),
+        "errors": dict(errors.most_common(10)),
+        "stages": _stages(app.state.metrics.histograms()),
+        "counters": app.state.metrics.export(),
+    }
+
+
+def _summary(latencies: List[float]) -> Dict[str, float]:
+    millis = [value * 1000.0 for value in latencies]
+    return {
+        "p50": round(percentile(millis, 0.50), 3),
+        "p95": round(percentile(millis, 0.95), 3),
+        "p99": round(percentile(millis, 0.99), 3),
+        "mean": round(sum(millis) / len(millis), 3) if millis else 0.0,
+        "max": round(max(millis), 3) if millis else 0.0,
+    }
+
+
+def _stages(histograms: Dict) -> Dict[str, Dict[str, float]]:
+    """Count, total and mean milliseconds per pipeline stage."""
+    stages = {}
+    for (name, labels), data in sorted(histograms.items()):
+        if name != "stage_duration_seconds":
+            continue
+        summary = data["summary"]
+        count = int(summary["count"])
+        stages[dict(labels)["stage"]] = {
+            "count": count,
+            "total_ms": round(summary["sum"] * 1000.0, 3),
+            "mean_ms": round(summary["sum"] * 1000.0 / count, 3) if count else 0.0,
+        }
+    return stages
+
+
+def compare(
+    report: Dict[str, Any], baseline: Dict[str, Any], max_regression: float
+) -> List[str]:
+    """Describe every latency or throughput regression beyond ``max_regression``."""
+    regressions = []
+    for key in ("p50", "p95", "p99"):
+        before = baseline["latency_ms"][key]
+        after = report["latency_ms"][key]
+        if before and after > before * (1 + max_regression):
+            regressions.append(f"latency {key}: {before:.1f}ms -> {after:.1f}ms")
+    before = baseline["throughput_rps"]
+    after = report["throughput_rps"]
+    if before and after < before * (1 - max_regression):
+        regressions.append(f"throughput: {before:.2f} -> {after:.2f} req/s")
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--config", help="JSON scenario (see BenchmarkConfig)")
+    parser.add_argument("--requests", type=int, help="Override the number of requests")
+    parser.add_argument("--concurrency", type=int, help="Override concurrent clients")
+    parser.add_argument("--output", help="Also write the report to this file")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.1)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    config = BenchmarkConfig.parse_file(args.config) if args.config else BenchmarkConfig()
+    overrides = {
+        key: value
+        for key, value in (("requests", args.requests), ("concurrency", args.concurrency))
+        if value is not None
+    }
+    if overrides:
+        config = config.copy(update=overrides)
+
+    report = asyncio.run(run_benchmark(config))
+    rendered = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(rendered + "\n")
+    print(rendered)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as handle:
+            regressions = compare(report, json.load(handle), args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+"""
+Print startup timings as JSON so they can be tracked across releases.
+
+    python measure_startup.py
+
+Reports the time to import the app package and build the app, each
+warm-up component, and the total time until `/ready` would return 200.
+"""
+
+import asyncio
+import json
+import time
+
+
+async def measure():
+    # Imported here: spawned transcription workers re-import this module.
+    began = time.perf_counter()
+    from app.main import app
+
+    import_seconds = time.perf_counter() - began
+    async with app.router.lifespan_context(app):
+        await app.state.warmup.wait()
+        report = app.state.warmup.status()
+    report["import_seconds"] = round(import_seconds, 4)
+    return report
+
+
+if __name__ == "__main__":
+    print(json.dumps(asyncio.run(measure()), indent=2))
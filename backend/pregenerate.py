@@ -0,0 +1,202 @@
+"""
+Pre-generate quizzes for known videos so live requests are served from cache.
+
+    python pregenerate.py videos.txt --num-questions 5 --difficulty medium
+    python pregenerate.py videos.txt --concurrency 8 --checkpoint warm.jsonl
+
+Input has one video ID or YouTube URL per line (``-`` reads stdin; blank
+lines and ``#`` comments are skipped). Each video runs through the same
+pipeline and settings as the API: the transcript, embedding and quiz caches
+under ``CACHE_DIR`` and the configured vector store are filled, so a live
+request with the same options does no remote work.
+
+Every finished video is appended to the ``--checkpoint`` JSONL file, and a
+re-run skips videos already completed with the same options, so an
+interrupted run resumes where it stopped. A JSON report with throughput and
+failures is printed at the end; the exit status is 1 if any video failed.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from fastapi import HTTPException
+
+from app.config import Settings
+from app.models.schemas import QuizOptions, QuizResponse
+
+# Counters copied into the report to show what was written.
+REPORTED_COUNTERS = (
+    "transcript_cache_writes_total",
+    "embedding_cache_writes_total",
+    "quiz_cache_writes_total",
+    "questions_deduplicated_total",
+    "question_topups_total",
+)
+
+
+def read_inputs(lines: Iterable[str]) -> List[str]:
+    entries = []
+    for line in lines:
+        entry = line.split("#", 1)[0].strip()
+        if entry:
+            entries.append(entry)
+    return entries
+
+
+def options_key(options: QuizOptions) -> Dict[str, Any]:
+    """The options a cached quiz depends on, stored with each checkpoint entry."""
+    return {
+        "num_questions": options.num_questions,
+        "difficulty": options.difficulty,
+        "difficulty_mix": options.difficulty_mix,
+    }
+
+
+def completed_videos(path: str, options: QuizOptions) -> Set[str]:
+    """Videos the checkpoint records as completed with the same options."""
+    if not os.path.exists(path):
+        return set()
+    expected = options_key(options)
+    done = set()
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # a line torn by an interrupted write
+            if entry.get("status") == "completed" and entry.get("options") == expected:
+                done.add(entry["video_id"])
+    return done
+
+
+async def pregenerate(
+    inputs: List[str],
+    options: QuizOptions,
+    checkpoint: str,
+    settings: Settings,
+) -> Dict[str, Any]:
+    # Imported here: spawned transcription workers re-import this module.
+    from app.main import create_app
+
+    app = create_app(settings=settings)
+    batches = app.state.batches
+    metrics = app.state.metrics
+    if not settings.cache_dir or not settings.quiz_cache_enabled:
+        print(
+            "warning: set CACHE_DIR and QUIZ_CACHE_ENABLED=true (for this run and the API) "
+            "so pre-generated transcripts and quizzes are served; otherwise only the "
+            "vector store is warmed.",
+            file=sys.stderr,
+        )
+
+    video_ids: List[str] = []
+    failures: List[Dict[str, Any]] = []
+    for entry in inputs:
+        try:
+            video_ids.append(batches.pipeline.transcripts.extract_video_id(entry))
+        except HTTPException as error:
+            failures.append({"video_id": entry, "error": error.detail, "status_code": 400})
+    video_ids = list(dict.fromkeys(video_ids))
+    done = completed_videos(checkpoint, options)
+    pending = [video_id for video_id in video_ids if video_id not in done]
+
+    completed = finished = 0
+    started = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        with open(checkpoint, "a", encoding="utf-8") as handle:
+            async for result in batches.run(
+                pending, options, lambda _video_id, _transcript, quiz: QuizResponse(quiz=quiz)
+            ):
+                entry = {
+                    "video_id": result.video_id,
+                    "status": result.status,
+                    "options": options_key(options),
+                    "questions": len(result.result.quiz) if result.result else 0,
+                    "error": result.error,
+                    "finished_at": time.time(),
+                }
+                handle.write(json.dumps(entry) + "\n")
+                handle.flush()
+                finished += 1
+                if result.status == "completed":
+                    completed += 1
+                else:
+                    failures.append(
+                        {
+                            "video_id": result.video_id,
+                            "error": result.error,
+                            "status_code": result.status_code,
+                        }
+                    )
+                print(
+                    f"[{finished}/{len(pending)}] {result.video_id} {result.status}",
+                    file=sys.stderr,
+                )
+        elapsed = time.perf_counter() - started
+        counters = metrics.export()
+
+    return {
+        "videos": len(video_ids),
+        "skipped": len(video_ids) - len(pending),
+        "completed": completed,
+        "failed": len(failures),
+        "seconds": round(elapsed, 3),
+        "videos_per_second": round(len(pending) / elapsed, 3) if elapsed else 0.0,
+        "counters": {name: counters.get(name, 0) for name in REPORTED_COUNTERS},
+        "failures": failures,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("input", help="file with one video ID or URL per line, or '-'")
+    parser.add_argument("--num-questions", type=int, default=5)
+    parser.add_argument("--difficulty", default="medium")
+    parser.add_argument(
+        "--difficulty-mix", type=json.loads, default=None, help='e.g. \'{"easy": 2, "hard": 3}\''
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="cap for each stage (transcripts, ingestion, generation); "
+        "defaults to the BATCH_*_CONCURRENCY settings",
+    )
+    parser.add_argument("--checkpoint", default="pregenerate-checkpoint.jsonl")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    options = QuizOptions(
+        num_questions=args.num_questions,
+        difficulty=args.difficulty,
+        difficulty_mix=args.difficulty_mix,
+    )
+    overrides: Dict[str, Any] = {}
+    if args.concurrency:
+        overrides = {
+            "batch_transcript_concurrency": args.concurrency,
+            "batch_ingest_concurrency": args.concurrency,
+            "batch_generation_concurrency": args.concurrency,
+        }
+    if args.input == "-":
+        inputs = read_inputs(sys.stdin)
+    else:
+        with open(args.input, "r", encoding="utf-8") as handle:
+            inputs = read_inputs(handle)
+
+    report = asyncio.run(pregenerate(inputs, options, args.checkpoint, Settings(**overrides)))
+    rendered = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(rendered + "\n")
+    print(rendered)
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,36 @@
 # yt_quiz/qgen_service.py
-import os
 import json
-import time
 import re
-from typing import List, Dict, Any, Optional
-from dotenv import load_dotenv
+import threading
+from typing import Any, Dict, List, Optional
 
-load_dotenv()
+from app.config import get_settings
+from app.resilience import shared_resilience
+from app.services.dedup import QuestionIndex
+from app.services.llm import DeepSeekProvider
 
-# Configure DeepSeek: set DEEPSEEK_API_KEY in env; optionally DEEPSEEK_BASE_URL (default provided)
-DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
-DEEPSEEK_BASE_URL = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com")  # or "https://api.deepseek.com/v1"
-USE_DEEPSEEK = bool(DEEPSEEK_API_KEY)
+# Configure DeepSeek: set DEEPSEEK_API_KEY in env; optionally DEEPSEEK_BASE_URL (default provided).
+# Pool limits and timeouts come from the LLM_* settings in app/config.py.
+settings = get_settings()
+USE_DEEPSEEK = bool(settings.deepseek_api_key)
+
+# One pooled, keep-alive provider shared by every chunk (created on first use).
+# Its breaker and retry budget come from the process's shared Resilience, which
+# create_app() installs, so these calls share them with the API.
+_provider: Optional[DeepSeekProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_provider() -> DeepSeekProvider:
+    global _provider
+    policy = shared_resilience(settings).policy(DeepSeekProvider.name)
+    with _provider_lock:
+        if _provider is None or _provider.policy is not policy:
+            if _provider is not None:
+                _provider.close()
+            _provider = DeepSeekProvider(settings, policy=policy)
+        return _provider
 
-# Standard libs
-import requests
 
 SYSTEM_PROMPT = (
     "You are an instructional design assistant. Given an excerpt of a lecture transcript "
@@ -58,142 +74,162 @@ def extract_first_json_array(text: str) -> Optional[List[Any]]:
         return None
 
 
-def call_deepseek_for_questions(chunk_text: str, time_start: float, time_end: float, difficulty: str, n: int = 1, model: str = "deepseek-chat") -> List[Dict[str, Any]]:
+def build_user_prompt(
+    chunk_text: str, time_start: float, time_end: float, difficulty: str, n: int
+) -> str:
+    return (
+        f"Transcript time range: {time_start:.2f} to {time_end:.2f} (seconds)\n"
+        f"Target difficulty: {difficulty}\n"
+        f"Number of questions to create: {n}\n\n"
+        f"Transcript:\n---\n{chunk_text.strip()}\n---\n\n"
+        "Return ONLY a JSON array of question objects."
+    )
+
+
+def parse_questions(content: str) -> List[Dict[str, Any]]:
+    """
+    Extract the question dicts from a model reply.
+    Raises RuntimeError if no JSON array can be parsed.
+    """
+    parsed = extract_first_json_array(content)
+    if parsed is None:
+        raise RuntimeError(
+            "Could not parse JSON array from DeepSeek response. Preview: " + content[:1200]
+        )
+    # normalize items to dicts
+    return [item for item in parsed if isinstance(item, dict)]
+
+
+def call_deepseek_for_questions(
+    chunk_text: str, time_start: float, time_end: float, difficulty: str, n: int = 1
+) -> List[Dict[str, Any]]:
     """
     Call the DeepSeek chat completion endpoint (OpenAI-compatible) to generate questions.
     - DEEPSEEK_API_KEY must be set in environment.
     - DEEPSEEK_BASE_URL can be overridden (defaults to https://api.deepseek.com)
+    Reuses the shared connection pool; transient errors are retried with jittered backoff
+    while the retry budget allows, and an open circuit fails immediately (CircuitOpenError).
     Returns a list of question dicts on success; raises RuntimeError on failure.
     """
     if not USE_DEEPSEEK:
         raise RuntimeError("DEEPSEEK_API_KEY not configured")
+    prompt = build_user_prompt(chunk_text, time_start, time_end, difficulty, n)
+    return parse_questions(get_provider().complete(prompt, system=SYSTEM_PROMPT))
 
-    url = DEEPSEEK_BASE_URL.rstrip("/") + "/v1/chat/completions"
 
-    headers = {
-        "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
-        "Content-Type": "application/json",
-    }
+async def acall_deepseek_for_questions(
+    chunk_text: str, time_start: float, time_end: float, difficulty: str, n: int = 1
+) -> List[Dict[str, Any]]:
+    """
+    Async variant of call_deepseek_for_questions, for fanning out many chunks on one loop.
+    Backoff between retries awaits instead of blocking.
+    """
+    if not USE_DEEPSEEK:
+        raise RuntimeError("DEEPSEEK_API_KEY not configured")
+    prompt = build_user_prompt(chunk_text, time_start, time_end, difficulty, n)
+    return parse_questions(await get_provider().acomplete(prompt, system=SYSTEM_PROMPT))
 
-    system_msg = {"role": "system", "content": SYSTEM_PROMPT}
-    user_msg = {
-        "role": "user",
-        "content": (
-            f"Transcript time range: {time_start:.2f} to {time_end:.2f} (seconds)\n"
-            f"Target difficulty: {difficulty}\n"
-            f"Number of questions to create: {n}\n\nTranscript:\n---\n{chunk_text.strip()}\n---\n\nReturn ONLY a JSON array of question objects."
-        )
-    }
-
-    payload = {
-        "model": model,
-        "messages": [system_msg, user_msg],
-        "temperature": 0.2,
-        "max_tokens": 1200,
-        # you can set top_p, n, stop etc. as desired
-    }
-
-    # Do a small retry with backoff on transient errors
-    last_err = None
-    for attempt in range(3):
-        try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=30)
-            if resp.status_code >= 500:
-                last_err = RuntimeError(f"DeepSeek server error: {resp.status_code} {resp.text[:200]}")
-                time.sleep(1 + attempt * 1.5)
-                continue
-            if resp.status_code != 200:
-                # return helpful message for debugging
-                raise RuntimeError(f"DeepSeek API error {resp.status_code}: {resp.text}")
-
-            j = resp.json()
-            # Expect OpenAI-compatible response shape: choices[0].message.content
-            # but DeepSeek variants may differ; try a few common structures
-            content = None
-            if isinstance(j, dict):
-                # Try standard OpenAI-compatible shape
-                choices = j.get("choices")
-                if choices and isinstance(choices, list) and len(choices) > 0:
-                    first = choices[0]
-                    # new style: first.message.content
-                    if isinstance(first, dict) and first.get("message") and first["message"].get("content"):
-                        content = first["message"]["content"]
-                    # older style: first["text"] or first["message"]["content"]
-                    elif isinstance(first, dict) and first.get("text"):
-                        content = first["text"]
-                    elif isinstance(first, dict) and first.get("message"):
-                        # try flattening
-                        try:
-                            content = json.dumps(first["message"])
-                        except Exception:
-                            content = str(first["message"])
-                # some APIs return 'output' or 'output_text'
-                if content is None:
-                    content = j.get("output_text") or j.get("output") or None
-
-            if content is None:
-                raise RuntimeError("DeepSeek returned unexpected response structure: " + json.dumps(j)[:1000])
-
-            # Attempt to extract JSON array
-            parsed = extract_first_json_array(content)
-            if parsed is None:
-                # As a last resort, try if content itself is JSON dict with questions key
-                try:
-                    parsed2 = json.loads(content)
-                    if isinstance(parsed2, dict) and "questions" in parsed2:
-                        parsed = parsed2["questions"]
-                except Exception:
-                    parsed = None
-
-            if parsed is None:
-                raise RuntimeError("Could not parse JSON array from DeepSeek response. Preview: " + content[:1200])
-
-            # normalize items to dicts
-            results = []
-            for item in parsed:
-                if isinstance(item, dict):
-                    results.append(item)
-            return results
-
-        except requests.RequestException as rexc:
-            last_err = rexc
-            time.sleep(0.8 + attempt * 0.5)
-            continue
-    # if we exit loop, raise last error
-    raise RuntimeError(f"DeepSeek request failed after retries: {last_err}")
-
-
-def mock_questions(chunk_text: str, time_start: float, time_end: float, difficulty: str, n: int = 1) -> List[Dict[str, Any]]:
+
+MOCK_STEMS = [
+    "According to this segment, what is the main idea discussed?",
+    "Which example does the speaker use in this segment?",
+    "What conclusion does the speaker reach in this segment?",
+    "Which term is defined in this segment?",
+]
+
+
+def mock_questions(
+    chunk_text: str, time_start: float, time_end: float, difficulty: str, n: int = 1
+) -> List[Dict[str, Any]]:
     """
-    Minimal placeholder when DEEPSEEK_API_KEY is not set or the call fails.
+    Minimal placeholder when DEEPSEEK_API_KEY is not set (local development).
+    Each question is a separate dict with its own stem, so callers can edit or
+    de-duplicate them.
     """
-    q = {
-        "question_text": "According to this segment, what is the main idea discussed?",
-        "choices": [
-            "A tangential topic unrelated to the segment",
-            "The primary concept explained by the speaker",
-            "A future topic not yet covered",
-            "A contradictory idea not mentioned"
-        ],
-        "correct_choice": 1,
-        "difficulty": difficulty,
-        "time_start": time_start,
-        "time_end": time_end,
-        "short_explanation": "The speaker emphasizes this as the central idea in the excerpt."
-    }
-    return [q for _ in range(n)]
-
-
-def generate_for_chunk(chunk_text: str, time_start: float, time_end: float, difficulty: str, n: int = 1) -> List[Dict[str, Any]]:
+    return [
+        {
+            "question_text": MOCK_STEMS[i % len(MOCK_STEMS)]
+            + (f" (part {i // len(MOCK_STEMS) + 1})" if i >= len(MOCK_STEMS) else ""),
+            "choices": [
+                "A tangential topic unrelated to the segment",
+                "The primary concept explained by the speaker",
+                "A future topic not yet covered",
+                "A contradictory idea not mentioned"
+            ],
+            "correct_choice": 1,
+            "difficulty": difficulty,
+            "time_start": time_start,
+            "time_end": time_end,
+            "short_explanation": "The speaker emphasizes this as the central idea in the excerpt."
+        }
+        for i in range(n)
+    ]
+
+
+def question_key(question: Dict[str, Any]) -> str:
+    """Text compared for near-duplicates: the stem, the choices and the correct one."""
+    choices = [str(choice) for choice in question.get("choices") or []]
+    correct = question.get("correct_choice")
+    answer = choices[correct] if isinstance(correct, int) and 0 <= correct < len(choices) else ""
+    return " ".join([str(question.get("question_text", "")), *choices, answer])
+
+
+def generate_for_chunk(
+    chunk_text: str, time_start: float, time_end: float, difficulty: str, n: int = 1
+) -> List[Dict[str, Any]]:
     """
-    Main entry used by the rest of your app. Tries DeepSeek if configured, otherwise returns mock questions.
+    Main entry used by the rest of your app.
+    Uses DeepSeek if configured, otherwise returns mock questions.
+    DeepSeek failures are raised rather than replaced with mock questions, so callers see
+    an outage (fast, once the circuit is open) instead of silently serving placeholders.
+    Near-duplicate questions are dropped and only the shortfall is requested again, for at
+    most QUESTION_TOPUP_ROUNDS extra calls.
     """
-    if USE_DEEPSEEK:
-        try:
-            return call_deepseek_for_questions(chunk_text, time_start, time_end, difficulty, n=n)
-        except Exception as e:
-            # In production log error; here we fallback to mock for resilience
-            print("DeepSeek call failed, falling back to mock questions:", e)
-            return mock_questions(chunk_text, time_start, time_end, difficulty, n=n)
-    else:
+    if not USE_DEEPSEEK:
         return mock_questions(chunk_text, time_start, time_end, difficulty, n=n)
+    index = QuestionIndex(settings.question_dedup_threshold)
+    questions = index.unique(
+        call_deepseek_for_questions(chunk_text, time_start, time_end, difficulty, n=n),
+        key=question_key,
+    )
+    for _ in range(settings.question_topup_rounds):
+        if len(questions) >= n:
+            break
+        more = index.unique(
+            call_deepseek_for_questions(
+                chunk_text, time_start, time_end, difficulty, n=n - len(questions)
+            ),
+            key=question_key,
+        )
+        if not more:
+            break
+        questions.extend(more)
+    return questions[:n]
+
+
+async def agenerate_for_chunk(
+    chunk_text: str, time_start: float, time_end: float, difficulty: str, n: int = 1
+) -> List[Dict[str, Any]]:
+    """
+    Async variant of generate_for_chunk, e.g. for asyncio.gather over all chunks of a video.
+    """
+    if not USE_DEEPSEEK:
+        return mock_questions(chunk_text, time_start, time_end, difficulty, n=n)
+    index = QuestionIndex(settings.question_dedup_threshold)
+    questions = index.unique(
+        await acall_deepseek_for_questions(chunk_text, time_start, time_end, difficulty, n=n),
+        key=question_key,
+    )
+    for _ in range(settings.question_topup_rounds):
+        if len(questions) >= n:
+            break
+        more = index.unique(
+            await acall_deepseek_for_questions(
+                chunk_text, time_start, time_end, difficulty, n=n - len(questions)
+            ),
+            key=question_key,
+        )
+        if not more:
+            break
+        questions.extend(more)
+    return questions[:n]
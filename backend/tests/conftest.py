@@ -0,0 +1,26 @@
+import asyncio
+
+import httpx
+import pytest
+
+
+@pytest.fixture
+def asgi_client():
+    """Run ``body(client)`` against ``app`` in-process and return its result.
+
+    ``client`` is an ``httpx.AsyncClient`` talking to the app over ASGI. With
+    ``lifespan=True`` the app's startup and shutdown hooks run around ``body``.
+    """
+
+    def run(app, body, lifespan=False):
+        async def main():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                if not lifespan:
+                    return await body(client)
+                async with app.router.lifespan_context(app):
+                    return await body(client)
+
+        return asyncio.run(main())
+
+    return run
@@ -0,0 +1,114 @@
+import asyncio
+import json
+import threading
+import time
+
+from app.config import Settings
+from app.main import create_app
+from app.models.schemas import Quiz
+from app.services.quiz_service import QuizService
+from app.services.transcript_service import TranscriptService
+
+URLS = [
+    f"https://youtu.be/{video_id}" for video_id in ("aaaaaaaaaaa", "bbbbbbbbbbb", "ccccccccccc")
+]
+
+
+def _captions(self, video_id):
+    words = 2 if video_id == "bbbbbbbbbbb" else 50  # "bbb…" is too short to quiz
+    return [{"text": "word " * words, "start": 0.0, "duration": 60.0}], "en"
+
+
+def _events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n", 1)
+        events.append((event[len("event: ") :], json.loads(data[len("data: ") :])))
+    return events
+
+
+def test_batch_stream_reports_each_video_and_bounds_generation(monkeypatch, asgi_client):
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def generate_quiz(self, transcript, num_questions, difficulty, fresh=False, topup_round=0):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.05)
+        with lock:
+            state["active"] -= 1
+        return [
+            Quiz(
+                question=f"About {len(transcript)}?",
+                options=["A"],
+                correct_answer="A",
+                explanation="",
+            )
+        ]
+
+    monkeypatch.setattr(TranscriptService, "_get_caption_segments", _captions)
+    monkeypatch.setattr(QuizService, "generate_quiz", generate_quiz)
+    app = create_app(settings=Settings(batch_generation_concurrency=1, question_topup_rounds=0))
+
+    async def run(client):
+        return await client.post(
+            "/api/batch/stream", json={"youtube_urls": URLS + URLS[:1], "num_questions": 1}
+        )
+
+    response = asgi_client(app, run)
+    events = _events(response.text)
+
+    assert response.status_code == 200
+    assert events[0] == ("videos", {"video_ids": ["aaaaaaaaaaa", "bbbbbbbbbbb", "ccccccccccc"]})
+    results = {data["video_id"]: data for event, data in events if event == "video"}
+    assert results["aaaaaaaaaaa"]["status"] == "completed"
+    assert results["aaaaaaaaaaa"]["result"]["transcript_url"] == "/api/transcript/aaaaaaaaaaa"
+    assert results["bbbbbbbbbbb"]["status"] == "failed"
+    assert results["bbbbbbbbbbb"]["status_code"] == 400
+    assert events[-1] == ("done", {"completed": 2, "failed": 1})
+    assert state["peak"] == 1
+
+
+def test_batch_job_expands_playlists(monkeypatch, asgi_client):
+    monkeypatch.setattr(TranscriptService, "_get_caption_segments", _captions)
+    monkeypatch.setattr(QuizService, "generate_quiz", lambda self, **_kwargs: [])
+    monkeypatch.setattr(
+        TranscriptService,
+        "resolve_playlist",
+        lambda self, url, limit: ["ccccccccccc", "aaaaaaaaaaa"][:limit],
+    )
+    app = create_app(
+        settings=Settings(batch_max_videos=2, rate_limit_routes={"POST /api/batch": 3})
+    )
+
+    async def run(client):
+        submitted = await client.post(
+            "/api/batch/jobs",
+            json={"playlist_url": "https://www.youtube.com/playlist?list=PL123"},
+        )
+        job_id = submitted.json()["job_id"]
+        for _ in range(100):
+            polled = (await client.get(f"/api/jobs/{job_id}")).json()
+            if polled["status"] in ("completed", "failed"):
+                break
+            await asyncio.sleep(0.01)
+        too_many = await client.post("/api/batch/jobs", json={"youtube_urls": URLS})
+        ambiguous = await client.post(
+            "/api/batch/jobs",
+            json={"youtube_urls": URLS[:1], "playlist_url": "https://youtube.com/playlist"},
+        )
+        return submitted, polled, too_many, ambiguous
+
+    submitted, polled, too_many, ambiguous = asgi_client(app, run)
+
+    assert submitted.status_code == 202
+    assert polled["status"] == "completed"
+    assert polled["progress"] == 1.0
+    assert [video["video_id"] for video in polled["result"]["videos"]] == [
+        "ccccccccccc",
+        "aaaaaaaaaaa",
+    ]
+    assert polled["result"]["completed"] == 2
+    assert too_many.status_code == 400
+    assert ambiguous.status_code == 422
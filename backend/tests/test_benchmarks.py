@@ -0,0 +1,49 @@
+import asyncio
+
+from app.config import Settings
+from app.resilience import Resilience
+from benchmarks.fakes import BenchmarkConfig, LLMProfile, StandInLLMProvider, _Randomness
+from benchmarks.load import compare, percentile, run_benchmark
+
+
+def test_benchmark_reports_latency_throughput_and_stages():
+    config = BenchmarkConfig(
+        requests=6,
+        concurrency=3,
+        unique_videos=2,
+        transcripts={"median_ms": 0, "segments": 20},
+        llm={"median_ms": 0},
+        embeddings={"median_ms": 0, "dimensions": 8},
+        vector_store={"median_ms": 0},
+    )
+
+    report = asyncio.run(run_benchmark(config))
+
+    assert report["status_counts"] == {"200": 6}
+    assert set(report["latency_ms"]) == {"p50", "p95", "p99", "mean", "max"}
+    assert report["throughput_rps"] > 0
+    assert report["stages"]["caption_fetch"]["count"] == 2
+    assert {"generation", "json_parse", "embedding", "vector_upsert"} <= set(report["stages"])
+
+
+def test_stand_in_llm_follows_prompt_question_count_and_difficulties():
+    provider = StandInLLMProvider(
+        LLMProfile(median_ms=0), _Randomness(0), Resilience(Settings()).policy("test")
+    )
+
+    text = provider.render(
+        "Create exactly 3 questions, with these difficulty levels in order: easy, hard, hard\n"
+    )
+
+    assert '"difficulty": "easy"' in text
+    assert text.count('"question"') == 3
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = {"latency_ms": {"p50": 100, "p95": 200, "p99": 300}, "throughput_rps": 10}
+    report = {"latency_ms": {"p50": 105, "p95": 260, "p99": 300}, "throughput_rps": 8}
+
+    regressions = compare(report, baseline, max_regression=0.1)
+
+    assert [line.split(":")[0] for line in regressions] == ["latency p95", "throughput"]
+    assert percentile([3, 1, 2, 4], 0.5) == 2
@@ -0,0 +1,37 @@
+from app.metrics import MetricsCollector
+from app.storage.cache import MemoryLRU, TieredCache
+
+
+def test_memory_lru_evicts_by_bytes():
+    lru = MemoryLRU(max_bytes=10)
+    lru.set("a", b"12345", expires_at=1e12)
+    lru.set("b", b"12345", expires_at=1e12)
+    assert lru.get("a") == b"12345"  # "a" becomes most recently used
+    lru.set("c", b"123", expires_at=1e12)
+    assert lru.get("b") is None
+    assert lru.get("a") == b"12345"
+    assert lru.current_bytes == 8
+
+
+def test_memory_lru_expires_entries():
+    lru = MemoryLRU(max_bytes=100)
+    lru.set("a", b"value", expires_at=100.0)
+    assert lru.get("a", now=99.0) == b"value"
+    assert lru.get("a", now=101.0) is None
+    assert lru.current_bytes == 0
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    metrics = MetricsCollector()
+    first = TieredCache("transcript", 1024, 60, disk_dir=str(tmp_path), metrics=metrics)
+    first.set("vid:en", b"hello world" * 10)
+
+    second = TieredCache("transcript", 1024, 60, disk_dir=str(tmp_path), metrics=metrics)
+    assert second.get("vid:en") == b"hello world" * 10
+    assert second.get("vid:en") == b"hello world" * 10
+    assert second.get("other:en") is None
+
+    counters = metrics.export()
+    assert counters["transcript_cache_disk_hits_total"] == 1
+    assert counters["transcript_cache_memory_hits_total"] == 1
+    assert counters["transcript_cache_misses_total"] == 1
@@ -0,0 +1,38 @@
+from app.services.chunking import chunk_transcript, normalize_mix, plan_chunks
+
+
+def _segments(count, seconds=10.0):
+    return [
+        {"text": f"s{idx}", "start": idx * seconds, "duration": seconds} for idx in range(count)
+    ]
+
+
+def test_chunk_transcript_groups_by_time():
+    chunks = chunk_transcript(_segments(7), max_chunk_seconds=30)
+    assert [chunk["text"] for chunk in chunks] == ["s0 s1 s2", "s3 s4 s5", "s6"]
+    assert (chunks[1]["start"], chunks[1]["end"]) == (30.0, 60.0)
+
+
+def test_normalize_mix_scales_to_total():
+    assert normalize_mix(6, {"easy": 1, "medium": 1, "hard": 1}) == ["easy"] * 2 + [
+        "medium"
+    ] * 2 + ["hard"] * 2
+    assert len(normalize_mix(5, {"easy": 2, "medium": 3, "hard": 1})) == 5
+    assert normalize_mix(3, {}) == ["medium"] * 3
+
+
+def test_plan_covers_whole_video_with_spread_difficulties():
+    # 2 hours of 10s segments -> 40 chunks of 180s, but only 4 questions.
+    plan = plan_chunks(_segments(720), ["easy", "hard", "medium", "medium"], 180)
+    assert len(plan) == 4
+    assert plan[0]["start"] == 0.0
+    assert plan[-1]["end"] == 7200.0
+    assert sorted(d for chunk in plan for d in chunk["difficulties"]) == [
+        "easy",
+        "hard",
+        "medium",
+        "medium",
+    ]
+
+    plan = plan_chunks(_segments(36), ["easy"] * 2 + ["hard"] * 2 + ["medium"] * 2, 180)
+    assert [chunk["difficulties"] for chunk in plan] == [["easy", "medium", "hard"]] * 2
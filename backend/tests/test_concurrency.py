@@ -0,0 +1,101 @@
+import asyncio
+import threading
+
+from app.concurrency import ExecutorPools, SingleFlight
+from app.config import Settings
+from app.main import create_app
+from app.services.quiz_service import QuizService
+from app.services.transcript_service import TranscriptService
+
+
+def test_pools_run_off_event_loop_thread():
+    pools = ExecutorPools(Settings(io_pool_workers=2, cpu_pool_workers=1))
+
+    async def run():
+        return await asyncio.gather(
+            pools.run_io(threading.current_thread), pools.run_cpu(threading.current_thread)
+        )
+
+    try:
+        io_thread, cpu_thread = asyncio.run(run())
+    finally:
+        pools.shutdown()
+    assert io_thread.name.startswith("quizpool-io")
+    assert cpu_thread.name.startswith("quizpool-cpu")
+
+
+def test_health_responds_while_transcript_fetch_blocks(monkeypatch, asgi_client):
+    release = threading.Event()
+
+    def slow_captions(self, video_id):
+        release.wait(timeout=5)
+        return [{"text": "word " * 50, "start": 0.0, "duration": 60.0}], "en"
+
+    monkeypatch.setattr(TranscriptService, "_get_caption_segments", slow_captions)
+    monkeypatch.setattr(QuizService, "generate_quiz", lambda self, **_kwargs: [])
+    app = create_app()
+
+    async def run(client):
+        pending = asyncio.create_task(
+            client.post(
+                "/api/generate-quiz",
+                json={"youtube_url": "https://youtu.be/dQw4w9WgXcQ"},
+            )
+        )
+        health = await asyncio.wait_for(client.get("/health"), timeout=2)
+        assert not pending.done()
+        release.set()
+        response = await pending
+        return health, response
+
+    health, response = asgi_client(app, run)
+    assert health.status_code == 200
+    assert response.status_code == 200
+    assert response.json()["quiz"] == []
+
+
+def test_single_flight_shares_result_and_errors():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def work(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        if value == "boom":
+            raise RuntimeError("failed")
+        return value
+
+    async def run():
+        ok = await asyncio.gather(*(flight.run("k", lambda: work("v")) for _ in range(5)))
+        failed = await asyncio.gather(
+            *(flight.run("e", lambda: work("boom")) for _ in range(3)),
+            return_exceptions=True,
+        )
+        return ok, failed
+
+    ok, failed = asyncio.run(run())
+    assert ok == ["v"] * 5
+    assert all(isinstance(error, RuntimeError) for error in failed)
+    assert calls == ["v", "boom"]
+    assert len(flight) == 0
+    assert flight.metrics.export()["test_singleflight_coalesced_total"] == 6
+
+
+def test_single_flight_survives_cancelled_leader():
+    flight = SingleFlight("test")
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run():
+        leader = asyncio.create_task(flight.run("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.run("k", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower, leader
+
+    result, leader = asyncio.run(run())
+    assert result == "done"
+    assert leader.cancelled()
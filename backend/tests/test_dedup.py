@@ -0,0 +1,72 @@
+import hashlib
+
+from app.metrics import MetricsCollector
+from app.models.schemas import Quiz
+from app.services.dedup import QuestionIndex
+
+
+def _quiz(question, answer="A"):
+    return Quiz(question=question, options=["A", "B"], correct_answer=answer, explanation="")
+
+
+def test_near_duplicates_are_rejected_in_order():
+    metrics = MetricsCollector()
+    index = QuestionIndex(threshold=0.6, metrics=metrics)
+    questions = [
+        _quiz("What is the main idea discussed in the video?"),
+        _quiz("What is the main idea being discussed in the video?"),
+        _quiz("Which algorithm minimises the loss function?"),
+        _quiz("What is the main idea discussed in the video?"),
+    ]
+
+    kept = index.unique(questions)
+
+    assert kept == [questions[0], questions[2]]
+    assert len(index) == 2
+    assert metrics.export()["questions_deduplicated_total"] == 2
+    # Later batches are compared with everything accepted so far.
+    assert index.unique([_quiz("Which algorithm minimises the loss function?")]) == []
+
+
+def test_template_shaped_questions_with_different_answers_are_kept():
+    index = QuestionIndex()
+    complexities = ["O(1)", "O(log n)", "O(n)", "O(n log n)"]
+    questions = [
+        Quiz(
+            question="What is the time complexity of binary search?",
+            options=complexities,
+            correct_answer="O(log n)",
+            explanation="",
+        ),
+        Quiz(
+            question="What is the time complexity of linear search?",
+            options=complexities,
+            correct_answer="O(n)",
+            explanation="",
+        ),
+        _quiz("What causes inflation?", "Growth of the money supply"),
+        _quiz("What causes unemployment?", "Weak demand for labour"),
+        _quiz("According to the lecture, which algorithm minimises the loss function?"),
+        _quiz("According to the lecture, which algorithm minimizes the loss function?"),
+    ]
+
+    assert index.unique(questions) == questions[:5]
+
+
+def test_signatures_estimate_jaccard_similarity():
+    index = QuestionIndex()
+    signatures = index.signatures(["the quick brown fox jumps", "the quick brown fox leaps", "x"])
+
+    assert signatures.shape == (3, 64)
+    assert (signatures[0] == signatures[1]).mean() > 0.4
+    assert (signatures[0] == signatures[2]).mean() < 0.1
+
+
+def test_large_pools_keep_distinct_questions():
+    texts = [f"Question about {hashlib.sha1(str(idx).encode()).hexdigest()}" for idx in range(3000)]
+    index = QuestionIndex()
+
+    accepted = index.add_many(texts + texts[:500])
+
+    assert accepted[:3000].all()
+    assert not accepted[3000:].any()
@@ -0,0 +1,57 @@
+from app.config import Settings
+from app.services.quiz_service import QuizService
+from app.storage.embedding_cache import VectorPack, embedding_key
+
+
+def test_batch_embeddings_only_request_cache_misses(tmp_path, monkeypatch):
+    requested = []
+
+    def fake_embed(self, content):
+        requested.append(list(content))
+        return {"embedding": [[float(len(text)), 0.5] for text in content]}
+
+    monkeypatch.setattr(QuizService, "_embed_content", fake_embed)
+    service = QuizService(Settings(cache_dir=str(tmp_path)))
+    embed_batch = service.get_batch_embedding_fn()
+
+    assert embed_batch(["aa", "bbb", "aa"]) == [[2.0, 0.5], [3.0, 0.5], [2.0, 0.5]]
+    assert embed_batch(["bbb", " aa\n", "c"]) == [[3.0, 0.5], [2.0, 0.5], [1.0, 0.5]]
+    assert requested == [["aa", "bbb"], ["c"]]
+    counters = service.metrics.export()
+    assert counters["embedding_cache_memory_hits_total"] == 2
+    assert counters["embedding_cache_misses_total"] == 4
+    assert service.metrics.gauges()["embedding_cache_hit_ratio"] == 2 / 6
+    service.close()
+
+    # A new process reads the vectors back from disk.
+    restarted = QuizService(Settings(cache_dir=str(tmp_path)))
+    assert restarted.get_embedding_fn()("bbb") == [3.0, 0.5]
+    assert restarted.metrics.export()["embedding_cache_disk_hits_total"] == 1
+    assert requested == [["aa", "bbb"], ["c"]]
+    restarted.close()
+
+
+def test_failed_embeddings_are_not_cached(monkeypatch):
+    monkeypatch.setattr(
+        QuizService, "_embed_content", lambda self, content: {"embedding": [[0.1]]}
+    )
+    service = QuizService(Settings(llm_max_retries=1))
+
+    assert service.get_batch_embedding_fn()(["a", "b"]) == [[], []]
+    assert service.embedding_cache.get_many(["a", "b"]) == [None, None]
+
+
+def test_vector_pack_ignores_torn_tail(tmp_path):
+    pack = VectorPack(str(tmp_path))
+    key = embedding_key("model", "text")
+    pack.put(key, b"\x00" * 12)
+    pack.close()
+    with open(tmp_path / f"3{VectorPack.SUFFIX}", "ab") as handle:
+        handle.write(b"partial")
+
+    reopened = VectorPack(str(tmp_path))
+    assert len(reopened) == 1
+    assert reopened.get(key) == b"\x00" * 12
+    reopened.put(embedding_key("model", "other"), b"\x01" * 12)
+    reopened.close()
+    assert len(VectorPack(str(tmp_path))) == 2
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.config import Settings
+from app.jobs import InMemoryJobStore, JobManager
+from app.main import create_app
+from app.services.quiz_service import QuizService
+from app.services.transcript_service import TranscriptService
+
+
+class RecordingStore(InMemoryJobStore):
+    """Stand-in store that records every state transition."""
+
+    def __init__(self):
+        super().__init__()
+        self.history = []
+
+    async def save(self, job):
+        self.history.append((job.status, job.stage))
+        await super().save(job)
+
+
+def test_job_endpoint_reports_stages_and_result(monkeypatch, asgi_client):
+    monkeypatch.setattr(
+        TranscriptService,
+        "_get_caption_segments",
+        lambda self, video_id: ([{"text": "word " * 50, "start": 0.0, "duration": 60.0}], "en"),
+    )
+    monkeypatch.setattr(QuizService, "generate_quiz", lambda self, **_kwargs: [])
+    store = RecordingStore()
+    app = create_app(job_store=store)
+
+    async def run(client):
+        submitted = await client.post(
+            "/api/jobs", json={"youtube_url": "https://youtu.be/dQw4w9WgXcQ"}
+        )
+        job_id = submitted.json()["job_id"]
+        for _ in range(100):
+            polled = (await client.get(f"/api/jobs/{job_id}")).json()
+            if polled["status"] in ("completed", "failed"):
+                break
+            await asyncio.sleep(0.01)
+        missing = await client.get("/api/jobs/unknown")
+        return submitted, polled, missing
+
+    submitted, polled, missing = asgi_client(app, run)
+    assert submitted.status_code == 202
+    assert polled["status"] == "completed"
+    assert polled["progress"] == 1.0
+    assert polled["result"]["quiz"] == []
+    assert missing.status_code == 404
+    stages = [stage for _, stage in store.history]
+    assert stages.index("fetching_transcript") < stages.index("embedding")
+    assert stages[-1] == "completed"
+
+
+def test_job_manager_rejects_when_queue_full():
+    manager = JobManager(Settings(job_workers=1, job_queue_size=1))
+
+    async def run():
+        gate = asyncio.Event()
+
+        async def blocked(report):
+            await gate.wait()
+
+        await manager.submit(blocked)  # picked up by the worker
+        await asyncio.sleep(0)
+        await manager.submit(blocked)  # waits in the queue
+        with pytest.raises(HTTPException) as error:
+            await manager.submit(blocked)
+        gate.set()
+        await manager.shutdown()
+        return error.value
+
+    assert asyncio.run(run()).status_code == 503
+
+
+class FlakyStore(InMemoryJobStore):
+    """Store that fails the first time a job is marked running."""
+
+    def __init__(self):
+        super().__init__()
+        self.failed = False
+
+    async def save(self, job):
+        if job.status == "running" and not self.failed:
+            self.failed = True
+            raise ConnectionError("store unavailable")
+        await super().save(job)
+
+
+def test_store_errors_fail_the_job_but_keep_the_worker():
+    manager = JobManager(Settings(job_workers=1), store=FlakyStore())
+
+    async def work(report):
+        return "done"
+
+    async def run():
+        first = await manager.submit(work)
+        second = await manager.submit(work)
+        await asyncio.wait_for(manager._queue.join(), timeout=2)
+        jobs = [await manager.get(first.job_id), await manager.get(second.job_id)]
+        await manager.shutdown()
+        return jobs
+
+    first, second = asyncio.run(run())
+    assert first.status == "failed"
+    assert "store unavailable" in first.error
+    assert second.status == "completed"
+    assert second.result == "done"
+    assert manager.metrics.export()["job_worker_errors_total"] == 1
@@ -0,0 +1,72 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.config import Settings
+from app.resilience import Resilience
+from app.services.llm import DeepSeekProvider, LLMError
+
+
+def _reply(content):
+    return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+
+def _provider(handler, **overrides):
+    settings = Settings(deepseek_api_key="key", llm_backoff_seconds=0, **overrides)
+    transport = httpx.MockTransport(handler)
+    return DeepSeekProvider(
+        settings,
+        Resilience(settings).policy(DeepSeekProvider.name),
+        client=httpx.Client(transport=transport, base_url=settings.deepseek_base_url),
+        async_client=httpx.AsyncClient(transport=transport, base_url=settings.deepseek_base_url),
+    )
+
+
+def test_deepseek_retries_transient_errors_then_succeeds():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(503, text="busy")
+        if len(calls) == 2:
+            raise httpx.ConnectError("reset")
+        return _reply('[{"question_text": "Q"}]')
+
+    provider = _provider(handler)
+    assert provider.complete("prompt", system="sys") == '[{"question_text": "Q"}]'
+    assert len(calls) == 3
+    assert calls[0].url.path == "/v1/chat/completions"
+    body = calls[0].read().decode()
+    assert '"role": "system"' in body or '"role":"system"' in body
+
+
+def test_deepseek_does_not_retry_client_errors():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(401, text="bad key")
+
+    with pytest.raises(LLMError) as raised:
+        _provider(handler).complete("prompt")
+    assert not raised.value.retryable
+    assert len(calls) == 1
+
+
+def test_deepseek_async_fan_out_shares_one_client():
+    def handler(request):
+        return _reply("ok")
+
+    provider = _provider(handler, llm_max_retries=2)
+
+    async def run():
+        results = await asyncio.gather(*(provider.acomplete(f"chunk {i}") for i in range(8)))
+        client = provider.async_client
+        await provider.aclose()
+        return results, client
+
+    results, client = asyncio.run(run())
+    assert results == ["ok"] * 8
+    assert client.is_closed
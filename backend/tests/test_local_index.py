@@ -0,0 +1,130 @@
+import numpy as np
+
+from app.config import Settings
+from app.services.transcript import Transcript
+from app.storage.local_index import LocalVectorIndex, LocalVectorStorage
+from app.storage.vector_store import build_vector_store
+
+
+def _vectors(ids, rng, dimension=8, video_id="vid"):
+    return [
+        {
+            "id": id_,
+            "values": rng.normal(size=dimension).tolist(),
+            "metadata": {"video_id": video_id},
+        }
+        for id_ in ids
+    ]
+
+
+def test_query_returns_cosine_top_k_with_filters(tmp_path):
+    rng = np.random.default_rng(0)
+    index = LocalVectorIndex(str(tmp_path))
+    index.upsert(_vectors([f"a_{i}" for i in range(20)], rng, video_id="a"))
+    index.upsert(_vectors([f"b_{i}" for i in range(20)], rng, video_id="b"))
+    target = index.fetch(["a_7"])["vectors"]["a_7"]["values"]
+
+    matches = index.query(target, top_k=3)["matches"]
+    assert matches[0]["id"] == "a_7"
+    assert abs(matches[0]["score"] - 1.0) < 1e-5
+    assert matches[0]["score"] >= matches[1]["score"] >= matches[2]["score"]
+
+    filtered = index.query(target, top_k=50, filter={"video_id": "b"})["matches"]
+    assert len(filtered) == 20
+    assert all(match["metadata"]["video_id"] == "b" for match in filtered)
+    index.close()
+
+
+def test_overwrites_deletes_and_compaction_survive_reopen(tmp_path):
+    rng = np.random.default_rng(1)
+    index = LocalVectorIndex(str(tmp_path), compact_min_dead=4)
+    index.upsert(_vectors(["x_0", "x_1", "x_2"], rng))
+    index.upsert(_vectors(["x_0"], rng))
+    index.update("x_1", {"content_hash": "abc"})
+    index.delete(["x_2"])
+    assert len(index) == 2
+    assert index.generation == 0
+    expected = index.fetch(["x_0"])["vectors"]["x_0"]["values"]
+    index.close()
+
+    reopened = LocalVectorIndex(str(tmp_path), compact_min_dead=4)
+    assert len(reopened) == 2
+    assert reopened.fetch(["x_1"])["vectors"]["x_1"]["metadata"]["content_hash"] == "abc"
+    assert np.allclose(reopened.fetch(["x_0"])["vectors"]["x_0"]["values"], expected)
+
+    reopened.delete(["x_1"])
+    reopened.upsert(_vectors(["x_0", "x_0"], rng))  # dead rows now outnumber live ones
+    assert reopened.generation == 1
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "CURRENT",
+        "records-1.jsonl",
+        "vectors-1.f32",
+    ]
+    assert [match["id"] for match in reopened.query(expected, top_k=5)["matches"]] == ["x_0"]
+    reopened.close()
+
+
+def test_torn_writes_are_truncated_so_later_appends_survive(tmp_path):
+    rng = np.random.default_rng(2)
+    index = LocalVectorIndex(str(tmp_path))
+    index.upsert(_vectors(["a", "b"], rng))
+    expected = index.fetch(["a"])["vectors"]["a"]["values"]
+    index.close()
+    # Crash mid-upsert of "b2": half a vector row and half a log line.
+    with open(tmp_path / "vectors-0.f32", "ab") as handle:
+        handle.write(b"\x00" * 12)
+    with open(tmp_path / "records-0.jsonl", "a", encoding="utf-8") as handle:
+        handle.write('{"op": "put", "id": "b2", "ro')
+
+    reopened = LocalVectorIndex(str(tmp_path))
+    assert len(reopened) == 2
+    values = rng.normal(size=8)
+    reopened.upsert([{"id": "c", "values": values.tolist(), "metadata": {}}])
+    reopened.close()
+
+    final = LocalVectorIndex(str(tmp_path))
+    found = final.fetch(["a", "b", "c"])["vectors"]
+    assert sorted(found) == ["a", "b", "c"]
+    assert np.allclose(found["a"]["values"], expected)
+    assert np.allclose(found["c"]["values"], values / np.linalg.norm(values), atol=1e-6)
+    final.close()
+
+
+def test_local_storage_ingests_once_and_is_selected_by_settings(tmp_path):
+    settings = Settings(vector_backend="local", vector_index_dir=str(tmp_path / "index"))
+    storage = build_vector_store(settings)
+    assert isinstance(storage, LocalVectorStorage)
+    calls = []
+
+    def embed_batch(texts):
+        calls.append(len(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    storage.store_transcript("a" * 3000, "vid", embed_batch)
+    storage.store_transcript("a" * 3000, "vid", embed_batch)
+    assert calls == [4]
+    matches = storage.query([1000.0, 1.0], top_k=2, video_id="vid")
+    assert [match["metadata"]["video_id"] for match in matches] == ["vid", "vid"]
+    storage.close()
+
+    restarted = LocalVectorStorage(settings)
+    restarted.store_transcript("a" * 3000, "vid", embed_batch)
+    assert calls == [4]
+    restarted.close()
+
+
+def test_timed_transcripts_store_chunk_times(tmp_path):
+    settings = Settings(vector_backend="local", vector_index_dir=str(tmp_path / "index"))
+    storage = LocalVectorStorage(settings)
+    # 100 segments of "ééé…" (multi-byte) lasting 5s each: 10 characters apiece.
+    transcript = Transcript.from_segments(
+        [{"text": "é" * 9, "start": idx * 5.0, "duration": 5.0} for idx in range(100)]
+    )
+
+    storage.store_transcript(transcript, "vid", lambda texts: [[1.0, 0.0]] * len(texts))
+
+    matches = storage.query([1.0, 0.0], top_k=10, video_id="vid")
+    times = {match["id"]: match["metadata"] for match in matches}
+    assert (times["vid_0"]["start"], times["vid_0"]["end"]) == (0.0, 500.0)
+    assert (times["vid_1"]["start"], times["vid_1"]["end"]) == (400.0, 500.0)
+    storage.close()
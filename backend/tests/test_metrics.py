@@ -0,0 +1,61 @@
+import threading
+
+from app.metrics import MetricsCollector
+
+
+def test_observations_from_many_threads_are_merged():
+    metrics = MetricsCollector(namespace="test", buckets=(0.1, 1.0))
+
+    def record():
+        for _ in range(1000):
+            metrics.increment("requests_total")
+            metrics.observe("stage_duration_seconds", 0.5, stage="generation")
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert metrics.export() == {"requests_total": 4000}
+    assert metrics.histogram("stage_duration_seconds", stage="generation") == {
+        "count": 4000,
+        "sum": 2000.0,
+    }
+
+
+def test_prometheus_exposition_is_namespaced_and_cumulative():
+    metrics = MetricsCollector(namespace="test", buckets=(0.1, 1.0))
+    metrics.increment("jobs_submitted_total", 2)
+    metrics.add_gauge("http_requests_in_flight", 1)
+    metrics.register_gauge("job_queue_depth", lambda: 3)
+    metrics.observe("stage_duration_seconds", 0.05, stage="caption_fetch")
+    metrics.observe("stage_duration_seconds", 5.0, stage="caption_fetch")
+    with metrics.stage("json_parse"):
+        pass
+
+    text = metrics.render_prometheus()
+    assert "# TYPE test_jobs_submitted_total counter\ntest_jobs_submitted_total 2" in text
+    assert "test_http_requests_in_flight 1" in text
+    assert "test_job_queue_depth 3" in text
+    assert text.count("# TYPE test_stage_duration_seconds histogram") == 1
+    assert 'test_stage_duration_seconds_bucket{stage="caption_fetch",le="0.1"} 1' in text
+    assert 'test_stage_duration_seconds_bucket{stage="caption_fetch",le="1"} 1' in text
+    assert 'test_stage_duration_seconds_bucket{stage="caption_fetch",le="+Inf"} 2' in text
+    assert 'test_stage_duration_seconds_count{stage="caption_fetch"} 2' in text
+    assert 'test_stage_duration_seconds_count{stage="json_parse"} 1' in text
+
+
+def test_registered_histograms_use_their_own_buckets():
+    metrics = MetricsCollector(buckets=(0.1, 1.0, 10.0))
+    metrics.register_histogram("ratio", (0.25, 0.5, 0.75, 1.0))
+    for value in (0.2, 0.3, 0.6, 0.9):
+        metrics.observe("ratio", value)
+    metrics.observe("stage_duration_seconds", 5.0, stage="generation")
+
+    histograms = metrics.histograms()
+    assert histograms[("ratio", ())]["buckets"] == [1, 1, 1, 1, 0]
+    text = metrics.render_prometheus()
+    assert 'ratio_bucket{le="0.5"} 2' in text
+    assert 'ratio_bucket{le="10"}' not in text
+    assert 'stage_duration_seconds_bucket{stage="generation",le="10"} 1' in text
@@ -0,0 +1,87 @@
+from app.config import Settings
+from app.storage.pinecone_client import PineconeStorage
+
+
+class FakeIndex:
+    def __init__(self):
+        self.upserts = []
+        self.vectors = {}
+        self.deleted = []
+
+    def upsert(self, vectors):
+        self.upserts.append(vectors)
+        for vector in vectors:
+            self.vectors[vector["id"]] = dict(vector, metadata=dict(vector["metadata"]))
+
+    def update(self, id, set_metadata):
+        self.vectors[id]["metadata"].update(set_metadata)
+
+    def fetch(self, ids):
+        return {"vectors": {key: self.vectors[key] for key in ids if key in self.vectors}}
+
+    def delete(self, ids):
+        self.deleted.extend(ids)
+
+
+class FakeClient:
+    def __init__(self, index=None):
+        self.index = index or FakeIndex()
+        self.has_index_calls = 0
+
+    def has_index(self, name):
+        self.has_index_calls += 1
+        return True
+
+    def Index(self, name):
+        return self.index
+
+
+def test_store_transcript_batches_embeddings_and_upserts():
+    settings = Settings(embedding_batch_size=4, pinecone_upsert_batch_size=3)
+    storage = PineconeStorage(settings)
+    storage.client = FakeClient()
+    batches = []
+
+    def embed_batch(texts):
+        batches.append(len(texts))
+        return [[0.1, 0.2] for _ in texts]
+
+    transcript = "x" * 800 * 9  # nine chunks
+    storage.store_transcript(transcript, "vid", embed_batch)
+    storage.close()
+
+    assert sorted(batches) == [1, 4, 4]
+    upserted = [vector["id"] for batch in storage.client.index.upserts for vector in batch]
+    assert sorted(upserted, key=lambda value: int(value.split("_")[1])) == [
+        f"vid_{idx}" for idx in range(9)
+    ]
+    assert max(len(batch) for batch in storage.client.index.upserts) <= 3
+
+
+def test_store_transcript_is_idempotent(tmp_path):
+    settings = Settings(cache_dir=str(tmp_path))
+    storage = PineconeStorage(settings)
+    storage.client = FakeClient()
+    calls = []
+
+    def embed_batch(texts):
+        calls.append(len(texts))
+        return [[0.1] for _ in texts]
+
+    storage.store_transcript("a" * 3000, "vid", embed_batch)
+    storage.store_transcript("a" * 3000, "vid", embed_batch)
+    assert calls == [4]
+    assert storage.client.has_index_calls == 1
+
+    # A fresh process sharing the index skips via the stored marker.
+    restarted = PineconeStorage(Settings())
+    restarted.client = FakeClient(storage.client.index)
+    restarted.store_transcript("a" * 3000, "vid", embed_batch)
+    assert calls == [4]
+
+    # A shorter transcript re-ingests and removes stale chunks.
+    storage.store_transcript("b" * 1000, "vid", embed_batch)
+    assert calls == [4, 2]
+    assert storage.client.index.deleted == ["vid_2", "vid_3"]
+    storage.close()
+    restarted.close()
@@ -0,0 +1,277 @@
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+
+from app.concurrency import ExecutorPools
+from app.config import Settings
+from app.models.schemas import Quiz
+from app.services.llm import LLMProvider
+from app.services.pipeline import QuizPipeline
+from app.services.quiz_service import QuizService
+from app.services.transcript import Transcript
+
+
+class StubTranscripts:
+    def __init__(self, segments):
+        self.segments = segments
+
+    async def get_segments_async(self, video_id, executors, on_stage=None):
+        return Transcript.from_segments(self.segments, "captions")
+
+
+class StubStorage:
+    def store_transcript(self, transcript, video_id, embed_batch_fn):
+        return None
+
+
+class StubQuizService:
+    def __init__(self, settings):
+        self.settings = settings
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def get_batch_embedding_fn(self):
+        return lambda texts: [[0.0] for _ in texts]
+
+    def generate_chunk_quiz(self, text, start, end, difficulties, fresh=False, topup_round=0):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        return [
+            Quiz(
+                question=hashlib.sha1(f"{start}-{idx}".encode()).hexdigest(),
+                options=["A", "B", "C", "D"],
+                correct_answer="A",
+                explanation="",
+                difficulty=difficulty,
+                time_start=start,
+                time_end=end,
+            )
+            for idx, difficulty in enumerate(difficulties)
+        ]
+
+
+def test_long_transcripts_use_concurrent_timestamped_chunks():
+    settings = Settings(map_reduce_threshold_chars=1000, map_chunk_seconds=60, map_concurrency=3)
+    segments = [
+        {"text": "sentence " * 10, "start": idx * 10.0, "duration": 10.0} for idx in range(60)
+    ]
+    quiz_service = StubQuizService(settings)
+    executors = ExecutorPools(settings)
+    pipeline = QuizPipeline(
+        StubTranscripts(segments), quiz_service, StubStorage(), executors
+    )
+
+    started = time.perf_counter()
+    _, quiz = asyncio.run(pipeline.generate("vid", 6, "medium"))
+    elapsed = time.perf_counter() - started
+    executors.shutdown()
+
+    assert len(quiz) == 6
+    assert [question.time_start for question in quiz] == sorted(
+        question.time_start for question in quiz
+    )
+    assert quiz[-1].time_end == 600.0
+    assert quiz_service.peak == 3
+    assert elapsed < 0.05 * 6
+    assert {question.difficulty for question in quiz} == {"medium"}
+
+
+class FlakyQuizService(StubQuizService):
+    """Fails the first chunk and answers the second with one question short."""
+
+    def generate_chunk_quiz(self, text, start, end, difficulties, fresh=False, topup_round=0):
+        if start == 0.0:
+            raise ValueError("malformed model output")
+        questions = super().generate_chunk_quiz(text, start, end, difficulties, fresh, topup_round)
+        return questions[:-1] if start == 60.0 else questions
+
+
+def test_failed_and_short_chunks_are_counted():
+    settings = Settings(
+        map_reduce_threshold_chars=1000, map_chunk_seconds=60, question_topup_rounds=0
+    )
+    segments = [
+        {"text": "sentence " * 10, "start": idx * 10.0, "duration": 10.0} for idx in range(60)
+    ]
+    executors = ExecutorPools(settings)
+    pipeline = QuizPipeline(
+        StubTranscripts(segments), FlakyQuizService(settings), StubStorage(), executors
+    )
+
+    _, quiz = asyncio.run(pipeline.generate("vid", 20, "medium"))
+    executors.shutdown()
+
+    counters = pipeline.metrics.export()
+    assert counters["map_reduce_chunks_total"] == 10
+    assert counters["map_reduce_chunk_failures_total"] == 1
+    assert counters["map_reduce_questions_missing_total"] == 1
+    assert len(quiz) == 20 - 2 - 1
+
+
+class OneAtATimeQuizService(StubQuizService):
+    """Answers each chunk request with only its first requested difficulty."""
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        self.requests = []
+
+    def generate_chunk_quiz(self, text, start, end, difficulties, fresh=False, topup_round=0):
+        self.requests.append(list(difficulties))
+        questions = super().generate_chunk_quiz(text, start, end, difficulties, fresh, topup_round)
+        for question in questions:
+            question.question += f"-{topup_round}"
+        return questions[:1]
+
+
+def test_chunk_top_ups_measure_each_round_against_the_original_plan():
+    settings = Settings(map_chunk_seconds=600, question_topup_rounds=2)
+    segments = [
+        {"text": "sentence " * 10, "start": idx * 10.0, "duration": 10.0} for idx in range(6)
+    ]
+    quiz_service = OneAtATimeQuizService(settings)
+    executors = ExecutorPools(settings)
+    pipeline = QuizPipeline(StubTranscripts(segments), quiz_service, StubStorage(), executors)
+
+    _, quiz = asyncio.run(
+        pipeline.generate("vid", 3, "medium", difficulty_mix={"easy": 1, "medium": 1, "hard": 1})
+    )
+    executors.shutdown()
+
+    first, second, third = quiz_service.requests
+    assert sorted(first) == ["easy", "hard", "medium"]
+    assert second == first[1:]
+    assert third == first[2:]
+    assert sorted(question.difficulty for question in quiz) == ["easy", "hard", "medium"]
+
+
+class RepetitiveQuizService:
+    """Repeats one question on the first call, then answers with distinct ones."""
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.calls = []
+
+    def get_batch_embedding_fn(self):
+        return lambda texts: [[0.0] for _ in texts]
+
+    def generate_quiz(self, transcript, num_questions, difficulty, fresh=False, topup_round=0):
+        self.calls.append((num_questions, fresh, topup_round))
+        if len(self.calls) == 1:
+            stems = ["What is the main idea of the video?"] * num_questions
+        else:
+            stems = [
+                f"Question {hashlib.sha1(str(idx).encode()).hexdigest()}?"
+                for idx in range(num_questions)
+            ]
+        return [
+            Quiz(question=stem, options=["A", "B"], correct_answer="A", explanation="")
+            for stem in stems
+        ]
+
+
+def test_duplicate_questions_are_dropped_and_topped_up():
+    settings = Settings()
+    segments = [
+        {"text": "sentence " * 10, "start": idx * 10.0, "duration": 10.0} for idx in range(3)
+    ]
+    quiz_service = RepetitiveQuizService(settings)
+    executors = ExecutorPools(settings)
+    pipeline = QuizPipeline(
+        StubTranscripts(segments), quiz_service, StubStorage(), executors
+    )
+
+    _, quiz = asyncio.run(pipeline.generate("vid", 4, "medium"))
+    executors.shutdown()
+
+    assert len(quiz) == 4
+    assert len({question.question for question in quiz}) == 4
+    assert quiz_service.calls == [(4, False, 0), (3, False, 1)]
+    assert pipeline.metrics.export()["questions_deduplicated_total"] == 3
+
+
+class ScriptedProvider(LLMProvider):
+    """Answers the first ``repeats`` prompts with one repeated question, later ones distinctly."""
+
+    name = "scripted"
+
+    def __init__(self, policy, repeats=1):
+        super().__init__("scripted-model", policy)
+        self.repeats = repeats
+        self.prompts = []
+
+    def complete(self, prompt, system=None):
+        self.prompts.append(prompt)
+        count = int(re.search(r"create (\d+)", prompt, re.IGNORECASE).group(1))
+        stems = [
+            "What is the main idea of the video?"
+            if len(self.prompts) <= self.repeats
+            else hashlib.sha1(f"{len(self.prompts)}-{idx}".encode()).hexdigest()
+            for idx in range(count)
+        ]
+        return json.dumps(
+            [
+                {"question": stem, "options": ["A", "B"], "correct_answer": "A", "explanation": ""}
+                for stem in stems
+            ]
+        )
+
+
+def test_cached_quizzes_replay_their_top_ups_without_model_calls():
+    settings = Settings(quiz_cache_enabled=True, embedding_cache_enabled=False)
+    segments = [
+        {"text": "sentence " * 10, "start": idx * 10.0, "duration": 10.0} for idx in range(3)
+    ]
+
+    class ScriptedQuizService(QuizService):
+        def _build_provider(self):
+            return ScriptedProvider(self.resilience.policy(ScriptedProvider.name))
+
+    quiz_service = ScriptedQuizService(settings)
+    executors = ExecutorPools(settings)
+    pipeline = QuizPipeline(StubTranscripts(segments), quiz_service, StubStorage(), executors)
+
+    _, first = asyncio.run(pipeline.generate("vid", 4, "medium"))
+    _, replayed = asyncio.run(pipeline.generate("vid", 4, "medium"))
+    executors.shutdown()
+
+    assert len(first) == 4
+    assert replayed == first
+    assert len(quiz_service.provider.prompts) == 2
+
+
+def test_cached_chunk_top_ups_ask_the_model_again():
+    settings = Settings(
+        quiz_cache_enabled=True,
+        embedding_cache_enabled=False,
+        map_reduce_threshold_chars=100,
+        map_chunk_seconds=60,
+    )
+    segments = [
+        {"text": "sentence " * 10, "start": idx * 10.0, "duration": 10.0} for idx in range(18)
+    ]
+
+    class ScriptedQuizService(QuizService):
+        def _build_provider(self):
+            # Every chunk of the first pass repeats the same question.
+            return ScriptedProvider(self.resilience.policy(ScriptedProvider.name), repeats=3)
+
+    quiz_service = ScriptedQuizService(settings)
+    executors = ExecutorPools(settings)
+    pipeline = QuizPipeline(StubTranscripts(segments), quiz_service, StubStorage(), executors)
+
+    _, first = asyncio.run(pipeline.generate("vid", 6, "medium"))
+    calls = len(quiz_service.provider.prompts)
+    _, replayed = asyncio.run(pipeline.generate("vid", 6, "medium"))
+    executors.shutdown()
+
+    assert len(first) == 6
+    assert replayed == first
+    assert len(quiz_service.provider.prompts) == calls
@@ -0,0 +1,70 @@
+import asyncio
+import hashlib
+import json
+
+import pregenerate
+from app.config import Settings
+from app.main import create_app
+from app.models.schemas import Quiz, QuizOptions
+from app.services.quiz_service import QuizService
+from app.services.transcript_service import TranscriptService
+
+
+def test_pregenerated_videos_are_served_without_remote_calls(monkeypatch, tmp_path, asgi_client):
+    calls = {"captions": 0, "llm": 0}
+
+    def captions(self, video_id):
+        calls["captions"] += 1
+        return [{"text": f"{video_id} word " * 50, "start": 0.0, "duration": 60.0}], "en"
+
+    def generate(self, transcript, num_questions, difficulty):
+        calls["llm"] += 1
+        return [
+            Quiz(
+                question=hashlib.sha1(f"{transcript[:11]} {idx}".encode()).hexdigest(),
+                options=["A"],
+                correct_answer="A",
+                explanation="",
+            )
+            for idx in range(num_questions)
+        ]
+
+    monkeypatch.setattr(TranscriptService, "_get_caption_segments", captions)
+    monkeypatch.setattr(QuizService, "_generate_quiz", generate)
+    settings = Settings(
+        cache_dir=str(tmp_path / "cache"), quiz_cache_enabled=True, transcription_workers=0
+    )
+    options = QuizOptions(num_questions=2, difficulty="easy")
+    checkpoint = str(tmp_path / "checkpoint.jsonl")
+    inputs = pregenerate.read_inputs(
+        ["dQw4w9WgXcQ", "https://youtu.be/aaaaaaaaaaa  # intro", "", "not a video"]
+    )
+
+    report = asyncio.run(pregenerate.pregenerate(inputs, options, checkpoint, settings))
+
+    assert (report["videos"], report["completed"], report["failed"]) == (2, 2, 1)
+    assert report["failures"][0]["video_id"] == "not a video"
+    assert report["counters"]["quiz_cache_writes_total"] == 2
+    assert calls == {"captions": 2, "llm": 2}
+    with open(checkpoint, encoding="utf-8") as handle:
+        assert [json.loads(line)["status"] for line in handle] == ["completed", "completed"]
+
+    resumed = asyncio.run(pregenerate.pregenerate(inputs[:2], options, checkpoint, settings))
+    assert (resumed["skipped"], resumed["completed"]) == (2, 0)
+
+    app = create_app(settings=settings)
+
+    async def live(client):
+        return await client.post(
+            "/api/generate-quiz",
+            json={
+                "youtube_url": "https://youtu.be/dQw4w9WgXcQ",
+                "num_questions": 2,
+                "difficulty": "easy",
+            },
+        )
+
+    response = asgi_client(app, live, lifespan=True)
+    assert response.status_code == 200
+    assert len(response.json()["quiz"]) == 2
+    assert calls == {"captions": 2, "llm": 2}
@@ -0,0 +1,66 @@
+from app.metrics import RATIO_BUCKETS, MetricsCollector
+from app.services.prompt_budget import (
+    PromptBudget,
+    centrality_scores,
+    compress,
+    estimate_tokens,
+    strip_filler,
+)
+
+
+def test_estimate_tokens_counts_words_and_punctuation():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("the cat sat.") == 4
+    assert estimate_tokens("internationalization") == 4
+
+
+def test_strip_filler_removes_markers_and_repeats():
+    text = "[Music] so um the the idea is you know you know simple (Applause) ♪ ok"
+
+    assert strip_filler(text) == "so the idea is you know simple ok"
+
+
+def test_content_passes_through_unchanged():
+    for text in ("she had had enough", "count 1 1 0", "use a[i] here", "bye bye", "[1] see notes"):
+        assert strip_filler(text) == text
+
+    assert compress("[Music] um the the intro", 100) == ("[Music] um the the intro", 7, 7)
+
+
+def test_centrality_prefers_on_topic_units():
+    scores = centrality_scores(
+        [
+            "gradient descent updates the weights",
+            "the weights follow the gradient downhill",
+            "subscribe to the channel",
+        ]
+    )
+
+    assert scores[2] < min(scores[0], scores[1])
+
+
+def test_compress_fits_budget_and_covers_whole_transcript():
+    sentences = [f"Part {idx} explains topic{idx} and the shared model idea." for idx in range(400)]
+    text = " ".join(sentences)
+
+    compressed, tokens_in, tokens_out = compress(text, 500)
+
+    assert tokens_out <= 500 < tokens_in
+    assert estimate_tokens(compressed) == tokens_out
+    kept = [int(part.split()[0]) for part in compressed.split("Part ")[1:]]
+    assert kept == sorted(kept)
+    assert kept[0] < 50 and kept[-1] >= 350
+
+
+def test_prompt_budget_reports_compression_ratio():
+    metrics = MetricsCollector()
+    budget = PromptBudget(50, metrics)
+
+    fitted = budget.fit(" ".join(f"Sentence number {idx} is here." for idx in range(100)))
+
+    assert estimate_tokens(fitted) <= 50
+    counters = metrics.export()
+    assert counters["prompt_tokens_out_total"] <= 50 < counters["prompt_tokens_in_total"]
+    assert metrics.histogram("prompt_compression_ratio")["count"] == 1
+    assert metrics.buckets_for("prompt_compression_ratio") == RATIO_BUCKETS
+    assert PromptBudget(0).fit("[Music] kept") == "[Music] kept"
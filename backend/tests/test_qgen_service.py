@@ -0,0 +1,115 @@
+import asyncio
+import json
+import re
+
+import httpx
+import pytest
+
+import qgen_service
+from app import resilience as resilience_module
+from app.config import Settings
+from app.main import create_app
+from app.resilience import CircuitOpenError, Resilience
+from app.services.llm import DeepSeekProvider, LLMError
+
+
+def _question(stem):
+    return {
+        "question_text": stem,
+        "choices": ["alpha", "beta", "gamma", "delta"],
+        "correct_choice": 1,
+        "difficulty": "medium",
+        "short_explanation": "",
+    }
+
+
+class ScriptedDeepSeek:
+    """HTTP handler that repeats one question in its first reply, then answers distinctly."""
+
+    def __init__(self):
+        self.counts = []
+
+    def __call__(self, request):
+        prompt = json.loads(request.read())["messages"][-1]["content"]
+        count = int(re.search(r"Number of questions to create: (\d+)", prompt).group(1))
+        self.counts.append(count)
+        if len(self.counts) == 1:
+            questions = [_question("Which sorting algorithm does the lecture recommend?")] * count
+        else:
+            questions = [
+                _question(f"Which data structure backs example {len(self.counts)}-{idx}?")
+                for idx in range(count)
+            ]
+        reply = "Here you go:\n" + json.dumps(questions)
+        return httpx.Response(200, json={"choices": [{"message": {"content": reply}}]})
+
+
+@pytest.fixture
+def deepseek(monkeypatch):
+    handler = ScriptedDeepSeek()
+    settings = Settings(deepseek_api_key="key", llm_backoff_seconds=0)
+    transport = httpx.MockTransport(handler)
+    shared = Resilience(settings)
+    provider = DeepSeekProvider(
+        settings,
+        shared.policy(DeepSeekProvider.name),
+        client=httpx.Client(transport=transport, base_url=settings.deepseek_base_url),
+        async_client=httpx.AsyncClient(transport=transport, base_url=settings.deepseek_base_url),
+    )
+    monkeypatch.setattr(resilience_module, "_shared", shared)
+    monkeypatch.setattr(qgen_service, "USE_DEEPSEEK", True)
+    monkeypatch.setattr(qgen_service, "settings", settings)
+    monkeypatch.setattr(qgen_service, "_provider", provider)
+    return handler
+
+
+def test_generate_for_chunk_tops_up_near_duplicates(deepseek):
+    questions = qgen_service.generate_for_chunk("text", 0.0, 60.0, "medium", n=3)
+
+    assert len(questions) == 3
+    assert len({question["question_text"] for question in questions}) == 3
+    assert deepseek.counts == [3, 2]
+
+
+def test_agenerate_for_chunk_tops_up_near_duplicates(deepseek):
+    questions = asyncio.run(qgen_service.agenerate_for_chunk("text", 0.0, 60.0, "medium", n=2))
+
+    assert len(questions) == 2
+    assert deepseek.counts == [2, 1]
+
+
+def test_unparseable_replies_raise(monkeypatch, deepseek):
+    monkeypatch.setattr(qgen_service._provider, "complete", lambda prompt, system=None: "sorry")
+
+    with pytest.raises(RuntimeError, match="Could not parse JSON array"):
+        qgen_service.call_deepseek_for_questions("text", 0.0, 60.0, "medium")
+
+
+def test_mock_questions_are_used_without_an_api_key(monkeypatch):
+    monkeypatch.setattr(qgen_service, "USE_DEEPSEEK", False)
+
+    questions = qgen_service.generate_for_chunk("text", 0.0, 60.0, "easy", n=5)
+
+    assert len({question["question_text"] for question in questions}) == 5
+    assert all(question["difficulty"] == "easy" for question in questions)
+
+
+def test_app_and_legacy_helpers_share_the_deepseek_breaker(monkeypatch):
+    monkeypatch.setattr(resilience_module, "_shared", resilience_module._shared)
+    monkeypatch.setattr(qgen_service, "_provider", qgen_service._provider)
+    monkeypatch.setattr(qgen_service, "USE_DEEPSEEK", True)
+    app = create_app(
+        settings=Settings(deepseek_api_key="key", circuit_failure_threshold=1, llm_max_retries=1)
+    )
+
+    def outage():
+        raise LLMError("upstream down", retryable=True)
+
+    with pytest.raises(LLMError):
+        app.state.resilience.policy(DeepSeekProvider.name).call(outage)
+    try:
+        with pytest.raises(CircuitOpenError):
+            qgen_service.call_deepseek_for_questions("text", 0.0, 60.0, "medium")
+        assert qgen_service.get_provider().policy.breaker.state == "open"
+    finally:
+        qgen_service.get_provider().close()
@@ -4,6 +4,7 @@ from types import SimpleNamespace as Obj
 import pytest
 
 from app.config import Settings
+from app.main import create_app
 from app.services import quiz_service as quiz_module
 from app.services.quiz_service import QuizService
 
@@ -61,3 +62,58 @@ def test_embedding_fn_returns_vector(settings):
     vector = embed_fn("hello world")
     assert isinstance(vector, list)
     assert vector
+
+
+def test_quiz_cache_serves_repeats_and_honours_fresh(monkeypatch):
+    service = QuizService(Settings(gemini_api_key="dummy", quiz_cache_enabled=True))
+    calls = []
+    original = service.provider.model.generate_content
+
+    def counting_generate(prompt):
+        calls.append(prompt)
+        return original(prompt)
+
+    monkeypatch.setattr(service.provider.model, "generate_content", counting_generate)
+
+    first = service.generate_quiz("lorem ipsum", 1, "medium")
+    second = service.generate_quiz("lorem ipsum", 1, "medium")
+    assert second == first
+    assert len(calls) == 1
+
+    service.generate_quiz("lorem ipsum", 1, "hard")
+    service.generate_quiz("lorem ipsum", 1, "medium", fresh=True)
+    assert len(calls) == 3
+    assert service.metrics.export()["quiz_cache_memory_hits_total"] == 1
+
+    # A top-up round is never answered with the cached result it replaces,
+    # but is itself served from the cache on replay.
+    service.generate_quiz("lorem ipsum", 1, "medium", topup_round=1)
+    assert len(calls) == 4
+    service.generate_quiz("lorem ipsum", 1, "medium", topup_round=1)
+    assert len(calls) == 4
+
+
+def test_batch_embedding_fn_embeds_lists(settings, mock_genai, monkeypatch):
+    monkeypatch.setattr(
+        mock_genai,
+        "embed_content",
+        lambda **kwargs: {"embedding": [[0.1, 0.2] for _ in kwargs["content"]]},
+    )
+    service = QuizService(settings)
+    vectors = service.get_batch_embedding_fn()(["a", "b", "c"])
+    assert vectors == [[0.1, 0.2]] * 3
+
+
+def test_app_resilience_is_shared_by_providers(settings):
+    built = []
+
+    class RecordingQuizService(QuizService):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            built.append(self)
+
+    app = create_app(settings=settings, quiz_service_cls=RecordingQuizService)
+    resilience = app.state.resilience
+
+    assert built[0].provider.policy is resilience.policy("gemini")
+    assert built[0].embedding_policy.budget is resilience.budget
@@ -0,0 +1,84 @@
+import json
+from types import SimpleNamespace as Obj
+
+from app.main import create_app
+from app.services.llm import GeminiProvider
+from app.services.quiz_service import QuizService
+from app.services.quiz_stream import QuizStreamParser
+from app.services.transcript_service import TranscriptService
+
+QUESTIONS = [
+    {
+        "question": 'Which {brace} or "quote" ]?',
+        "options": ["A) x", "B) y", "C) z", "D) w"],
+        "correct_answer": "A) x",
+        "explanation": 'Escaped \\" and } inside strings.',
+    },
+    {
+        "question": "Second?",
+        "options": ["A) 1", "B) 2", "C) 3", "D) 4"],
+        "correct_answer": "B) 2",
+        "explanation": "Because.",
+    },
+]
+
+
+def test_parser_yields_items_across_arbitrary_splits():
+    text = "```json\n" + json.dumps(QUESTIONS, indent=2) + "\n```"
+    for step in (1, 5, 17, len(text)):
+        parser = QuizStreamParser()
+        items = []
+        for start in range(0, len(text), step):
+            items.extend(parser.feed(text[start : start + step]))
+        assert items == QUESTIONS
+        assert parser.finished
+
+
+def test_stream_endpoint_emits_stages_then_questions(monkeypatch, asgi_client):
+    class StreamingModel:
+        def generate_content(self, prompt, stream=False):
+            text = json.dumps(QUESTIONS)
+            return [Obj(text=text[i : i + 10]) for i in range(0, len(text), 10)]
+
+    monkeypatch.setattr(
+        TranscriptService,
+        "_get_caption_segments",
+        lambda self, video_id: ([{"text": "word " * 50, "start": 0.0, "duration": 60.0}], "en"),
+    )
+
+    def configure(self):
+        return GeminiProvider(
+            StreamingModel(), "test-model", self.resilience.policy(GeminiProvider.name)
+        )
+
+    monkeypatch.setattr(QuizService, "_configure_gemini", configure)
+    app = create_app()
+
+    async def run(client):
+        return await client.post(
+            "/api/generate-quiz/stream",
+            json={"youtube_url": "https://youtu.be/dQw4w9WgXcQ", "num_questions": 2},
+        )
+
+    response = asgi_client(app, run)
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        (block.split("\n")[0][len("event: ") :], json.loads(block.split("\n")[1][len("data: ") :]))
+        for block in response.text.strip().split("\n\n")
+    ]
+    names = [name for name, _ in events]
+    assert names == [
+        "stage",
+        "stage",
+        "stage",
+        "question",
+        "question",
+        "done",
+    ]
+    assert [data["stage"] for _, data in events[:3]] == [
+        "fetching_transcript",
+        "transcript_ready",
+        "generation_started",
+    ]
+    assert events[3][1]["question"] == QUESTIONS[0]["question"]
+    assert events[-1][1] == {"count": 2}
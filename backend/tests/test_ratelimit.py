@@ -0,0 +1,119 @@
+from fastapi import FastAPI
+
+from app.config import Settings
+from app.ratelimit import InMemoryRateLimitBackend, RateLimiter, RedisRateLimitBackend
+
+
+class FakeRedis:
+    """Local stand-in that evaluates the token-bucket script in Python."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.calls = 0
+
+    async def eval(self, script, numkeys, key, capacity, rate, now):
+        self.calls += 1
+        tokens, ts = self.hashes.get(key, (float(capacity), now))
+        tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+        allowed = 0
+        if tokens >= 1:
+            tokens -= 1
+            allowed = 1
+        self.hashes[key] = (tokens, now)
+        return [allowed, str(tokens)]
+
+
+def test_token_bucket_bursts_refills_and_evicts_idle_keys():
+    backend = InMemoryRateLimitBackend(sweep_interval_seconds=10)
+    results = [backend.acquire_now("a", 2, 1.0, now=0.0)[0] for _ in range(3)]
+    assert results == [True, True, False]
+    allowed, remaining, wait = backend.acquire_now("a", 2, 1.0, now=0.5)
+    assert not allowed and wait == 0.5
+    assert backend.acquire_now("a", 2, 1.0, now=1.0)[0]
+
+    backend.acquire_now("b", 2, 1.0, now=1.0)
+    assert backend.sweep(now=2.5) == 0
+    assert backend.sweep(now=5.0) == 2
+    assert backend.buckets == {}
+
+
+def _limited_app(backend):
+    settings = Settings(
+        rate_limit_requests=5, rate_limit_window_seconds=60, rate_limit_routes={"/slow": 1}
+    )
+    app = FastAPI()
+    app.middleware("http")(RateLimiter(settings, backend=backend))
+
+    @app.get("/slow")
+    async def slow():
+        return {}
+
+    @app.get("/fast")
+    async def fast():
+        return {}
+
+    return app
+
+
+def test_middleware_applies_route_limits_and_headers(asgi_client):
+    app = _limited_app(InMemoryRateLimitBackend())
+
+    async def run(client):
+        return [await client.get(path) for path in ("/slow", "/slow", "/fast")]
+
+    first, limited, other = asgi_client(app, run)
+    assert first.status_code == 200
+    assert first.headers["X-RateLimit-Limit"] == "1"
+    assert first.headers["X-RateLimit-Remaining"] == "0"
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) > 0
+    assert other.status_code == 200
+    assert other.headers["X-RateLimit-Limit"] == "5"
+    assert other.headers["X-RateLimit-Remaining"] == "4"
+
+
+def test_shared_backend_enforces_one_limit_across_workers(asgi_client):
+    redis = FakeRedis()
+    workers = [_limited_app(RedisRateLimitBackend(redis)) for _ in range(2)]
+
+    responses = [asgi_client(app, lambda client: client.get("/slow")) for app in workers]
+    assert [response.status_code for response in responses] == [200, 429]
+    assert redis.calls == 2
+
+
+def test_routes_match_by_method_and_whole_path_segments():
+    settings = Settings(
+        rate_limit_requests=5,
+        rate_limit_routes={"POST /api/jobs": 1, "GET /api/jobs": 100, "/api/quiz": 2},
+    )
+    limiter = RateLimiter(settings, backend=InMemoryRateLimitBackend())
+
+    assert limiter.route_limit("POST", "/api/jobs") == ("POST /api/jobs", 1)
+    assert limiter.route_limit("GET", "/api/jobs/abc") == ("GET /api/jobs", 100)
+    assert limiter.route_limit("DELETE", "/api/jobs/abc") == ("*", 5)
+    assert limiter.route_limit("POST", "/api/quiz/stream") == ("/api/quiz", 2)
+    assert limiter.route_limit("POST", "/api/quizzes") == ("*", 5)
+
+
+def test_default_routes_keep_batches_on_a_strict_budget():
+    limiter = RateLimiter(Settings(), backend=InMemoryRateLimitBackend())
+
+    assert limiter.route_limit("POST", "/api/batch/stream") == ("POST /api/batch", 1)
+    assert limiter.route_limit("POST", "/api/batch/jobs") == ("POST /api/batch", 1)
+    assert limiter.route_limit("GET", "/api/jobs/abc") == ("GET /api/jobs", 600)
+
+
+class FailingBackend(InMemoryRateLimitBackend):
+    async def acquire(self, key, capacity, refill_per_second):
+        raise ConnectionError("redis unavailable")
+
+
+def test_backend_errors_fail_open(asgi_client):
+    app = _limited_app(FailingBackend())
+    limiter = app.user_middleware[0].kwargs["dispatch"]
+
+    async def run(client):
+        return [(await client.get("/slow")).status_code for _ in range(3)]
+
+    assert asgi_client(app, run) == [200, 200, 200]
+    assert limiter.metrics.export()["rate_limit_backend_errors_total"] == 3
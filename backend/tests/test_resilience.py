@@ -0,0 +1,105 @@
+import pytest
+
+from app.metrics import MetricsCollector
+from app.resilience import CircuitBreaker, CircuitOpenError, RetryBudget, RetryPolicy
+from app.services.llm import LLMError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _policy(clock, metrics, threshold=2, budget=None, attempts=3):
+    breaker = CircuitBreaker(
+        "test", failure_threshold=threshold, reset_timeout=10, metrics=metrics, clock=clock
+    )
+    budget = budget or RetryBudget(ratio=0.0, min_per_second=0.0, burst=10, clock=clock)
+    return RetryPolicy(breaker, budget, max_attempts=attempts, base_delay=0, metrics=metrics)
+
+
+def test_breaker_opens_fails_fast_then_recovers_through_half_open_probe():
+    clock, metrics = Clock(), MetricsCollector()
+    policy = _policy(clock, metrics, attempts=1)
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise LLMError("down", retryable=True)
+
+    for _ in range(2):
+        with pytest.raises(LLMError):
+            policy.call(failing)
+    assert policy.breaker.state == "open"
+    assert metrics.gauges()["test_circuit_state"] == 2
+
+    with pytest.raises(CircuitOpenError):
+        policy.call(failing)
+    assert len(calls) == 2
+
+    clock.now = 10.0
+    assert policy.breaker.state == "half_open"
+    assert policy.call(lambda: "ok") == "ok"
+    assert policy.breaker.state == "closed"
+    assert metrics.export()["test_circuit_rejected_total"] == 1
+
+
+def test_non_retryable_errors_do_not_trip_breaker_or_retry():
+    clock, metrics = Clock(), MetricsCollector()
+    policy = _policy(clock, metrics, threshold=1)
+    calls = []
+
+    def bad_request():
+        calls.append(1)
+        raise LLMError("bad request")
+
+    with pytest.raises(LLMError):
+        policy.call(bad_request)
+    assert len(calls) == 1
+    assert policy.breaker.state == "closed"
+
+
+def test_retry_budget_caps_retries_across_calls():
+    clock, metrics = Clock(), MetricsCollector()
+    budget = RetryBudget(ratio=0.0, min_per_second=0.0, burst=1, clock=clock)
+    policy = _policy(clock, metrics, threshold=100, budget=budget)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        raise LLMError("busy", retryable=True)
+
+    for _ in range(2):
+        with pytest.raises(LLMError):
+            policy.call(flaky)
+    # One retry granted in total, then the budget is exhausted.
+    assert len(attempts) == 3
+    assert metrics.export()["retry_budget_exhausted_total"] == 2
+
+
+def test_abandoned_stream_neither_closes_nor_blocks_a_half_open_breaker():
+    clock, metrics = Clock(), MetricsCollector()
+    policy = _policy(clock, metrics, threshold=1, attempts=1)
+
+    def failing():
+        raise LLMError("down", retryable=True)
+
+    def stream():
+        with policy.guard():
+            yield "first"
+            yield "second"
+
+    with pytest.raises(LLMError):
+        policy.call(failing)
+    clock.now = 10.0
+
+    chunks = stream()
+    assert next(chunks) == "first"
+    chunks.close()  # client disconnected mid-stream
+    assert policy.breaker.state == "half_open"
+
+    assert list(stream()) == ["first", "second"]
+    assert policy.breaker.state == "closed"
@@ -0,0 +1,89 @@
+import gzip
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from app.main import create_app
+from app.responses import CompressionMiddleware
+from app.services.quiz_service import QuizService
+from app.services.transcript_service import TranscriptService
+
+
+def _compressed_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/big")
+    async def big():
+        return PlainTextResponse("quiz " * 200)
+
+    @app.get("/small")
+    async def small():
+        return PlainTextResponse("ok")
+
+    @app.get("/events")
+    async def events():
+        async def stream():
+            for _ in range(3):
+                yield "data: " + "x" * 200 + "\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return app
+
+
+def test_large_bodies_are_gzipped_and_small_or_streamed_ones_are_not(asgi_client):
+    app = _compressed_app()
+
+    def _get(path, encoding="gzip"):
+        return asgi_client(
+            app, lambda client: client.get(path, headers={"Accept-Encoding": encoding})
+        )
+
+    big = _get("/big")
+    assert big.headers["content-encoding"] == "gzip"
+    assert big.headers["vary"] == "Accept-Encoding"
+    assert int(big.headers["content-length"]) < 1000
+    assert big.text == "quiz " * 200
+
+    assert "content-encoding" not in _get("/small").headers
+    assert "content-encoding" not in _get("/events").headers
+    assert "content-encoding" not in _get("/big", encoding="identity").headers
+
+
+def test_negotiate_honours_zero_quality():
+    assert CompressionMiddleware.negotiate("gzip;q=0, deflate") is None
+    assert CompressionMiddleware.negotiate("deflate, gzip;q=0.5") == "gzip"
+    assert gzip.decompress(CompressionMiddleware(None).compress(b"abc", "gzip")) == b"abc"
+
+
+def test_transcript_mode_shapes_the_quiz_response(monkeypatch, asgi_client):
+    text = "word " * 1000
+    monkeypatch.setattr(
+        TranscriptService,
+        "_get_caption_segments",
+        lambda self, video_id: ([{"text": text, "start": 0.0, "duration": 60.0}], "en"),
+    )
+    monkeypatch.setattr(QuizService, "generate_quiz", lambda self, **_kwargs: [])
+    app = create_app()
+
+    async def run(client):
+        results = {}
+        for mode in ("full", "truncated", "reference", "none"):
+            response = await client.post(
+                "/api/generate-quiz",
+                json={"youtube_url": "https://youtu.be/dQw4w9WgXcQ", "transcript_mode": mode},
+            )
+            assert response.status_code == 200
+            results[mode] = response.json()
+        return results
+
+    results = asgi_client(app, run)
+    assert results["full"]["transcript"] == text
+    assert results["full"]["transcript_truncated"] is False
+    assert len(results["truncated"]["transcript"]) == 2003
+    assert results["truncated"]["transcript_truncated"] is True
+    assert results["reference"]["transcript"] is None
+    assert results["reference"]["transcript_url"] == "/api/transcript/dQw4w9WgXcQ"
+    assert results["none"]["transcript"] is None
+    assert results["none"]["transcript_url"] is None
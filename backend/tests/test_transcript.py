@@ -0,0 +1,57 @@
+import json
+
+from app.services.transcript import Transcript, as_transcript
+
+
+def _segments(count, seconds=10.0):
+    return [
+        {"text": f"s{idx} é", "start": idx * seconds, "duration": seconds}
+        for idx in range(count)
+    ]
+
+
+def test_text_matches_joined_segments():
+    segments = _segments(5)
+    transcript = Transcript.from_segments(segments, "captions")
+
+    assert transcript.text == " ".join(segment["text"] for segment in segments)
+    assert len(transcript) == 5
+    assert transcript.duration == 50.0
+    assert list(transcript.iter_segments()) == segments
+
+
+def test_time_range_lookup_and_views():
+    transcript = Transcript.from_segments(_segments(10))
+
+    assert transcript.segment_range(25.0, 45.0) == (2, 5)
+    assert transcript.text_between(25.0, 45.0) == "s2 é s3 é s4 é"
+    assert transcript.time_span(2, 5) == (20.0, 50.0)
+    view = transcript.view(3, 4)
+    assert isinstance(view, memoryview)
+    assert bytes(view).decode("utf-8") == "s3 é"
+    start, _ = transcript.byte_span(7, 8)
+    assert transcript.segment_at_byte(start + 1) == 7
+
+
+def test_binary_round_trip():
+    transcript = Transcript.from_segments(_segments(3), "whisper")
+
+    restored = Transcript.from_bytes(transcript.to_bytes())
+
+    assert restored.text == transcript.text
+    assert restored.source == "whisper"
+    assert list(restored.starts) == [0.0, 10.0, 20.0]
+    assert list(restored.iter_segments()) == _segments(3)
+
+
+def test_reads_legacy_json_records():
+    payload = json.dumps(
+        {"text": "a b", "segments": _segments(2), "source": "captions"}
+    ).encode("utf-8")
+
+    restored = Transcript.from_bytes(payload)
+
+    assert restored.text == "s0 é s1 é"
+    assert restored.source == "captions"
+    assert Transcript.from_bytes(b"garbage") is None
+    assert as_transcript("plain text").text == "plain text"
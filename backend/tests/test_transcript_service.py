@@ -29,7 +29,8 @@ def test_get_transcript_manual_fallback(monkeypatch, settings):
         raise RuntimeError("no english")
 
     class DummyTranscript:
-        language = "fr"
+        language = "French"
+        language_code = "fr"
 
         def fetch(self):
             return [{"text": "bonjour"}, {"text": "le monde"}]
@@ -45,11 +46,72 @@ def test_get_transcript_manual_fallback(monkeypatch, settings):
         return DummyTranscripts()
 
     monkeypatch.setattr(
-        transcript_module.YouTubeTranscriptApi, "get_transcript", staticmethod(fake_get_transcript)
+        transcript_module.youtube_transcript_api.YouTubeTranscriptApi,
+        "get_transcript",
+        staticmethod(fake_get_transcript),
     )
     monkeypatch.setattr(
-        transcript_module.YouTubeTranscriptApi, "list_transcripts", staticmethod(fake_list_transcripts)
+        transcript_module.youtube_transcript_api.YouTubeTranscriptApi,
+        "list_transcripts",
+        staticmethod(fake_list_transcripts),
     )
 
     transcript = service.get_transcript("abcdefghijk")
     assert "bonjour" in transcript
+
+
+def test_get_transcript_served_from_cache(monkeypatch, settings):
+    service = TranscriptService(settings)
+    calls = []
+
+    def fake_get_transcript(video_id, languages):
+        calls.append(video_id)
+        return [{"text": "hello"}, {"text": "world"}]
+
+    monkeypatch.setattr(
+        transcript_module.youtube_transcript_api.YouTubeTranscriptApi,
+        "get_transcript",
+        staticmethod(fake_get_transcript),
+    )
+
+    assert service.get_transcript("abcdefghijk") == "hello world"
+    assert service.get_transcript("abcdefghijk") == "hello world"
+    assert calls == ["abcdefghijk"]
+    assert service.metrics.export()["transcript_cache_memory_hits_total"] == 1
+
+
+def test_fallback_language_is_cached_under_its_own_key(monkeypatch, tmp_path):
+    settings = Settings(gemini_api_key="test-key", cache_dir=str(tmp_path))
+    calls = []
+
+    def fake_get_transcript(video_id, languages):
+        raise RuntimeError("no english")
+
+    class DummyTranscript:
+        language = "Spanish"
+        language_code = "es"
+
+        def fetch(self):
+            calls.append(1)
+            return [{"text": "hola"}, {"text": "mundo"}]
+
+    class DummyTranscripts:
+        def find_manually_created_transcript(self, langs):
+            return DummyTranscript()
+
+        def find_generated_transcript(self, langs):
+            raise RuntimeError("no auto")
+
+    api = transcript_module.youtube_transcript_api.YouTubeTranscriptApi
+    monkeypatch.setattr(api, "get_transcript", staticmethod(fake_get_transcript))
+    monkeypatch.setattr(api, "list_transcripts", staticmethod(lambda video_id: DummyTranscripts()))
+
+    service = TranscriptService(settings)
+    assert service.get_transcript("abcdefghijk") == "hola mundo"
+    assert service.cache.get("abcdefghijk:es") is not None
+    assert service.cache.get_memory("abcdefghijk:en") is None
+
+    restarted = TranscriptService(settings)
+    assert restarted.get_transcript("abcdefghijk") == "hola mundo"
+    assert calls == [1]
+    assert restarted.metrics.export()["transcript_cache_disk_hits_total"] == 1
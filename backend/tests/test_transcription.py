@@ -0,0 +1,56 @@
+import sys
+from types import ModuleType
+from types import SimpleNamespace as Obj
+
+import pytest
+
+from app.config import Settings
+from app.services.transcription import FasterWhisperEngine, build_transcription_engine
+
+
+@pytest.fixture
+def fake_faster_whisper(monkeypatch):
+    created = []
+
+    class WhisperModel:
+        def __init__(self, name, **kwargs):
+            self.name = name
+            self.kwargs = kwargs
+            self.calls = []
+            created.append(self)
+
+        def transcribe(self, audio_path, **kwargs):
+            self.calls.append((audio_path, kwargs))
+            segments = (
+                Obj(text=" hello ", start=0.0, end=1.5),
+                Obj(text="world", start=3.0, end=4.0),
+            )
+            return iter(segments), Obj(language="en")
+
+    module = ModuleType("faster_whisper")
+    module.WhisperModel = WhisperModel
+    monkeypatch.setitem(sys.modules, "faster_whisper", module)
+    return created
+
+
+def test_faster_whisper_is_default_with_int8_and_vad(fake_faster_whisper):
+    engine = build_transcription_engine(Settings(whisper_beam_size=2, whisper_cpu_threads=4))
+    assert isinstance(engine, FasterWhisperEngine)
+
+    segments = engine.transcribe("/tmp/audio.mp3")
+    engine.transcribe("/tmp/audio.mp3")
+
+    assert len(fake_faster_whisper) == 1  # model loaded once
+    model = fake_faster_whisper[0]
+    assert model.kwargs == {"device": "cpu", "compute_type": "int8", "cpu_threads": 4}
+    assert model.calls[0][1]["beam_size"] == 2
+    assert model.calls[0][1]["vad_filter"] is True
+    assert segments == [
+        {"text": "hello", "start": 0.0, "duration": 1.5},
+        {"text": "world", "start": 3.0, "duration": 1.0},
+    ]
+
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError):
+        build_transcription_engine(Settings(transcription_engine="nope"))
@@ -0,0 +1,79 @@
+import os
+import signal
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.config import Settings
+from app.services.transcription import TranscriptionEngine
+from app.services.transcription_pool import TranscriptionWorkerPool
+
+
+class ScriptedEngine(TranscriptionEngine):
+    """Stand-in engine whose behaviour is chosen by the audio path."""
+
+    name = "scripted"
+
+    def _load_model(self):
+        return os.getpid()
+
+    def _transcribe(self, audio_path):
+        if audio_path == "crash":
+            os._exit(3)
+        if audio_path == "hang":
+            time.sleep(30)
+        if audio_path == "fail":
+            raise RuntimeError("bad audio")
+        return [{"text": audio_path, "start": 0.0, "duration": float(self._model)}]
+
+
+def scripted_engine():
+    return ScriptedEngine(Settings())
+
+
+def test_worker_pool_isolates_crashes_and_timeouts():
+    pool = TranscriptionWorkerPool(Settings(transcription_workers=1), scripted_engine)
+    try:
+        first = pool.transcribe("hello")
+        assert first[0]["text"] == "hello"
+        worker_pid = int(first[0]["duration"])
+        assert worker_pid != os.getpid()
+        assert int(pool.transcribe("again")[0]["duration"]) == worker_pid  # model reused
+
+        with pytest.raises(HTTPException) as failed:
+            pool.transcribe("fail")
+        assert "bad audio" in failed.value.detail
+
+        with pytest.raises(HTTPException) as crashed:
+            pool.transcribe("crash")
+        assert crashed.value.status_code == 500
+
+        with pytest.raises(HTTPException) as hung:
+            pool.transcribe("hang", timeout=0.5)
+        assert hung.value.status_code == 504
+
+        recovered = pool.transcribe("after")
+        assert recovered[0]["text"] == "after"
+        assert int(recovered[0]["duration"]) != worker_pid
+        assert pool.metrics.export()["transcription_worker_restarts_total"] == 2
+        assert pool.idle_workers == 1
+    finally:
+        pool.shutdown()
+
+
+def test_worker_that_died_while_idle_is_replaced():
+    pool = TranscriptionWorkerPool(Settings(transcription_workers=1), scripted_engine)
+    try:
+        worker_pid = int(pool.transcribe("hello")[0]["duration"])
+        os.kill(worker_pid, signal.SIGKILL)
+        time.sleep(0.2)
+
+        for attempt in ("one", "two", "three"):
+            result = pool.transcribe(attempt)
+            assert result[0]["text"] == attempt
+            assert int(result[0]["duration"]) != worker_pid
+        assert pool.metrics.export()["transcription_worker_restarts_total"] == 1
+        assert pool.idle_workers == 1
+    finally:
+        pool.shutdown()
@@ -0,0 +1,49 @@
+import subprocess
+import sys
+
+from app.main import create_app
+from app.services.quiz_service import QuizService
+from app.services.transcript_service import TranscriptService
+from app.storage.pinecone_client import PineconeStorage
+
+
+def test_import_does_not_load_heavy_sdks():
+    heavy = ["google.generativeai", "yt_dlp", "youtube_transcript_api", "httpx", "pinecone"]
+    code = (
+        "import sys, app.main; "
+        f"print([name for name in {heavy!r} if name in sys.modules])"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_ready_reports_warm_up_separately_from_health(monkeypatch, asgi_client):
+    monkeypatch.setattr(TranscriptService, "warm_up", lambda self: None)
+    monkeypatch.setattr(QuizService, "warm_up", lambda self: None)
+
+    def broken(self):
+        raise RuntimeError("index unreachable")
+
+    monkeypatch.setattr(PineconeStorage, "warm_up", broken)
+    app = create_app()
+
+    async def run(client):
+        before = await client.get("/ready")
+        health = await client.get("/health")
+        async with app.router.lifespan_context(app):
+            await app.state.warmup.wait()
+            after = await client.get("/ready")
+        return before, health, after
+
+    before, health, after = asgi_client(app, run)
+    assert before.status_code == 503
+    assert before.json()["status"] == "warming"
+    assert health.status_code == 200
+    assert after.status_code == 200
+    report = after.json()
+    assert report["status"] == "degraded"
+    assert report["components"]["llm"]["status"] == "ready"
+    assert report["components"]["vector_store"]["error"] == "index unreachable"
+    assert report["startup_seconds"] >= report["app_created_seconds"] > 0
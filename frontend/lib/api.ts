@@ -3,12 +3,17 @@ export interface QuizQuestion {
   options: string[];
   correct_answer: string;
   explanation: string;
+  difficulty?: "easy" | "medium" | "hard" | null;
+  time_start?: number | null;
+  time_end?: number | null;
 }
 
 export interface QuizPayload {
   youtube_url: string;
   num_questions: number;
   difficulty: "easy" | "medium" | "hard";
+  fresh?: boolean;
+  difficulty_mix?: Partial<Record<"easy" | "medium" | "hard", number>>;
 }
 
 export interface QuizApiResponse {
@@ -36,6 +41,59 @@ export async function generateQuiz(payload: QuizPayload): Promise<QuizApiRespons
   return handleResponse<QuizApiResponse>(response);
 }
 
+export interface QuizStreamHandlers {
+  onStage?: (stage: string, data: Record<string, unknown>) => void;
+  onQuestion: (question: QuizQuestion, index: number) => void;
+  onDone?: (count: number) => void;
+}
+
+function parseSseEvent(block: string): { event: string; data: string } {
+  let event = "message";
+  const data: string[] = [];
+  for (const line of block.split("\n")) {
+    if (line.startsWith("event:")) event = line.slice(6).trim();
+    else if (line.startsWith("data:")) data.push(line.slice(5).trim());
+  }
+  return { event, data: data.join("\n") };
+}
+
+export async function streamQuiz(
+  payload: QuizPayload,
+  handlers: QuizStreamHandlers,
+  signal?: AbortSignal
+): Promise<void> {
+  const response = await fetch(`${API_BASE}/api/generate-quiz/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json", Accept: "text/event-stream" },
+    body: JSON.stringify(payload),
+    signal
+  });
+  if (!response.ok || !response.body) {
+    await handleResponse<unknown>(response);
+    throw new Error("Streaming is not supported by this browser");
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const { event, data } = parseSseEvent(buffer.slice(0, boundary));
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf("\n\n");
+      const parsed = data ? JSON.parse(data) : {};
+      if (event === "stage") handlers.onStage?.(parsed.stage, parsed);
+      else if (event === "question") handlers.onQuestion(parsed as QuizQuestion, parsed.index);
+      else if (event === "done") handlers.onDone?.(parsed.count);
+      else if (event === "error") throw new Error(parsed.detail || "Quiz generation failed");
+    }
+  }
+}
+
 export async function fetchTranscript(videoId: string): Promise<{ transcript: string }> {
   const response = await fetch(`${API_BASE}/api/transcript/${videoId}`);
   return handleResponse<{ transcript: string }>(response);